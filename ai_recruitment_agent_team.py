@@ -1,8 +1,7 @@
 from typing import Literal, Tuple, Dict, Optional
 import time
-import smtplib
-import requests
-import PyPDF2
+import io
+import hashlib
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -11,35 +10,125 @@ import streamlit as st
 import json
 import os
 import pytz
-import pandas as pd
-import matplotlib.pyplot as plt
-from phi.tools.zoom import ZoomTool
-from phi.utils.log import logger
-from streamlit_pdf_viewer import pdf_viewer
+from storage import get_storage
+from outbox import enqueue_email, message_status
+from jobs import get_job, submit_job
+import resume_cache
+import resume_index
+import ranking
+import slots
+import mcq_tests
+import mcq_import
+import availability
+from skill_matcher import score_resume
+
+
+# pandas, matplotlib, PyPDF2, requests, phi's Zoom tool and the PDF viewer are imported inside the
+# functions that use them, so pages that don't need them never pay for loading them
+
+def _figure_png(fig) -> bytes:
+    """Render a figure to PNG bytes and release it."""
+    import matplotlib.pyplot as plt
+
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        # Close explicitly so pyplot doesn't keep every figure alive for the life of the server
+        plt.close(fig)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def render_analytics(data_hash: str, _analytics_data: Dict) -> Dict:
+    """
+    Build the analytics tables and charts. Cached on `data_hash`, the content
+    hash of the analytics data, so they are only rebuilt when the data changes.
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    rendered = {"role_df": None, "charts": {}}
+    role_data = _analytics_data.get("roles", {})
+    if not role_data:
+        return rendered
+
+    role_df = pd.DataFrame(role_data).T  # Transpose to make roles rows instead of columns
+    role_df.reset_index(inplace=True)
+    role_df.rename(columns={"index": "Role"}, inplace=True)
+    rendered["role_df"] = role_df
+
+    # Role-based bar graph
+    fig, ax = plt.subplots(figsize=(10, 6))
+    role_df.set_index("Role")[["total_applicants", "selected_for_test", "passed", "failed"]].plot(
+        kind="bar", ax=ax, color=["#ff9999", "#66b3ff", "#99ff99", "#ffcc99"]
+    )
+    ax.set_title("Applicants Breakdown by Role", fontsize=14)
+    ax.set_xlabel("Roles", fontsize=12)
+    ax.set_ylabel("Number of Applicants", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend(title="Metrics")
+    rendered["charts"]["role_bar"] = _figure_png(fig)
+
+    # Pie chart for applicant distribution
+    role_applicants = role_df[["Role", "total_applicants"]].set_index("Role")
+    # Handle NaN values in the total_applicants column
+    role_applicants["total_applicants"] = role_applicants["total_applicants"].fillna(0)
+    if role_applicants["total_applicants"].sum() > 0:
+        fig, ax = plt.subplots(figsize=(8, 8))
+        role_applicants.plot.pie(y="total_applicants", ax=ax, autopct='%1.1f%%', legend=False)
+        ax.set_title("Total Applicants by Role", fontsize=14)
+        rendered["charts"]["role_pie"] = _figure_png(fig)
+
+    # Interview charts read the rollups maintained as interviews are recorded, never the full history
+    rollups = _analytics_data.get("interview_rollups") or {}
+    if rollups.get("by_role"):
+        role_counts = pd.Series(rollups["by_role"]).sort_values(ascending=False)
+
+        # Interview count by role
+        fig, ax = plt.subplots(figsize=(8, 5))
+        role_counts.plot(kind="bar", color="skyblue", ax=ax)
+        ax.set_title("Number of Interviews by Role", fontsize=14)
+        ax.set_xlabel("Role", fontsize=12)
+        ax.set_ylabel("Number of Interviews", fontsize=12)
+        ax.tick_params(axis="x", labelrotation=45)
+        rendered["charts"]["interview_bar"] = _figure_png(fig)
+
+        # Pie chart for interview distribution by role
+        fig, ax = plt.subplots(figsize=(8, 8))
+        role_counts.plot.pie(autopct='%1.1f%%', ax=ax, legend=False)
+        ax.set_title("Interviews by Role", fontsize=14)
+        rendered["charts"]["interview_pie"] = _figure_png(fig)
+
+    if rollups.get("by_day"):
+        day_counts = pd.Series(rollups["by_day"])
+        day_counts.index = pd.to_datetime(day_counts.index)
+        fig, ax = plt.subplots(figsize=(10, 4))
+        day_counts.sort_index().plot(kind="line", marker="o", color="#ff6347", ax=ax)
+        ax.set_title("Interviews per Day", fontsize=14)
+        ax.set_xlabel("Date", fontsize=12)
+        ax.set_ylabel("Number of Interviews", fontsize=12)
+        rendered["charts"]["interview_days"] = _figure_png(fig)
+    return rendered
 
 
 def display_analytics():
-    # Load data from analytics.json
+    # Load the analytics snapshot plus any events logged since it was written
     try:
-        with open("analytics.json", "r") as file:
-            analytics_data = json.load(file)
-    except FileNotFoundError:
-        st.error("The file 'analytics.json' was not found.")
-        return
+        analytics_data = get_storage().load_analytics()
     except json.JSONDecodeError:
         st.error("Error decoding JSON data. Please check the file format.")
         return
 
-    # Extract role-based data
-    role_data = analytics_data.get("roles", {})
-    
-    if not role_data:  # Check if role_data is empty
+    # Tables and charts are reused until the aggregates actually change
+    aggregates = {"roles": analytics_data.get("roles", {}), "interview_rollups": analytics_data.get("interview_rollups", {})}
+    data_hash = hashlib.sha256(json.dumps(aggregates, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    rendered = render_analytics(data_hash, aggregates)
+
+    role_df = rendered["role_df"]
+    if role_df is None:  # Check if role_data is empty
         st.warning("No role data available.")
         return
-    
-    role_df = pd.DataFrame(role_data).T  # Transpose to make roles rows instead of columns
-    role_df.reset_index(inplace=True)
-    role_df.rename(columns={"index": "Role"}, inplace=True)
 
     # Display role-based table with custom styling
     st.subheader("Role-Based Analytics")
@@ -49,107 +138,162 @@ def display_analytics():
         {'selector': 'tbody td', 'props': [('background-color', '#f9f9f9'), ('color', 'black')]}, 
     ]))
 
-    # Plot role-based bar graph
     st.subheader("Role-Based Bar Graph")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    role_df.set_index("Role")[["total_applicants", "selected_for_test", "passed", "failed"]].plot(
-        kind="bar", ax=ax, color=["#ff9999", "#66b3ff", "#99ff99", "#ffcc99"]
-    )
-    plt.title("Applicants Breakdown by Role", fontsize=14)
-    plt.xlabel("Roles", fontsize=12)
-    plt.ylabel("Number of Applicants", fontsize=12)
-    plt.xticks(rotation=45)
-    plt.legend(title="Metrics")
-    st.pyplot(fig)
+    st.image(rendered["charts"]["role_bar"])
 
-    # Pie chart for applicant distribution
     st.subheader("Applicant Distribution by Role (Pie Chart)")
-    role_applicants = role_df[["Role", "total_applicants"]].set_index("Role")
+    if "role_pie" in rendered["charts"]:
+        st.image(rendered["charts"]["role_pie"])
+    else:
+        # The total_applicants column is empty or all zeros
+        st.warning("No applicants data available for pie chart.")
 
-    # Handle NaN values in the total_applicants column
-    role_applicants["total_applicants"] = role_applicants["total_applicants"].fillna(0)
+    if "interview_bar" in rendered["charts"]:
+        display_interview_history(list(analytics_data["interview_rollups"]["by_role"]))
 
-    # If the total_applicants column is empty or all zeros, show a warning
-    if role_applicants["total_applicants"].sum() == 0:
-        st.warning("No applicants data available for pie chart.")
-    else:
-        fig, ax = plt.subplots(figsize=(8, 8))
-        role_applicants.plot.pie(y="total_applicants", ax=ax, autopct='%1.1f%%', legend=False)
-        plt.title("Total Applicants by Role", fontsize=14)
-        st.pyplot(fig)
-
-    # Extract interview data
-    interviews_data = analytics_data.get("interviews", [])
-    if interviews_data:
-        interview_df = pd.DataFrame(interviews_data)
-
-        # Display interview table with custom styling
-        st.subheader("Scheduled Interviews")
-        st.markdown("<style>table {background-color: #fff0f5;}</style>", unsafe_allow_html=True)
-        st.table(interview_df.style.set_table_styles([ 
-            {'selector': 'thead th', 'props': [('background-color', '#ff6347'), ('color', 'white')]}, 
-            {'selector': 'tbody td', 'props': [('background-color', '#f0e68c'), ('color', 'black')]}, 
-        ]))
-
-        # Plot interview count by role
         st.subheader("Interviews Per Role")
-        role_counts = interview_df["role"].value_counts()
-        fig, ax = plt.subplots(figsize=(8, 5))
-        role_counts.plot(kind="bar", color="skyblue", ax=ax)
-        plt.title("Number of Interviews by Role", fontsize=14)
-        plt.xlabel("Role", fontsize=12)
-        plt.ylabel("Number of Interviews", fontsize=12)
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
+        st.image(rendered["charts"]["interview_bar"])
 
-        # Pie chart for interview distribution by role
         st.subheader("Interview Distribution by Role (Pie Chart)")
-        interview_counts = interview_df["role"].value_counts()
-        fig, ax = plt.subplots(figsize=(8, 8))
-        interview_counts.plot.pie(autopct='%1.1f%%', ax=ax, legend=False)
-        plt.title("Interviews by Role", fontsize=14)
-        st.pyplot(fig)
+        st.image(rendered["charts"]["interview_pie"])
+
+        if "interview_days" in rendered["charts"]:
+            st.subheader("Interviews Per Day")
+            st.image(rendered["charts"]["interview_days"])
     else:
         st.warning("No interviews data available.")
 
-class CustomZoomTool(ZoomTool):
-    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, name: str = "zoom_tool"):
-        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
-        self.token_url = "https://zoom.us/oauth/token"
-        self.access_token = None
-        self.token_expires_at = 0
 
-    def get_access_token(self) -> str:
-        if self.access_token and time.time() < self.token_expires_at:
-            return str(self.access_token)
-            
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        data = {"grant_type": "account_credentials", "account_id": self.account_id}
+def display_interview_history(roles):
+    """Show one filtered page of the interview history; only that page is read from storage."""
+    import pandas as pd
+
+    st.subheader("Scheduled Interviews")
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    with col1:
+        role_filter = st.selectbox("Role", ["All roles"] + sorted(roles), key="interview_role_filter")
+    with col2:
+        date_range = st.date_input("Interview dates", value=(), key="interview_date_filter")
+    with col3:
+        email_filter = st.text_input("Candidate email", key="interview_email_filter").strip()
+    with col4:
+        page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1, key="interview_page_size")
+
+    start_date = date_range[0].isoformat() if len(date_range) > 0 else None
+    end_date = date_range[1].isoformat() if len(date_range) > 1 else start_date
+    filters = (role_filter, start_date, end_date, email_filter, page_size)
+    # Any change to the filters starts again from the first page
+    if st.session_state.get("interview_filters") != filters:
+        st.session_state["interview_filters"] = filters
+        st.session_state["interview_page"] = 1
+
+    page_number = st.session_state["interview_page"]
+    interviews, total = get_storage().query_interviews(
+        role=None if role_filter == "All roles" else role_filter, start_date=start_date, end_date=end_date,
+        email=email_filter or None, offset=(page_number - 1) * page_size, limit=page_size
+    )
+    if not total:
+        st.info("No interviews match these filters.")
+        return
 
-        try:
-            response = requests.post(self.token_url, headers=headers, data=data, auth=(self.client_id, self.client_secret))
-            response.raise_for_status()
+    st.markdown("<style>table {background-color: #fff0f5;}</style>", unsafe_allow_html=True)
+    st.table(pd.DataFrame(interviews).style.set_table_styles([ 
+        {'selector': 'thead th', 'props': [('background-color', '#ff6347'), ('color', 'white')]}, 
+        {'selector': 'tbody td', 'props': [('background-color', '#f0e68c'), ('color', 'black')]}, 
+    ]))
+
+    page_count = (total + page_size - 1) // page_size
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀ Previous", disabled=page_number <= 1, key="interview_prev_page"):
+            st.session_state["interview_page"] = page_number - 1
+            st.rerun()
+    with col2:
+        first = (page_number - 1) * page_size + 1
+        st.caption(f"Showing {first}–{first + len(interviews) - 1} of {total} interviews (page {page_number} of {page_count})")
+    with col3:
+        if st.button("Next ▶", disabled=page_number >= page_count, key="interview_next_page"):
+            st.session_state["interview_page"] = page_number + 1
+            st.rerun()
+
+
+def display_resume_search():
+    import pandas as pd
+
+    st.subheader("Search Resumes")
+    with st.form("resume_search"):
+        query = st.text_input("Skills or keywords", placeholder="e.g. kubernetes go")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            role_filter = st.selectbox("Role", ["All roles"] + list(load_roles().keys()))
+        with col2:
+            period = st.selectbox("Applied within", ["Any time", "Last 7 days", "Last 30 days", "Last 365 days"])
+        with col3:
+            match_all = st.checkbox("Require all terms", value=True)
+        submitted = st.form_submit_button("Search")
+
+    if not submitted or not query.strip():
+        return
+
+    days = {"Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}.get(period)
+    started = time.perf_counter()
+    try:
+        results = resume_index.search(
+            query, limit=50, role=None if role_filter == "All roles" else role_filter, days=days, match_all=match_all
+        )
+    except Exception as e:
+        logger.error(f"Error searching resumes: {e}")
+        st.error("Could not search the resume index.")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
-            token_info = response.json()
-            self.access_token = token_info["access_token"]
-            expires_in = token_info["expires_in"]
-            self.token_expires_at = time.time() + expires_in - 60
+    st.caption(f"{len(results)} matching resumes out of {resume_index.indexed_count()} indexed ({elapsed_ms:.0f} ms)")
+    if results:
+        st.dataframe(pd.DataFrame(results), use_container_width=True, hide_index=True)
+    else:
+        st.info("No resumes match this search.")
 
-            self._set_parent_token(str(self.access_token))
-            return str(self.access_token)
 
-        except requests.RequestException as e:
-            logger.error(f"Error fetching access token: {e}")
-            return ""
+def display_top_candidates():
+    import pandas as pd
 
-    def _set_parent_token(self, token: str) -> None:
-        """Helper method to set the token in the parent ZoomTool class"""
-        if token:
-            self._ZoomTool__access_token = token
+    st.subheader("Top Candidates")
+    roles = load_roles()
+    if not roles:
+        st.info("No roles defined yet.")
+        return
+    role = st.selectbox("Role", list(roles.keys()), key="ranking_role")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Re-rank All Indexed Resumes"):
+            with st.spinner("Scoring every indexed resume against this role..."):
+                scored = ranking.rerank(role, roles[role])
+            st.success(f"Re-ranked {scored} resumes.")
+    with col2:
+        if st.button("📦 Prepare Full Ranking Export"):
+            export_path = ranking.export_path(role)
+            os.makedirs(ranking.RANKINGS_DIR, exist_ok=True)
+            with st.spinner("Ranking every indexed resume..."):
+                with open(export_path, "w") as output:
+                    ranking.export_ranking(role, output, roles[role])
+            st.session_state["ranking_export"] = (role, export_path)
+        export_role, export_path = st.session_state.get("ranking_export") or (None, None)
+        if export_role == role and os.path.exists(export_path):
+            with open(export_path, "rb") as export_file:
+                st.download_button("📥 Download Ranking", export_file, file_name=os.path.basename(export_path),
+                                   mime="application/jsonl")
+
+    candidates = ranking.top_candidates(role)
+    if candidates:
+        st.dataframe(pd.DataFrame(candidates)[["score", "name", "email", "experience_level", "matching_skills", "scored_at"]],
+                     use_container_width=True)
+    else:
+        st.info("No candidates have been scored for this role yet.")
 
 
-# Role requirements as a constant dictionary
-FILE_PATH = "roles.json"
+# Bump when the scoring logic changes so cached analyses are not reused
+SCORER_VERSION = "skill-matcher-1"
 
 # Default roles, which will be added to the file only if it is empty
 ROLE_REQUIREMENTS = {
@@ -182,53 +326,27 @@ ROLE_REQUIREMENTS = {
 }
 
 def load_roles():
-    """Load roles from the file, or return empty dict if the file doesn't exist or is empty."""
-    try:
-        with open(FILE_PATH, "r") as file:
-            roles = json.load(file)
-            if not roles:  # If file is empty, return an empty dict
-                return {}
-            return roles
-    except FileNotFoundError:
-        return {}
+    """Load roles from storage, or return empty dict if there are none."""
+    return get_storage().load_roles()
 
 def save_roles(roles):
-    """Save roles to the file."""
-    with open(FILE_PATH, "w") as file:
-        json.dump(roles, file, indent=4)
+    """Save roles to storage."""
+    get_storage().save_roles(roles)
 
 def load_mcqs(role_choice=""):
-    """Load MCQs for the selected role or all roles from the JSON file."""
-    try:
-        with open("mcqs.json", "r") as file:
-            mcqs_data = json.load(file)
-            if role_choice:
-                return mcqs_data.get(role_choice, [])  # Return MCQs for specific role
-            return mcqs_data if isinstance(mcqs_data, dict) else {}  # Return all roles as a dictionary
-    except FileNotFoundError:
-        return {}  # Return empty dictionary if file is not found
+    """Load MCQs for the selected role or all roles from storage."""
+    if role_choice:
+        return get_storage().load_mcqs(role_choice)  # Return MCQs for specific role
+    return get_storage().load_all_mcqs()  # Return all roles as a dictionary
 
 
 def load_all_mcqs_roles():
-    """Load all roles from the MCQs file."""
-    try:
-        with open("mcqs.json", "r") as file:
-            mcqs_data = json.load(file)
-            return list(mcqs_data.keys())  # Get all role names from MCQs
-    except FileNotFoundError:
-        return []
-def save_mcqs(role_choice, role_mcqs):
-    """Save MCQs for the selected role to the JSON file."""
-    try:
-        with open("mcqs.json", "r") as file:
-            mcqs_data = json.load(file)
-    except FileNotFoundError:
-        mcqs_data = {}
-
-    mcqs_data[role_choice] = role_mcqs
+    """Load all roles that have MCQs."""
+    return get_storage().mcq_roles()
 
-    with open("mcqs.json", "w") as file:
-        json.dump(mcqs_data, file, indent=4)
+def save_mcqs(role_choice, role_mcqs):
+    """Save MCQs for the selected role to storage."""
+    get_storage().save_mcqs(role_choice, role_mcqs)
 
 def manage_roles():
     """Manage roles by allowing add, edit, or delete functionality."""
@@ -249,9 +367,8 @@ def manage_roles():
     )
 
     if role_choice == "Add New Role":
-        # Get existing roles from mcqs.json to display as suggestions
-        existing_roles_in_mcqs = load_mcqs()  # Now it returns a dictionary
-        existing_roles_in_mcqs_keys = list(existing_roles_in_mcqs.keys())  # Get all keys (role names)
+        # Get the roles that already have MCQs to display as suggestions; only the index is read
+        existing_roles_in_mcqs_keys = load_all_mcqs_roles()
 
         # Get the roles already present in roles.json
         existing_roles_in_json = list(st.session_state["custom_roles"].keys())
@@ -329,6 +446,7 @@ def manage_roles():
         if role_choice != "Add New Role":
             edit_mcq_questions(role_choice)
             add_mcq_question(role_choice)
+            bulk_mcq_tools(role_choice)
 
     if not st.session_state["custom_roles"]:
         st.session_state["custom_roles"] = ROLE_REQUIREMENTS.copy()
@@ -336,91 +454,184 @@ def manage_roles():
 
     return st.session_state["custom_roles"]
 
+MCQ_PAGE_SIZES = [10, 25, 50]
+
+def mcq_editor_state(role_choice):
+    """Return the editor's session state for a role: search, page and the pending change set."""
+    key = f"mcq_editor_{role_choice}"
+    if key not in st.session_state:
+        st.session_state[key] = {"search": "", "page": 0, "updates": {}, "deletes": set(), "adds": []}
+    return st.session_state[key]
+
+def apply_mcq_changes(role_mcqs, editor):
+    """Return the role's MCQs with the pending updates, deletions and additions applied."""
+    changed = [
+        editor["updates"].get(mcq["id"], mcq) for mcq in role_mcqs if mcq["id"] not in editor["deletes"]
+    ]
+    return changed + editor["adds"]
+
+def _reset_mcq_page(editor):
+    editor["page"] = 0
+
 def edit_mcq_questions(role_choice):
-    """Edit MCQs for the selected role."""
+    """
+    Edit MCQs for the selected role.
+
+    Only one page of the (searchable) bank is shown as widgets, inside a single form. Edits and
+    deletions are staged in the session and committed together as one save.
+    """
     role_mcqs = load_mcqs(role_choice)
-    
+    editor = mcq_editor_state(role_choice)
+
     # Display the existing MCQs
     st.subheader(f"Existing MCQs for {role_choice}")
-    
-    if not role_mcqs:
+
+    if not role_mcqs and not editor["adds"]:
         st.write("No questions found for this role.")
-    
-    for idx, question in enumerate(role_mcqs):
-        st.markdown(f"### Question {idx + 1}")
-        st.write(f"**Q:** {question['question']}")
-        st.write(f"**Options:** {', '.join(question['options'])}")
-        
-        # Ensure the 'answer' key exists, if not, assign a default value
-        answer = question.get('answer', 'No answer set')
-        st.write(f"**Answer:** {answer}")
-        
-        # Option to edit the question
-        with st.expander(f"Edit Question {idx + 1}"):
 
-            new_question = st.text_input(f"Edit Question {idx + 1}: ", value=question['question'], key=f"question_{idx}")
-            new_options = [st.text_input(f"Option {i + 1}: ", value=opt, key=f"option_{idx}_{i}") for i, opt in enumerate(question['options'])]
-            new_answer = st.selectbox(f"Select Correct Answer for Question {idx + 1}", new_options, key=f"answer_{idx}")
-            
-            if st.button(f"Save Changes to Question {idx + 1}", key=f"save_{idx}"):
-                if new_question.strip() == "" or not new_options or new_answer.strip() == "":
-                    st.error("Please fill in all fields correctly.")
-                else:
-                    # Update the question with new data
-                    role_mcqs[idx] = {"question": new_question, "options": new_options, "answer": new_answer}
-                    save_mcqs(role_choice, role_mcqs)  # Save changes to file
-                    st.success(f"Question {idx + 1} updated successfully.")
-                    st.rerun()  # Rerun to reflect changes immediately
-        
-            # Button to delete the specific MCQ
-            if st.button(f"Delete Question {idx + 1}", key=f"delete_{idx}"):
-                role_mcqs.pop(idx)  # Remove the MCQ at the specified index
-                save_mcqs(role_choice, role_mcqs)  # Save the updated list to file
-                st.success(f"Question {idx + 1} deleted successfully.")
-                st.rerun()  # Rerun to reflect changes immediately
+    search = st.text_input(
+        "Search questions:", key=f"mcq_search_{role_choice}",
+        on_change=_reset_mcq_page, args=(editor,)
+    ).strip().lower()
+    page_size = st.selectbox("Questions per page:", MCQ_PAGE_SIZES, key=f"mcq_page_size_{role_choice}",
+                             on_change=_reset_mcq_page, args=(editor,))
+
+    # Positions are kept so questions are numbered as in the whole bank, not the search results
+    matches = [
+        (position, mcq) for position, mcq in enumerate(role_mcqs)
+        if not search or search in mcq["question"].lower() or any(search in option.lower() for option in mcq["options"])
+    ]
+    page_count = max(1, -(-len(matches) // page_size))
+    editor["page"] = min(editor["page"], page_count - 1)
+    page = matches[editor["page"] * page_size:(editor["page"] + 1) * page_size]
+
+    if matches:
+        with st.form(f"mcq_page_form_{role_choice}"):
+            staged = []
+            for position, stored in page:
+                question = editor["updates"].get(stored["id"], stored)
+                status = " (deleted)" if stored["id"] in editor["deletes"] else " (edited)" if stored["id"] in editor["updates"] else ""
+                with st.expander(f"Question {position + 1}{status}: {question['question'][:60]}"):
+                    widget_key = f"mcq_{role_choice}_{stored['id']}"
+                    new_question = st.text_input("Question:", value=question["question"], key=f"{widget_key}_question")
+                    new_options = [
+                        st.text_input(f"Option {i + 1}: ", value=option, key=f"{widget_key}_option_{i}")
+                        for i, option in enumerate(question["options"])
+                    ]
+                    # The answer is picked by position, so it follows its option if the text is edited
+                    answer_index = question["options"].index(question["answer"]) if question.get("answer") in question["options"] else 0
+                    new_answer_index = st.selectbox(
+                        "Correct answer:", range(len(question["options"])), index=answer_index,
+                        format_func=lambda i, options=question["options"]: options[i], key=f"{widget_key}_answer"
+                    )
+                    delete = st.checkbox("Delete this question", value=stored["id"] in editor["deletes"], key=f"{widget_key}_delete")
+                staged.append((stored, new_question, new_options, new_answer_index, delete))
+
+            if st.form_submit_button("Stage Changes on This Page"):
+                for stored, new_question, new_options, new_answer_index, delete in staged:
+                    if delete:
+                        editor["deletes"].add(stored["id"])
+                        continue
+                    editor["deletes"].discard(stored["id"])
+                    if new_question.strip() == "" or any(option.strip() == "" for option in new_options):
+                        st.error(f"Question {stored['question'][:40]!r} has empty fields and was not staged.")
+                        continue
+                    edited = {"id": stored["id"], "question": new_question, "options": new_options, "answer": new_options[new_answer_index]}
+                    if any(edited[field] != stored.get(field) for field in ("question", "options", "answer")):
+                        editor["updates"][stored["id"]] = edited
+                    else:
+                        editor["updates"].pop(stored["id"], None)
+                st.rerun()
+
+        previous_page, page_label, next_page = st.columns([1, 2, 1])
+        if previous_page.button("◀", key=f"mcq_prev_{role_choice}", disabled=editor["page"] == 0):
+            editor["page"] -= 1
+            st.rerun()
+        page_label.caption(f"Page {editor['page'] + 1} of {page_count} ({len(matches)} questions)")
+        if next_page.button("▶", key=f"mcq_next_{role_choice}", disabled=editor["page"] >= page_count - 1):
+            editor["page"] += 1
+            st.rerun()
+    elif search:
+        st.write("No questions match the search.")
+
+    # The staged changes are written in one diff-based save
+    pending = len(editor["updates"]) + len(editor["deletes"]) + len(editor["adds"])
+    if pending:
+        st.info(
+            f"Pending changes: {len(editor['updates'])} edited, {len(editor['deletes'])} deleted, "
+            f"{len(editor['adds'])} added."
+        )
+        commit, discard = st.columns(2)
+        if commit.button("Save All Changes", key=f"mcq_commit_{role_choice}"):
+            save_mcqs(role_choice, apply_mcq_changes(role_mcqs, editor))
+            st.session_state.pop(f"mcq_editor_{role_choice}", None)
+            st.success(f"Saved {pending} MCQ changes for '{role_choice}'.")
+            st.rerun()
+        if discard.button("Discard Changes", key=f"mcq_discard_{role_choice}"):
+            editor["updates"].clear()
+            editor["deletes"].clear()
+            editor["adds"].clear()
+            st.rerun()
 
 def add_mcq_question(role_choice):
-    """Add a new MCQ question for the selected role."""
+    """Stage a new MCQ question for the selected role; it is saved with the other pending changes."""
     st.sidebar.subheader(f"Add New MCQ for {role_choice}")
-    
-    # Ensure that all four options are filled before proceeding
-    new_question = st.text_input("Enter the new question:", key=f"new_question_{role_choice}")
-    
-    # MCQ options
-    option_1 = st.text_input("Option 1:", key=f"option_1_{role_choice}")
-    option_2 = st.text_input("Option 2:", key=f"option_2_{role_choice}")
-    option_3 = st.text_input("Option 3:", key=f"option_3_{role_choice}")
-    option_4 = st.text_input("Option 4:", key=f"option_4_{role_choice}")
-
-    # Correct option
-    correct_option = st.selectbox(
-        "Select the correct option:",
-        ["Option 1", "Option 2", "Option 3", "Option 4"],
-        key=f"correct_option_{role_choice}"
-    )
 
-    # Validate that all fields are filled
-    if st.button("Add MCQ"):
-        if not new_question or not option_1 or not option_2 or not option_3 or not option_4:
-            st.error("Please fill in all fields before adding the MCQ.")
-        else:
-            # Create the MCQ question object
-            mcq_question = {
-                "question": new_question,
-                "options": [option_1, option_2, option_3, option_4],
-                "answer": correct_option  # Fix the key from "correct_option" to "answer"
-            }
+    with st.form(f"add_mcq_form_{role_choice}", clear_on_submit=True):
+        new_question = st.text_input("Enter the new question:", key=f"new_question_{role_choice}")
 
-            # Load existing MCQs for the role
-            role_mcqs = load_mcqs(role_choice)
-            
-            # Add the new question to the list of MCQs for the role
-            role_mcqs.append(mcq_question)
+        # MCQ options
+        options = [st.text_input(f"Option {i}:", key=f"option_{i}_{role_choice}") for i in range(1, 5)]
 
-            # Save the updated MCQs back to the file
-            save_mcqs(role_choice, role_mcqs)
-            st.success(f"MCQ added for role '{role_choice}' successfully!")
-            st.rerun()  # Rerun to reflect changes immediately
+        # Correct option
+        correct_option = st.selectbox(
+            "Select the correct option:",
+            range(4),
+            format_func=lambda i: f"Option {i + 1}",
+            key=f"correct_option_{role_choice}"
+        )
+
+        # Validate that all fields are filled
+        if st.form_submit_button("Add MCQ"):
+            if not new_question or not all(options):
+                st.error("Please fill in all fields before adding the MCQ.")
+            else:
+                # The answer is stored as the option's text, which is what scoring compares against
+                mcq_editor_state(role_choice)["adds"].append(
+                    {"question": new_question, "options": options, "answer": options[correct_option]}
+                )
+                st.rerun()
+
+def bulk_mcq_tools(role_choice):
+    """Import MCQs for the selected role from a CSV or JSONL file, and export its bank."""
+    st.sidebar.subheader(f"Bulk Import / Export for {role_choice}")
+
+    with st.form(f"mcq_import_form_{role_choice}", clear_on_submit=True):
+        import_file = st.file_uploader("MCQ file (CSV or JSONL)", type=["csv", "jsonl"], key=f"mcq_import_file_{role_choice}")
+        dry_run = st.checkbox("Only validate, don't import", key=f"mcq_import_dry_run_{role_choice}")
+        if st.form_submit_button("Import MCQs") and import_file:
+            # Rows are validated and deduplicated as they stream in, then stored in one write
+            text = io.TextIOWrapper(io.BytesIO(import_file.getvalue()), encoding="utf-8-sig", newline="")
+            report = mcq_import.import_file(text, mcq_import.detect_format(import_file.name), role_choice, dry_run)
+            st.session_state[f"mcq_import_report_{role_choice}"] = report
+
+    report = st.session_state.get(f"mcq_import_report_{role_choice}")
+    if report:
+        imported = sum(report["imported"].values())
+        st.info(
+            f"{'Would import' if report['dry_run'] else 'Imported'} {imported} of {report['rows']} rows: "
+            f"{report['duplicates']} duplicates, {report['invalid']} invalid."
+        )
+        for line_number, error in report["errors"][:10]:
+            st.caption(f"Line {line_number}: {error}")
+
+    export_format = st.selectbox("Export format:", ["jsonl", "csv"], key=f"mcq_export_format_{role_choice}")
+    if st.button("📦 Prepare MCQ Export", key=f"mcq_export_{role_choice}"):
+        st.session_state["mcq_export"] = (role_choice, export_format, mcq_import.export_text(export_format, [role_choice]))
+    export = st.session_state.get("mcq_export")
+    if export and export[:2] == (role_choice, export_format):
+        st.download_button("📥 Download MCQs", export[2], file_name=f"{role_choice}_mcqs.{export_format}",
+                           mime="text/csv" if export_format == "csv" else "application/jsonl")
 
 def schedule_meeting():
     """
@@ -439,6 +650,14 @@ def schedule_meeting():
         st.session_state["scheduled_datetime"] = scheduled_datetime
         st.success(f"Meeting scheduled for: {scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
 
+        # With interviewer calendars loaded, warn when nobody could actually take the interview
+        if availability.has_interviewers():
+            free = availability.free_interviewers(scheduled_datetime)
+            if free:
+                st.sidebar.caption(f"Free interviewers: {', '.join(free)}")
+            else:
+                st.warning("No interviewer is free at this time. Candidates will be asked to pick another slot.")
+
     # Display scheduled date and time if already set
     if "scheduled_datetime" in st.session_state:
         st.sidebar.info(
@@ -448,12 +667,56 @@ def schedule_meeting():
 
 
 
+def manage_interviewers():
+    """
+    Sidebar section for the interviewers' calendars, imported from .ics files.
+
+    Once any interviewer is loaded, candidates are offered the slots some interviewer is free for
+    instead of the predefined slots.
+    """
+    st.sidebar.subheader("Interviewer Availability")
+    interviewers = availability.interviewers()
+    if interviewers:
+        for name, email in interviewers.items():
+            st.sidebar.write(f"- {name}" + (f" ({email})" if email else ""))
+        st.sidebar.caption(f"{len(availability.bookable_slots())} bookable slots in the next {availability.HORIZON_DAYS} days")
+    else:
+        st.sidebar.info("No interviewer calendars loaded; candidates pick from the predefined slots.")
+
+    with st.sidebar.form("import_calendar_form"):
+        calendar_file = st.file_uploader("Interviewer calendar (.ics)", type=["ics"], key="calendar_file")
+        interviewer_name = st.text_input("Interviewer name (defaults to the file name):", key="interviewer_name")
+        interviewer_email = st.text_input("Interviewer email:", key="interviewer_email")
+        import_calendar = st.form_submit_button("Import Calendar")
+
+        if import_calendar and calendar_file:
+            name = interviewer_name.strip() or os.path.splitext(calendar_file.name)[0]
+            try:
+                calendar = availability.parse_ics(calendar_file.getvalue().decode("utf-8"))
+            except (UnicodeDecodeError, ValueError) as e:
+                st.sidebar.error(f"Could not read the calendar: {e}")
+            else:
+                email = interviewer_email.strip() or availability.interviewer_email(name)
+                availability.set_interviewer(name, email, calendar["busy"], calendar["free"])
+                st.rerun()
+
+    if os.path.isdir(availability.CALENDARS_DIR) and st.sidebar.button(f"Import calendars from {availability.CALENDARS_DIR}/"):
+        availability.import_calendars()
+        st.rerun()
+
+    if interviewers:
+        interviewer_to_remove = st.sidebar.selectbox("Remove Interviewer:", options=list(interviewers), key="remove_interviewer")
+        if st.sidebar.button("Remove Interviewer"):
+            availability.remove_interviewer(interviewer_to_remove)
+            st.rerun()
+
+
 def init_session_state() -> None:
     """Initialize only necessary session state variables."""
     defaults = {
-        'candidate_email': "", 'openai_api_key': "", 'recruiter_email': "" ,'resume_text': "", 'analysis_complete': False,
+        'candidate_email': "", 'openai_api_key': "", 'llm_screening': False, 'recruiter_email': "" ,'resume_text': "", 'analysis_complete': False,
         'is_selected': False, 'zoom_account_id': "", 'zoom_client_id': "", 'zoom_client_secret': "",
-        'email_sender': "", 'email_passkey': "", 'company_name': "", 'current_pdf': None,
+        'email_sender': "", 'email_passkey': "", 'company_name': "", 'current_pdf': None, 'resume_bytes': None,
         'time_change_requested': False, 'scheduled_datetime': None, 'proceed_app' : False, 'test_conducted' : False,
         'check_it' : False, 'no_button' : False, 'time_and_date' : False, 'check_again' : False, 'fragment' : False, 'go_ahead' : False, 'session_to_proceed' : False,
         'show_analytics' : False
@@ -463,31 +726,93 @@ def init_session_state() -> None:
             st.session_state[key] = value
 
 
-def extract_text_from_pdf(pdf_file) -> str:
+def index_resume(pdf_digest: str, resume_text: str, name: str = "", role: str = "") -> None:
+    # The search index is a convenience; failing to update it must not block the application
     try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
+        resume_index.index_resume(pdf_digest, resume_text, name=name, role=role)
+    except Exception as e:
+        logger.error(f"Error indexing resume: {e}")
+
+
+def tag_indexed_resume(pdf_bytes, **fields) -> None:
+    # Attach details only known after extraction (such as the candidate's email) to the indexed resume
+    try:
+        resume_index.update_resume(resume_cache.sha256(pdf_bytes), **fields)
+    except Exception as e:
+        logger.error(f"Error updating indexed resume: {e}")
+
+
+def extract_text_from_pdf(pdf_file, parallel: bool = False, name: str = "", role: str = "") -> str:
+    try:
+        if isinstance(pdf_file, (bytes, memoryview)):
+            pdf_bytes = pdf_file
+        else:
+            pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+
+        # Identical PDFs are only ever parsed once
+        pdf_digest = resume_cache.sha256(pdf_bytes)
+        cached_text = resume_cache.get_text(pdf_digest)
+        if cached_text is not None:
+            index_resume(pdf_digest, cached_text, name, role)
+            return cached_text
+
+        from pdf_extraction import extract_pdf_text
+
+        # Pages are streamed within page, size and time budgets and joined once
+        text, report = extract_pdf_text(pdf_bytes, parallel=parallel)
+        logger.info(
+            f"Extracted {report['pages']}/{report['total_pages']} pages in {report['seconds']}s "
+            f"(slowest page {max(report['page_seconds'], default=0)}s, truncated: {report['truncated']})"
+        )
+        if text:
+            resume_cache.put_text(pdf_digest, text)
+            index_resume(pdf_digest, text, name, role)
         return text
     except Exception as e:
         st.error(f"Error extracting PDF text: {str(e)}")
         return ""
 
 
+def analyze_resume_details(resume_text: str, role, name: str = "", email: str = "",
+                           api_key: Optional[str] = None) -> Dict:
+    """
+    Score a resume against the role's criteria and return the full analysis dict.
+
+    With an API key the resume is screened by the LLM, otherwise by the local skill matcher.
+    """
+    criteria = load_roles().get(role) or ROLE_REQUIREMENTS.get(role, "")
+
+    if api_key:
+        from llm_screening import get_screener
+
+        # Cached by (resume, criteria, model), so the same resume is never sent twice
+        response = get_screener(api_key).analyze(resume_text, criteria, role)
+    else:
+        # Reuse the result for the same resume text, role criteria and scorer
+        cache_key = resume_cache.analysis_key(resume_text, criteria, SCORER_VERSION)
+        response = resume_cache.get_analysis(cache_key)
+        if response is None:
+            # Local skill matching: one linear pass over the resume, no LLM call
+            response = score_resume(resume_text, criteria, role)
+            resume_cache.put_analysis(cache_key, response)
+
+    # Offer the candidate to the role's top-K ranking
+    try:
+        ranking.record_score(role, criteria, resume_text, response, name=name, email=email)
+    except Exception as e:
+        logger.error(f"Error updating the {role} ranking: {e}")
+    return response
+
+
 def analyze_resume(
     resume_text: str,
-    role
+    role,
+    name: str = "",
+    email: str = "",
+    api_key: Optional[str] = None
 ) -> Tuple[bool, str]:
     try:
-        # Manual response
-        response = {
-            "selected": True,
-            "feedback": "The candidate meets over 70% of the required skills for the AI/ML Engineer role...",
-            "matching_skills": ["Python", "Machine Learning", "Deep Learning", "Flask Framework", "DBMS", "C++"],
-            "missing_skills": ["TensorFlow", "PyTorch", "Natural Language Processing", "Cloud Computing", "DevOps"],
-            "experience_level": "junior"
-        }
+        response = analyze_resume_details(resume_text, role, name, email, api_key)
 
         # Directly return the values as a tuple
         return response["selected"], response["feedback"]
@@ -497,8 +822,8 @@ def analyze_resume(
         return False, f"Error analyzing resume: {str(e)}"
 
 
-def send_selection_email(sender_email, sender_password, receiver_email, role, company) -> None:
-    """Send an email with the given subject and body."""
+def send_selection_email(sender_email, sender_password, receiver_email, role, company) -> str:
+    """Queue the selection email in the outbox and return its message id."""
     
     # Constructing the subject and body of the email
     subject = f"Congratulations! You have been selected for the {role} role"
@@ -524,15 +849,12 @@ def send_selection_email(sender_email, sender_password, receiver_email, role, co
     msg["From"] = sender_email
     msg["To"] = receiver_email
 
-    # Sending the email through Gmail's SMTP server
-    with smtplib.SMTP("smtp.gmail.com", 587) as server:
-        server.starttls()  # Start TLS encryption
-        server.login(sender_email, sender_password)  # Login with the sender's credentials
-        server.sendmail(sender_email, receiver_email, msg.as_string())  # Send the email
+    # The background sender delivers it over a reused SMTP connection
+    return enqueue_email(msg, sender_email, sender_password, [receiver_email])
 
 
-def send_rejection_email(sender_email, sender_password, receiver_email, role, company) -> None:
-    """Send an email with the given subject and body."""
+def send_rejection_email(sender_email, sender_password, receiver_email, role, company) -> str:
+    """Queue the rejection email in the outbox and return its message id."""
     
     # Constructing the subject and body of the rejection email
     subject = f"Regarding your application for the {role} role"
@@ -558,11 +880,8 @@ def send_rejection_email(sender_email, sender_password, receiver_email, role, co
     msg["From"] = sender_email
     msg["To"] = receiver_email
 
-    # Sending the email through Gmail's SMTP server
-    with smtplib.SMTP("smtp.gmail.com", 587) as server:
-        server.starttls()  # Start TLS encryption
-        server.login(sender_email, sender_password)  # Login with the sender's credentials
-        server.sendmail(sender_email, receiver_email, msg.as_string())  # Send the email
+    # The background sender delivers it over a reused SMTP connection
+    return enqueue_email(msg, sender_email, sender_password, [receiver_email])
  
 
 logging.basicConfig(level=logging.INFO)
@@ -570,72 +889,105 @@ logger = logging.getLogger(__name__)
 def schedule_interview(
     zoom_acc_id, zoom_client_id, zoom_secret, sender_email, 
     sender_password, receiver_email, recruiter_email, role: str, company: str, local_timezone: str
-) -> None:
+) -> Optional[str]:
+    """Submit the interview scheduling pipeline as a background job and return its job id."""
+    st.session_state["schedule_job_id"] = None
     try:
         # Ensure the date and time for scheduling are set
-        if "scheduled_datetime" not in st.session_state:
+        if not st.session_state.get("scheduled_datetime"):
             st.error("Please schedule a date and time for the interview first!")
-            return
+            return None
         
         # Step 1: Show the allocated interview time
         st.subheader("Interview Date & Time Allocation")
-        
-        # Check if the interview time has already been scheduled by the recruiter
-        if 'scheduled_datetime' not in st.session_state:
-            st.error("No interview time allocated by the recruiter yet.")
-            return
 
         # Show the allocated interview date and time
         scheduled_datetime = st.session_state['scheduled_datetime']
+
+        # A self-scheduled slot is booked atomically, so two candidates can never get the same one
+        reserved_slot = st.session_state.get("selected_slot")
+        if reserved_slot != slots.format_slot(scheduled_datetime):
+            reserved_slot = None
+        interviewer = None
+        if availability.has_interviewers():
+            # With interviewer calendars, any time is booked against an interviewer who is free then
+            reserved_slot = slots.format_slot(scheduled_datetime)
+            interviewer = availability.reserve(reserved_slot, receiver_email)
+            if interviewer is None:
+                st.session_state["schedule_error"] = f"No interviewer is free at {reserved_slot} any more. Please pick another time."
+                st.session_state["selected_slot"] = None
+                return None
+        elif reserved_slot and not slots.reserve_slot(reserved_slot, receiver_email):
+            st.session_state["schedule_error"] = f"The slot {reserved_slot} was just booked by someone else. Please pick another time."
+            st.session_state["selected_slot"] = None
+            return None
+
         st.write(f"Your interview is scheduled for {scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')} ({local_timezone})")
 
+        # The Zoom, email and analytics steps run on the job pool so the script returns right away
+        job_id = submit_job(
+            "schedule_interview", run_interview_scheduling,
+            zoom_acc_id, zoom_client_id, zoom_secret, sender_email, sender_password,
+            receiver_email, recruiter_email, role, company, local_timezone, scheduled_datetime, reserved_slot,
+            interviewer
+        )
+        st.session_state["schedule_job_id"] = job_id
+        return job_id
+
+    except Exception as e:
+        logger.error(f"Error scheduling interview: {str(e)}")
+        st.error("Unable to schedule interview. Please try again.")
+        return None
+
+
+def run_interview_scheduling(
+    job, zoom_acc_id, zoom_client_id, zoom_secret, sender_email, sender_password,
+    receiver_email, recruiter_email, role: str, company: str, local_timezone: str, scheduled_datetime: datetime,
+    reserved_slot: Optional[str] = None, interviewer: Optional[str] = None
+) -> Dict:
+    """
+    Background job: create the Zoom meeting, then queue the email and log the interview concurrently.
+
+    If the meeting can't be created, the booked slot or interviewer (if any) is released again.
+    """
+
+    def create_meeting() -> str:
         # Convert the scheduled datetime to UTC for Zoom API
         local_tz = pytz.timezone(local_timezone)
         local_dt = local_tz.localize(scheduled_datetime, is_dst=None)
         utc_dt = local_dt.astimezone(pytz.utc)
         meeting_time_iso = utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ")  # ISO 8601 format
 
-        # Step 2: Get Zoom OAuth token
-        zoom_token_url = "https://zoom.us/oauth/token"
-        zoom_payload = {
-            'grant_type': 'account_credentials',
-            'account_id': zoom_acc_id
-        }
-        auth = (zoom_client_id, zoom_secret)
-
-        token_response = requests.post(zoom_token_url, data=zoom_payload, auth=auth)
-        token_response.raise_for_status()
-        access_token = token_response.json().get('access_token')
-        if not access_token:
-            raise ValueError("Failed to fetch Zoom access token.")
-
-        # Step 3: Schedule a Zoom meeting
-        zoom_meeting_url = "https://api.zoom.us/v2/users/me/meetings"
-        meeting_details = {
-            "topic": f"Interview for {role}",
-            "type": 2,  # Scheduled meeting
-            "start_time": meeting_time_iso,
-            "duration": 60,  # Meeting duration in minutes
-            "timezone": "UTC",
-            "settings": {
+        from zoom_client import get_zoom_client
+
+        # Schedule a Zoom meeting; the shared client reuses its cached token and connection
+        zoom_client = get_zoom_client(zoom_acc_id, zoom_client_id, zoom_secret)
+        meeting_data = zoom_client.create_meeting(
+            topic=f"Interview for {role}",
+            start_time=meeting_time_iso,
+            duration=60,  # Meeting duration in minutes
+            timezone="UTC",
+            settings={
                 "join_before_host": True,
                 "waiting_room": False
             }
-        }
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-
-        meeting_response = requests.post(zoom_meeting_url, json=meeting_details, headers=headers)
-        meeting_response.raise_for_status()
-        meeting_data = meeting_response.json()
+        )
         meeting_link = meeting_data.get('join_url')
 
         if not meeting_link:
             raise ValueError("Failed to schedule Zoom meeting.")
+        return meeting_link
 
-        # Step 4: Send email with meeting details
+    try:
+        meeting_link = job.run_steps(meeting=create_meeting)["meeting"]
+    except Exception:
+        if interviewer:
+            availability.release(reserved_slot, interviewer)
+        elif reserved_slot:
+            slots.release_slot(reserved_slot)
+        raise
+
+    def send_interview_email() -> str:
         subject = f"Interview Scheduled for {role} at {company}"
         body = f"""
         Dear Candidate,
@@ -662,45 +1014,38 @@ def schedule_interview(
 
         # Properly format multiple recipients
         recipients = [receiver_email, recruiter_email]
+        interviewer_email = availability.interviewer_email(interviewer) if interviewer else ""
+        if interviewer_email:
+            recipients.append(interviewer_email)
         message = MIMEMultipart()
         message['From'] = sender_email
         message['To'] = ", ".join(recipients)  # Correctly format the To field
         message['Subject'] = subject
         message.attach(MIMEText(body, 'plain'))
 
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(message)
+        return enqueue_email(message, sender_email, sender_password, recipients)
 
-        # Step 5: Update analytics.json with interview details
-        analytics_file = "analytics.json"
-        try:
-            with open(analytics_file, "r") as file:
-                analytics_data = json.load(file)
-        except FileNotFoundError:
-            analytics_data = {"roles": {}, "interviews": []}
-        except json.JSONDecodeError:
-            analytics_data = {"roles": {}, "interviews": []}
-
-        # Add the interview details to the analytics data
-        interview_details = {
-            "email": receiver_email,
-            "role": role,
-            "time": scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-            "link": meeting_link
-        }
-        analytics_data["interviews"].append(interview_details)
+    def log_interview() -> None:
+        get_storage().record_event(
+            "interview", role,
+            email=receiver_email,
+            time=scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+            link=meeting_link
+        )
 
-        # Save the updated analytics data
-        with open(analytics_file, "w") as file:
-            json.dump(analytics_data, file, indent=4)
+    # The email and the analytics write only need the meeting link, so they run side by side
+    results = job.run_steps(email=send_interview_email, analytics=log_interview)
+    return {"meeting_link": meeting_link, "email_id": results["email"]}
 
-        st.success("Interview scheduled successfully!")
 
-    except Exception as e:
-        logger.error(f"Error scheduling interview: {str(e)}")
-        st.error("Unable to schedule interview. Please try again.")
+@st.fragment(run_every=1)
+def show_schedule_progress(job_id: str) -> None:
+    """Poll the scheduling job every second and rerun the app once it has finished."""
+    job = get_job(job_id)
+    if job is None or job["status"] not in ("queued", "running"):
+        st.rerun()
+    steps = ", ".join(f"{name}: {status}" for name, status in job["steps"].items())
+    st.info(f"📅 Scheduling your interview... {steps}")
 
 
 def ask_for_time_change():
@@ -737,22 +1082,24 @@ def update_meeting_schedule():
     """
     st.sidebar.subheader("Update Meeting Schedule")
 
-    # Load predefined available times from the JSON file
-    with open(
-        r"predefined_times.json",
-        "r",
-    ) as file:
-        predefined_data = json.load(file)
-
-    available_times = predefined_data.get("available_times", [])
-    available_times_formatted = [datetime.strptime(t, "%Y-%m-%d %H:%M:%S") for t in available_times]
+    # Only future slots that nobody has booked yet are offered; with interviewer calendars
+    # loaded, those are the slots at least one interviewer is actually free for
+    if availability.has_interviewers():
+        upcoming_slots = availability.bookable_slots()
+    else:
+        upcoming_slots = slots.slot_index().upcoming()
+    if not upcoming_slots:
+        st.warning("There are no open interview slots right now. Please keep the assigned time or check back later.")
+        st.session_state["selected_slot"] = None
 
     # Display available times in a dropdown
     selected_time = st.selectbox(
         "Select a new meeting date and time:",
-        options=available_times_formatted,
+        options=[slots.parse_slot(slot) for slot in upcoming_slots],
         format_func=lambda x: x.strftime("%Y-%m-%d %H:%M:%S"),
     )
+    if selected_time:
+        st.session_state["selected_slot"] = slots.format_slot(selected_time)
 
     # Update session state if a selection is made
     if selected_time:
@@ -771,110 +1118,86 @@ def update_meeting_schedule():
 
 def conduct_test_and_evaluate(role_choice):
     """Conducts the assessment test for the candidate and returns True if passed, False otherwise."""
-    # Load MCQs for the selected role
-    role_mcqs = load_mcqs(role_choice)
-    if not role_mcqs:
+    # The questions are drawn once per test from the role's compiled bank and kept in the session,
+    # so reruns never reload the bank and always show the same questions
+    test_state_key = f"{role_choice}_test_state"
+    test_state = st.session_state.get(test_state_key)
+    if test_state is None:
+        test_state = st.session_state[test_state_key] = mcq_tests.start_test(role_choice)
+
+    if not test_state["questions"]:
         st.error("No MCQs available for this role.")
         return True
 
-    # Initialize session state variables for the test
-    test_state_key = f"{role_choice}_test_state"
-    if test_state_key not in st.session_state:
-        st.session_state[test_state_key] = {
-            "progress": 0,
-            "answers": [],
-            "completed": False
-        }
-
-    test_state = st.session_state[test_state_key]
     progress = test_state["progress"]
+    total_questions = len(test_state["questions"])
 
     if not test_state["completed"]:
         # Get the current question
-        current_question = role_mcqs[progress]
+        current_question = test_state["questions"][progress]
 
-        # Display the question
-        st.write(f"Question {progress + 1}: {current_question['question']}")
+        # Display the question; answers are kept as option indices
+        st.write(f"Question {progress + 1} of {total_questions}: {current_question.text}")
         selected_option = st.radio(
             label="Choose your answer:",
-            options=current_question['options'],
+            options=range(len(current_question.options)),
+            format_func=lambda index: current_question.options[index],
             key=f"{role_choice}_test_question_{progress}"  # Unique key for each question
         )
 
         # Button to submit the current answer
         if st.button("Submit Answer", key=f"{role_choice}_submit_button_{progress}"):
-            if not selected_option:
+            if selected_option is None:
                 st.warning("Please select an answer before proceeding.")
             else:
-                # Record the selected answer
-                test_state["answers"].append(selected_option)
-
-                # Move to the next question or complete the test
-                if progress + 1 < len(role_mcqs):
-                    test_state["progress"] += 1
-                    st.rerun()
-                else:
-                    # Test completed
-                    test_state["completed"] = True
-                    st.rerun()
+                # Record the answer; after the last one the attempt is scored and stored once
+                mcq_tests.answer_question(test_state, selected_option, st.session_state.get("candidate_email", ""))
+                st.rerun()
 
-    # After all questions are answered, evaluate the result
+    # After all questions are answered, show the result
     if test_state["completed"]:
-        correct_answers = 0
-        candidate_answers = test_state["answers"]
-
-        # Calculate the score
-        for i, mcq in enumerate(role_mcqs):
-            if mcq["answer"] == candidate_answers[i]:
-                correct_answers += 1
-
-        total_questions = len(role_mcqs)
-        passing_score = 0.7  # 70%
-        score_percentage = (correct_answers / total_questions) * 100
+        result = test_state["result"]
 
         # Display the result
-        st.write(f"Test completed! You answered {correct_answers} out of {total_questions} questions correctly.")
-        st.write(f"Your score: {score_percentage:.2f}%")
+        st.write(f"Test completed! You answered {result['correct']} out of {result['total']} questions correctly.")
+        st.write(f"Your score: {result['score'] * 100:.2f}%")
 
         st.session_state.test_conducted = True
-        if score_percentage >= (passing_score * 100):
+        if result["passed"]:
             st.success("You have passed the test!")
             return True
         else:
             st.error("You did not pass the test.")
             return False
 
+def show_email_status(message_id_key, label):
+    """Show the outbox status (queued, sent or failed) of an email whose id is kept in session state."""
+    message_id = st.session_state.get(message_id_key)
+    if message_id:
+        st.caption(f"{label}: {message_status(message_id)}")
+
 def update_analytics(role, test_result):
     """
-    Updates the analytics.json file based on the test result.
+    Records a test result in the analytics event log.
 
     Args:
         role (str): The role of the candidate.
         test_result (bool): True if the candidate passed the test, False otherwise.
     """
-    try:
-        with open('analytics.json', 'r') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        data = {"roles": {}, "interviews": []}
+    # selected_for_test and passed/failed are incremented when the event is folded in
+    get_storage().record_event("test", role, passed=bool(test_result))
 
-    # Ensure the role exists in the data
-    if role not in data["roles"]:
-        data["roles"][role] = {"total_applicants": 0, "selected_for_test": 0, "passed": 0, "failed": 0}
 
-    # Increment selected_for_test
-    data["roles"][role]["selected_for_test"] += 1
+def record_applicants(role, count=1):
+    """
+    Adds `count` applicants to the role's total_applicants counter.
 
-    # Increment passed or failed count based on the test result
-    if test_result:
-        data["roles"][role]["passed"] += 1
-    else:
-        data["roles"][role]["failed"] += 1
+    Args:
+        role (str): The role the candidates applied for.
+        count (int): Number of new applicants to record.
+    """
+    get_storage().record_event("applicant", role, count=count)
 
-    # Write the updated data back to the analytics.json file
-    with open('analytics.json', 'w') as f:
-        json.dump(data, f, indent=4)
-        
 def main() -> None:
     st.title("AI Recruitment System")
 
@@ -890,6 +1213,8 @@ def main() -> None:
         st.subheader("OpenAI Settings")
         api_key = st.text_input("OpenAI API Key", type="password", value=st.session_state.openai_api_key, help="Get your API key from platform.openai.com")
         if api_key: st.session_state.openai_api_key = api_key
+        st.session_state.llm_screening = st.checkbox("Screen resumes with the LLM", value=st.session_state.llm_screening,
+                                                     help="Use the model instead of the local skill matcher")
 
         st.subheader("Zoom Settings")
         zoom_account_id = st.text_input("Zoom Account ID", type="password", value=st.session_state.zoom_account_id)
@@ -940,22 +1265,18 @@ def main() -> None:
         st.sidebar.subheader("Manage Interview Slots")
         st.subheader("Available Slots for Self-Scheduling Interviews")
 
-        # Define the path to the predefined times file
-        predefined_times_path = r"predefined_times.json"
-
-        # Load available times into session state
-        if "available_times" not in st.session_state:
-            try:
-                with open(predefined_times_path, "r") as file:
-                    predefined_data = json.load(file)
-                    st.session_state.available_times = predefined_data.get("available_times", [])
-            except FileNotFoundError:
-                st.session_state.available_times = []
+        # Slots are read from storage and each change is written straight through, only when it changes something
+        available_slots = slots.slot_index()
+        booked_slots = slots.reservations()
 
         # Display current available slots
         st.write("Current Available Slots:")
-        for i, slot in enumerate(st.session_state.available_times):
+        for i, slot in enumerate(available_slots.slots):
             st.write(f"{i + 1}. {slot}")
+        if booked_slots:
+            st.write("Booked Slots:")
+            for slot in sorted(booked_slots):
+                st.write(f"- {slot} ({booked_slots[slot].get('holder') or 'unknown'})")
 
         # Add a new slot
         with st.form("add_slot_form"):
@@ -966,34 +1287,25 @@ def main() -> None:
 
             if add_slot and new_date and new_time:
                 new_slot = f"{new_date} {new_time}"
-                if new_slot not in st.session_state.available_times:
-                    st.session_state.available_times.append(new_slot)
+                if slots.add_slot(new_slot):
                     st.rerun()
-                    st.success(f"Slot {new_slot} added successfully!")
                 else:
-                    st.rerun()
                     st.warning("This slot already exists.")
                 
         # Remove an existing slot
-        if st.session_state.available_times:
+        if available_slots:
             st.write("Remove an Existing Slot")
             with st.form("remove_slot_form"):
-                slot_to_remove = st.selectbox("Select Slot to Remove:", options=st.session_state.available_times, key="remove_slot")
+                slot_to_remove = st.selectbox("Select Slot to Remove:", options=available_slots.slots, key="remove_slot")
                 remove_slot = st.form_submit_button("Remove Slot")
 
                 if remove_slot and slot_to_remove:
-                    st.session_state.available_times.remove(slot_to_remove)
+                    slots.remove_slot(slot_to_remove)
                     st.rerun()
-                    st.success(f"Slot {slot_to_remove} removed successfully!")
         else:
             st.info("Add time slots for self-scheduling.")
 
-        # Save updated slots to the JSON file
-        with open(predefined_times_path, "w") as file:
-            json.dump({"available_times": st.session_state.available_times}, file, indent=4)
-
-        st.write("Changes saved successfully!")
-
+        manage_interviewers()
 
         required_configs = {'OpenAI API Key': st.session_state.openai_api_key, 'Zoom Account ID': st.session_state.zoom_account_id,
                           'Zoom Client ID': st.session_state.zoom_client_id, 'Zoom Client Secret': st.session_state.zoom_client_secret,
@@ -1003,6 +1315,8 @@ def main() -> None:
 
     if st.session_state["show_analytics"]:
         display_analytics()
+        display_top_candidates()
+        display_resume_search()
 
     missing_configs = [k for k, v in required_configs.items() if not v]
     if missing_configs:
@@ -1025,47 +1339,40 @@ def main() -> None:
             for flag in reset_flags:
                 st.session_state[flag] = False
             # Clear only the application-related states
-            keys_to_clear = ['resume_text', 'analysis_complete', 'is_selected', 'candidate_email', 'current_pdf']
+            keys_to_clear = ['resume_text', 'analysis_complete', 'is_selected', 'candidate_email', 'current_pdf', 'resume_bytes']
             for key in keys_to_clear:
-                st.session_state[key] = None if key == 'current_pdf' else ""
-
-            # Reset session state flags
-            test_state_key = f"{role}_test_state"
-            if test_state_key in st.session_state:
-                    st.session_state[test_state_key] = {
-                        "progress": 0,
-                        "answers": [],
-                        "completed": False
-                    }
+                st.session_state[key] = None if key in ('current_pdf', 'resume_bytes') else ""
+
+            # Reset session state flags; the next test draws a fresh set of questions
+            st.session_state.pop(f"{role}_test_state", None)
             st.rerun()
 
         resume_file = st.file_uploader("Upload your resume (PDF)", type=["pdf"], key="resume_uploader")
         if resume_file is not None and resume_file != st.session_state.get('current_pdf') and not st.session_state["show_analytics"]:
             st.session_state.current_pdf = resume_file
+            # Read the upload once; the viewer, download button and extractor all share these bytes
+            st.session_state.resume_bytes = resume_file.getvalue()
             st.session_state.resume_text = ""
             st.session_state.analysis_complete = False
             st.session_state.is_selected = False
             st.rerun()
 
-        if resume_file  and not st.session_state["show_analytics"]:
+        if resume_file and st.session_state.resume_bytes and not st.session_state["show_analytics"]:
+            resume_bytes = st.session_state.resume_bytes
             st.subheader("Uploaded Resume")
             col1, col2 = st.columns([4, 1])
             
             with col1:
-                import tempfile, os
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    tmp_file.write(resume_file.read())
-                    tmp_file_path = tmp_file.name
-                resume_file.seek(0)
-                try: pdf_viewer(tmp_file_path)
-                finally: os.unlink(tmp_file_path)
+                from streamlit_pdf_viewer import pdf_viewer
+
+                pdf_viewer(resume_bytes)
             
             with col2:
-                st.download_button(label="📥 Download", data=resume_file, file_name=resume_file.name, mime="application/pdf")
+                st.download_button(label="📥 Download", data=resume_bytes, file_name=resume_file.name, mime="application/pdf")
             # Process the resume text
             if not st.session_state.resume_text  and not st.session_state["show_analytics"]:
                 with st.spinner("Processing your resume..."):
-                    resume_text = extract_text_from_pdf(resume_file)
+                    resume_text = extract_text_from_pdf(resume_bytes, parallel=True, name=resume_file.name, role=role)
                     if resume_text:
                         st.session_state.resume_text = resume_text
                         st.success("Resume processed successfully!")
@@ -1089,27 +1396,17 @@ def main() -> None:
                     print("DEBUG: Starting resume analysis")
                     is_selected, feedback = analyze_resume(
                         st.session_state.resume_text,
-                        role
+                        role,
+                        name=getattr(st.session_state.current_pdf, "name", ""),
+                        email=st.session_state.candidate_email,
+                        api_key=st.session_state.openai_api_key if st.session_state.llm_screening else None
                     )
                     print(f"DEBUG: Analysis complete - Selected: {is_selected}, Feedback: {feedback}")
 
-                    # Update total applicants for the role in analytics.json
-                    try:
-                        with open('analytics.json', 'r') as f:
-                            try:
-                                data = json.load(f)
-                            except json.JSONDecodeError:
-                                data = {"roles": {}, "interviews": []}
-                    except FileNotFoundError:
-                        data = {"roles": {}, "interviews": []}
-
-                    if role not in data["roles"]:
-                        data["roles"][role] = {"total_applicants": 0, "selected_for_test": 0, "passed": 0, "failed": 0}
-
-                    data["roles"][role]["total_applicants"] += 1
-
-                    with open('analytics.json', 'w') as f:
-                        json.dump(data, f, indent=4)
+                    # Record the new applicant for the role
+                    record_applicants(role)
+                    if st.session_state.resume_bytes:
+                        tag_indexed_resume(st.session_state.resume_bytes, role=role, email=st.session_state.candidate_email)
 
                     if is_selected:
                         st.success("Congratulations! Your skills match our requirements.")
@@ -1120,18 +1417,19 @@ def main() -> None:
                         st.warning("Unfortunately, your skills don't match our requirements.")
                         st.write(f"Feedback: {feedback}")
                                 
-                        # Send rejection email
-                        with st.spinner("Sending feedback email..."):
-                            try:
-                                send_rejection_email(st.session_state.get('email_sender'),
-                                                    st.session_state.get('email_passkey'), 
-                                                    st.session_state.get('candidate_email'),
-                                                    role, 
-                                                    st.session_state.get('company_name'))
-                                st.info("We've sent you an email with detailed feedback.")
-                            except Exception as e:
-                                logger.error(f"Error sending rejection email: {e}")
-                                st.error("Could not send feedback email. Please try again.")
+                        # Queue rejection email
+                        try:
+                            st.session_state["rejection_email_id"] = send_rejection_email(
+                                                st.session_state.get('email_sender'),
+                                                st.session_state.get('email_passkey'), 
+                                                st.session_state.get('candidate_email'),
+                                                role, 
+                                                st.session_state.get('company_name'))
+                            st.info("An email with detailed feedback is on its way.")
+                            show_email_status("rejection_email_id", "Feedback email")
+                        except Exception as e:
+                            logger.error(f"Error queueing rejection email: {e}")
+                            st.error("Could not send feedback email. Please try again.")
 
 
 
@@ -1146,26 +1444,22 @@ def main() -> None:
     if st.session_state.get('test_conducted') and not st.session_state.get('go_ahead') and st.session_state.get('is_selected', False)  and not st.session_state["show_analytics"]:
         st.error("You need to pass the test to proceed with the application.")
         st.info("Unfortunately we are unable to proceed.")
-        with st.spinner("Sending feedback email..."):
-                            try:
-                                send_rejection_email(st.session_state.get('email_sender'),
-                                                     st.session_state.get('email_passkey'), 
-                                                     st.session_state.get('candidate_email'),
-                                                     role, 
-                                                     st.session_state.get('company_name'),
-                                                     )
-                                test_state_key = f"{role}_test_state"
-                                if test_state_key in st.session_state:
-                                        st.session_state[test_state_key] = {
-                                            "progress": 0,
-                                            "answers": [],
-                                            "completed": False
-                                        }
-                                st.info("We've sent you an email with detailed feedback.")
-                                update_analytics(role, st.session_state.get('go_ahead'))
-                            except Exception as e:
-                                logger.error(f"Error sending rejection email: {e}")
-                                st.error("Could not send feedback email. Please try again.")
+        try:
+            st.session_state["rejection_email_id"] = send_rejection_email(
+                                 st.session_state.get('email_sender'),
+                                 st.session_state.get('email_passkey'), 
+                                 st.session_state.get('candidate_email'),
+                                 role, 
+                                 st.session_state.get('company_name'),
+                                 )
+            # The next test draws a fresh set of questions
+            st.session_state.pop(f"{role}_test_state", None)
+            st.info("An email with detailed feedback is on its way.")
+            show_email_status("rejection_email_id", "Feedback email")
+            update_analytics(role, st.session_state.get('go_ahead'))
+        except Exception as e:
+            logger.error(f"Error queueing rejection email: {e}")
+            st.error("Could not send feedback email. Please try again.")
     if st.session_state.get('test_conducted') and st.session_state.get('analysis_complete') and st.session_state.get('is_selected', False) and st.session_state.go_ahead and not st.session_state.get('session_to_proceed')  and not st.session_state["show_analytics"]:
         st.success("Congratulations! You have passed the test")
         st.info("Click 'Proceed with Application' to continue with the interview process.")
@@ -1174,17 +1468,17 @@ def main() -> None:
             print("DEBUG: Proceed button clicked")  # Debug
             with st.spinner("🔄 Processing your application..."):
                 try:
-                    # 3. Send selection email
-                    with st.status("📧 Sending confirmation email...", expanded=True) as status:
-                        print(f"DEBUG: Attempting to send email to {st.session_state.candidate_email}")  # Debug
-                        send_selection_email(
+                    # 3. Queue selection email
+                    with st.status("📧 Queueing confirmation email...", expanded=True) as status:
+                        print(f"DEBUG: Queueing email to {st.session_state.candidate_email}")  # Debug
+                        st.session_state["selection_email_id"] = send_selection_email(
                            st.session_state.get('email_sender'),
                            st.session_state.get('email_passkey'),
                            st.session_state.get('candidate_email'), 
                            role, 
                            st.session_state.get('company_name'))
-                        print("DEBUG: Email sent successfully")  # Debug
-                        status.update(label="✅ Confirmation email sent!")
+                        print("DEBUG: Email queued successfully")  # Debug
+                        status.update(label="✅ Confirmation email queued!")
 
                     st.session_state.session_to_proceed = True
                     st.session_state.proceed_app = True
@@ -1205,7 +1499,8 @@ def main() -> None:
                     
 
     if not st.session_state.get('no_button') and st.session_state.get('proceed_app')  and not st.session_state["show_analytics"]:
-        st.success("Confimation email sent successfully!")
+        st.success("Confirmation email queued successfully!")
+        show_email_status("selection_email_id", "Confirmation email")
         st.info("Schedule interview time out of given time!")
         st.session_state.time_change_requested = ask_for_time_change()
         st.session_state.check_again = True
@@ -1235,17 +1530,28 @@ def main() -> None:
             st.session_state.fragment = True
             st.rerun()
 
-    if st.session_state.get('fragment') and not st.session_state["show_analytics"]:
+    schedule_job = get_job(st.session_state.get("schedule_job_id")) if st.session_state.get('fragment') else None
+    if st.session_state.get('fragment') and schedule_job and schedule_job["status"] in ("queued", "running") and not st.session_state["show_analytics"]:
+        show_schedule_progress(schedule_job["id"])
+
+    elif st.session_state.get('fragment') and (not schedule_job or schedule_job["status"] != "done") and not st.session_state["show_analytics"]:
+        st.error(st.session_state.get("schedule_error") or "Unable to schedule interview. Please try again.")
+        if st.button("Retry Scheduling", key="retry_schedule_button"):
+            st.session_state.fragment = False
+            # Let the candidate pick a time again, in case their slot was taken
+            st.session_state.time_and_date = False
+            st.session_state.no_button = False
+            st.session_state["schedule_error"] = None
+            st.rerun()
+
+    elif st.session_state.get('fragment') and not st.session_state["show_analytics"]:
+        st.session_state["interview_email_id"] = schedule_job["result"]["email_id"]
         update_analytics(role, st.session_state.get('go_ahead'))
-        test_state_key = f"{role}_test_state"
-        if test_state_key in st.session_state:
-                st.session_state[test_state_key] = {
-                    "progress": 0,
-                    "answers": [],
-                    "completed": False
-                }
+        # The next test draws a fresh set of questions
+        st.session_state.pop(f"{role}_test_state", None)
         st.success("Interview scheduled successfully! Check your email for details.")
-        st.info("Interview scheduled and email sent successfully.")
+        st.info("Interview scheduled and email queued successfully.")
+        show_email_status("interview_email_id", "Interview email")
         print("DEBUG: All processes completed successfully")  # Debug
         st.success("""
             🎉 Application Successfully Processed!
@@ -1266,34 +1572,21 @@ def main() -> None:
             if key != 'openai_api_key':
                 del st.session_state[key]
         
-        # Load roles dynamically from roles.json
+        # Load roles dynamically from storage
         try:
-            with open('roles.json', 'r') as f:
-                roles_data = json.load(f)
-        except FileNotFoundError:
-            st.error("The file 'roles.json' was not found.")
-            return  # You can remove this return if you don't want to exit the function
+            roles_data = load_roles()
         except json.JSONDecodeError:
             st.error("Error decoding 'roles.json'. Please check the file format.")
+            return  # You can remove this return if you don't want to exit the function
+        if not roles_data:
+            st.error("No roles were found.")
             return  # Similarly, remove return here if you don't want to exit the function
         
-        # Initialize analytics.json with dynamic roles and default values
-        initial_data = {"roles": {}, "interviews": []}
-        
-        # Iterate over roles and initialize the corresponding analytics data
-        for role in roles_data:
-            # Convert role names to a format consistent with the analytics (e.g., "AI/ML Engineer" from "ai_ml_engineer")
-            formatted_role = role.replace('_', ' ').title()
-            initial_data["roles"][formatted_role] = {
-                "total_applicants": 0,
-                "selected_for_test": 0,
-                "passed": 0,
-                "failed": 0
-            }
-        
-        # Write the initialized data back to the analytics.json file
-        with open('analytics.json', 'w') as f:
-            json.dump(initial_data, f, indent=4)
+        # Convert role names to a format consistent with the analytics (e.g., "AI/ML Engineer" from "ai_ml_engineer")
+        formatted_roles = [role.replace('_', ' ').title() for role in roles_data]
+
+        # Start a fresh analytics snapshot with zeroed counters; earlier events are ignored
+        get_storage().reset_analytics(formatted_roles)
 
         st.rerun()
 
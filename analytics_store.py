@@ -0,0 +1,342 @@
+"""
+Append-only analytics event log.
+
+Every applicant, test and interview event is appended to analytics_events.jsonl
+as one small JSON record, so a write never has to load or rewrite the whole
+analytics file. analytics.json is kept as a compact snapshot of the per-role
+aggregates together with the byte offset of the log it already includes;
+readers load the snapshot and fold in only the events appended after it.
+
+Interview rows (email, time, meeting link) are appended to their own log,
+analytics_interviews.jsonl, and the event log only carries what the rollups
+need, so the snapshot stays small however many interviews there are.
+Interview counts per role and per day are rolled up as each interview event
+is folded in, so charts never have to count the full interview history, and
+query_interviews reads the rows through an in-memory index that is sorted by
+time and only parses the lines appended since the last query.
+"""
+import bisect
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+EVENTS_FILE = "analytics_events.jsonl"
+SNAPSHOT_FILE = "analytics.json"
+SNAPSHOT_LOCK_FILE = "analytics.json.lock"
+INTERVIEWS_FILE = "analytics_interviews.jsonl"
+
+# Fold this many new events into analytics.json before rewriting the snapshot
+COMPACT_THRESHOLD = 50
+
+
+def empty_role_stats():
+    return {"total_applicants": 0, "selected_for_test": 0, "passed": 0, "failed": 0}
+
+
+def empty_interview_rollups():
+    return {"by_role": {}, "by_day": {}}
+
+
+def add_interview_to_rollups(rollups, role, time):
+    """Count one interview in the per-role and per-day rollups."""
+    rollups["by_role"][role] = rollups["by_role"].get(role, 0) + 1
+    if time:
+        day = time[:10]  # Interview times are "%Y-%m-%d %H:%M:%S"
+        rollups["by_day"][day] = rollups["by_day"].get(day, 0) + 1
+
+
+def _append_lines(path, records):
+    """Append JSON lines to `path` in a single write."""
+    data = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+    # O_APPEND makes each single write land atomically at the end of the file,
+    # so concurrent sessions never overwrite each other's lines
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def record_event(event_type, role, **fields):
+    """
+    Append a single analytics event to the log.
+
+    An interview's row goes to the interview log; the event log only keeps its
+    role and time for the rollups.
+
+    Args:
+        event_type (str): One of "applicant", "test" or "interview".
+        role (str): The role the event belongs to.
+        **fields: Event specific data (count, passed, email, time, link).
+    """
+    if event_type == "interview":
+        _append_lines(INTERVIEWS_FILE, [{
+            "email": fields.get("email"), "role": role, "time": fields.get("time"), "link": fields.get("link"),
+        }])
+        fields = {"time": fields.get("time")}
+    event = {"type": event_type, "role": role, "ts": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), **fields}
+    _append_lines(EVENTS_FILE, [event])
+
+
+def apply_event(data, event):
+    """Fold one event into the aggregated analytics data in place."""
+    role = event.get("role")
+    event_type = event.get("type")
+
+    if event_type == "interview":
+        if "email" in event:
+            # Logged before the interview rows had their own file: keep the row
+            # until the next compaction moves it there
+            data.setdefault("interviews", []).append({
+                "email": event.get("email"),
+                "role": role,
+                "time": event.get("time"),
+                "link": event.get("link")
+            })
+        add_interview_to_rollups(data["interview_rollups"], role, event.get("time"))
+        return
+
+    stats = data["roles"].setdefault(role, empty_role_stats())
+    if event_type == "applicant":
+        stats["total_applicants"] += event.get("count", 1)
+    elif event_type == "test":
+        stats["selected_for_test"] += 1
+        if event.get("passed"):
+            stats["passed"] += 1
+        else:
+            stats["failed"] += 1
+
+
+def _snapshot_signature():
+    """Identify the snapshot file on disk, so a compactor can tell whether it was replaced."""
+    try:
+        stat = os.stat(SNAPSHOT_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _load_snapshot():
+    """Return (data, signature of the file it was read from)."""
+    try:
+        with open(SNAPSHOT_FILE, "r") as file:
+            stat = os.fstat(file.fileno())
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            data = json.load(file)
+    except FileNotFoundError:
+        data, signature = {}, None
+    data.setdefault("roles", {})
+    data.setdefault("log_offset", 0)
+    data.setdefault("interviews_start", 0)
+    if "interview_rollups" not in data:
+        # Snapshots written before the rollups existed get them computed once
+        data["interview_rollups"] = empty_interview_rollups()
+        for interview in data.get("interviews", []):
+            add_interview_to_rollups(data["interview_rollups"], interview.get("role"), interview.get("time"))
+    return data, signature
+
+
+@contextmanager
+def _snapshot_lock(blocking=True):
+    """Hold the lock on the snapshot across threads and processes; yields False if not blocking and it is taken."""
+    with open(SNAPSHOT_LOCK_FILE, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save_snapshot(data):
+    # Unique per thread as well as per process, so concurrent writers never share a temporary file
+    tmp_path = f"{SNAPSHOT_FILE}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file, indent=4)
+    os.replace(tmp_path, SNAPSHOT_FILE)
+
+
+def _move_interviews(data):
+    """
+    Append the interview rows still held in `data` to the interview log and drop them from it.
+
+    Snapshots and events written before the interview log existed carry the
+    rows themselves. They are appended together with a marker naming them, so
+    a session that stops before saving the snapshot doesn't append them twice.
+    """
+    interviews = data.pop("interviews")
+    digest = hashlib.sha256(json.dumps(interviews, sort_keys=True).encode("utf-8")).hexdigest()
+    marker = json.dumps({"moved": digest})
+    try:
+        with open(INTERVIEWS_FILE, "r") as file:
+            if any(line.strip() == marker for line in file):
+                return
+    except FileNotFoundError:
+        pass
+    _append_lines(INTERVIEWS_FILE, interviews + [{"moved": digest}])
+
+
+def _compact(data, signature):
+    """
+    Write the folded data as the new snapshot, if it still extends the snapshot on disk.
+
+    Only one session compacts at a time. The others skip it and keep their fold
+    in memory, and so does a session whose snapshot was replaced meanwhile by
+    another compaction or a reset. Interview rows still in the snapshot have to
+    move to the interview log before it can be queried, so for those the
+    session waits for the lock instead.
+    """
+    with _snapshot_lock(blocking="interviews" in data) as locked:
+        if locked and _snapshot_signature() == signature:
+            if "interviews" in data:
+                _move_interviews(data)
+            _save_snapshot(data)
+
+
+def load_analytics():
+    """
+    Return the current analytics data: the snapshot plus any events logged after it.
+
+    Raises json.JSONDecodeError if analytics.json is corrupt.
+    """
+    data, signature = _load_snapshot()
+    folded = 0
+    try:
+        with open(EVENTS_FILE, "rb") as log:
+            log.seek(data["log_offset"])
+            for line in log:
+                # A line without a newline is still being written by another session
+                if not line.endswith(b"\n"):
+                    break
+                data["log_offset"] += len(line)
+                if line.strip():
+                    apply_event(data, json.loads(line))
+                    folded += 1
+    except FileNotFoundError:
+        pass
+
+    if not data.get("interviews"):
+        data.pop("interviews", None)
+    if folded >= COMPACT_THRESHOLD or "interviews" in data:
+        _compact(data, signature)
+    data.pop("interviews", None)
+    return data
+
+
+class _SortedInterviews:
+    """Interview rows with a parallel list of their times, both in time order."""
+
+    def __init__(self):
+        self.times = []
+        self.rows = []
+
+    def add(self, row):
+        time = row.get("time") or ""
+        if not self.times or time >= self.times[-1]:
+            self.times.append(time)
+            self.rows.append(row)
+        else:
+            index = bisect.bisect_right(self.times, time)
+            self.times.insert(index, time)
+            self.rows.insert(index, row)
+
+    def page(self, start_date=None, end_date=None, email=None, offset=0, limit=50):
+        low = bisect.bisect_left(self.times, start_date) if start_date else 0
+        # Times are "%Y-%m-%d %H:%M:%S", so every time on end_date sorts before end_date + "\x7f"
+        high = bisect.bisect_right(self.times, end_date + "\x7f") if end_date else len(self.times)
+        if not email:
+            window = self.rows[max(low, high - offset - limit):max(low, high - offset)]
+            return [dict(row) for row in reversed(window)], max(0, high - low)
+
+        email = email.lower()
+        page, total = [], 0
+        for index in range(high - 1, low - 1, -1):
+            row = self.rows[index]
+            if email in (row.get("email") or "").lower():
+                if offset <= total < offset + limit:
+                    page.append(dict(row))
+                total += 1
+        return page, total
+
+
+class _InterviewIndex:
+    """The interview log from `start` on, read up to `offset`, sorted overall and per role."""
+
+    def __init__(self, inode, start):
+        self.inode = inode
+        self.start = start
+        self.offset = start
+        self.all = _SortedInterviews()
+        self.by_role = {}
+
+    def read_new_rows(self):
+        with open(INTERVIEWS_FILE, "rb") as file:
+            file.seek(self.offset)
+            rows = []
+            for line in file:
+                # A line without a newline is still being written by another session
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                if line.strip():
+                    row = json.loads(line)
+                    if "moved" not in row:
+                        rows.append(row)
+        # Rows are mostly appended in time order, so sorting first keeps the inserts at the end
+        rows.sort(key=lambda row: row.get("time") or "")
+        for row in rows:
+            self.all.add(row)
+            self.by_role.setdefault(row.get("role"), _SortedInterviews()).add(row)
+
+
+_interview_index = None
+_interview_index_lock = threading.Lock()
+
+
+def query_interviews(role=None, start_date=None, end_date=None, email=None, offset=0, limit=50):
+    """Return (page, total): one page of the matching interviews, newest first, and the number of matches."""
+    global _interview_index
+    # Folding the snapshot also moves any interview rows it still holds to the interview log
+    start = load_analytics()["interviews_start"]
+    try:
+        stat = os.stat(INTERVIEWS_FILE)
+    except FileNotFoundError:
+        return [], 0
+
+    with _interview_index_lock:
+        index = _interview_index
+        # A reset moves the start; a replaced or truncated file means reading it again
+        if index is None or (index.inode, index.start) != (stat.st_ino, start) or stat.st_size < index.offset:
+            index = _interview_index = _InterviewIndex(stat.st_ino, start)
+        if stat.st_size > index.offset:
+            index.read_new_rows()
+        rows = index.by_role.get(role, _SortedInterviews()) if role else index.all
+        return rows.page(start_date, end_date, email, offset, limit)
+
+
+def reset_analytics(roles):
+    """Start a fresh snapshot with zeroed counters for the given roles, ignoring earlier events."""
+    with _snapshot_lock():
+        try:
+            log_offset = os.path.getsize(EVENTS_FILE)
+        except FileNotFoundError:
+            log_offset = 0
+        try:
+            interviews_start = os.path.getsize(INTERVIEWS_FILE)
+        except FileNotFoundError:
+            interviews_start = 0
+        data = {
+            "roles": {role: empty_role_stats() for role in roles},
+            "interview_rollups": empty_interview_rollups(),
+            "log_offset": log_offset,
+            "interviews_start": interviews_start,
+        }
+        _save_snapshot(data)
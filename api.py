@@ -0,0 +1,421 @@
+"""
+Headless HTTP API for the recruitment pipeline.
+
+A plain WSGI application over the same functions the Streamlit app uses, so
+an ATS can drive the pipeline without a browser session. No session is kept
+between requests: an MCQ test is identified by a signed token holding its
+role, seed and bank version, which the client sends back with the answers
+given so far.
+
+    GET  /health
+    GET  /roles
+    POST /resumes?role=...&name=...   body: the PDF -> {"digest", "characters", "text"}
+    POST /analyze                      {"role", "resume_text" or "digest", "name", "email", "llm"}
+    POST /tests                        {"role", "size"} -> the test and its first question
+    POST /tests/answer                 {"test", "answers"} -> the next question, or "completed"
+    POST /tests/score                  {"test", "answers", "email"} -> the result, stored as an attempt
+    GET  /slots?limit=...
+    POST /slots/book                   {"slot", "holder"}
+    POST /slots/release                {"slot", "interviewer"}
+    GET  /analytics
+    GET  /analytics/interviews?role=&start_date=&end_date=&email=&offset=&limit=
+    GET  /rankings/<role>?limit=...
+
+Run it with any WSGI server, for example `gunicorn api:application`, or
+with the bundled threaded server:
+
+    python api.py serve --port 8000
+
+"llm": true screens with the model using the OPENAI_API_KEY environment variable.
+
+Test tokens are signed with RECRUITMENT_API_SECRET, so clients can't choose
+their own questions, and each test can be scored once. Set the secret when
+running several workers or when tokens must survive a restart; without it
+every process signs with its own random key.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import socketserver
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import availability
+import mcq_tests
+import ranking
+import resume_cache
+import slots
+from ai_recruitment_agent_team import analyze_resume_details, extract_text_from_pdf, load_roles
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Resumes larger than this are rejected before they are read
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_PAGE_SIZE = 500
+# One empty file per scored test, created exclusively so a test can only be scored once
+SCORED_TESTS_DIR = os.path.join(".cache", "scored_tests")
+
+_secret = os.environ.get("RECRUITMENT_API_SECRET", "").encode("utf-8")
+if not _secret:
+    logger.warning("RECRUITMENT_API_SECRET is not set; test tokens are only valid in this process")
+    _secret = secrets.token_bytes(32)
+
+
+class ApiError(Exception):
+    """An error reported to the client with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+STATUS_LINES = {
+    200: "200 OK", 201: "201 Created", 400: "400 Bad Request", 404: "404 Not Found",
+    405: "405 Method Not Allowed", 409: "409 Conflict", 413: "413 Payload Too Large",
+    422: "422 Unprocessable Entity", 500: "500 Internal Server Error",
+}
+
+
+class Request:
+    def __init__(self, environ):
+        self.method = environ["REQUEST_METHOD"]
+        self.path = environ.get("PATH_INFO", "/").rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(environ.get("QUERY_STRING", "")).items()}
+        self.environ = environ
+
+    def body(self) -> bytes:
+        try:
+            length = int(self.environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            raise ApiError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"The request body is larger than {MAX_BODY_BYTES} bytes")
+        return self.environ["wsgi.input"].read(length) if length else b""
+
+    def json(self) -> Dict:
+        try:
+            data = json.loads(self.body() or b"{}")
+        except ValueError:
+            raise ApiError(400, "The request body must be JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "The request body must be a JSON object")
+        return data
+
+    def int_param(self, name: str, default: int, maximum: Optional[int] = None) -> int:
+        try:
+            value = int(self.query.get(name, default))
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+        if value < 0:
+            raise ApiError(400, f"{name} must not be negative")
+        return min(value, maximum) if maximum else value
+
+
+def _required(data: Dict, field: str, kind=str):
+    if data.get(field) in (None, ""):
+        raise ApiError(400, f"Missing field: {field}")
+    return _checked(data, field, kind)
+
+
+def _optional(data: Dict, field: str, default="", kind=str):
+    return _checked(data, field, kind) if data.get(field) is not None else default
+
+
+def _checked(data: Dict, field: str, kind):
+    value = data[field]
+    # bool is an int subclass, but true is never a valid number here
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise ApiError(400, f"{field} must be of type {kind.__name__}")
+    return value
+
+
+def _known_role(role) -> str:
+    if not isinstance(role, str):
+        raise ApiError(400, "role must be a string")
+    if role not in load_roles():
+        raise ApiError(404, f"Unknown role: {role}")
+    return role
+
+
+# Handlers
+
+
+def health(request):
+    return 200, {"status": "ok"}
+
+
+def roles(request):
+    return 200, {"roles": load_roles()}
+
+
+def upload_resume(request):
+    pdf_bytes = request.body()
+    if not pdf_bytes.startswith(b"%PDF"):
+        raise ApiError(400, "The request body must be a PDF")
+    role = request.query.get("role", "")
+    text = extract_text_from_pdf(pdf_bytes, name=request.query.get("name", ""), role=role)
+    if not text:
+        raise ApiError(422, "Could not extract text from the PDF")
+    return 201, {"digest": resume_cache.sha256(pdf_bytes), "characters": len(text), "text": text}
+
+
+def analyze(request):
+    data = request.json()
+    role = _known_role(_required(data, "role"))
+    resume_text = _optional(data, "resume_text")
+    if not resume_text:
+        # A resume uploaded earlier is referred to by its digest
+        digest = _required(data, "digest")
+        # The digest names a cache file, so anything but a SHA-256 hex digest is rejected
+        if len(digest) != 64 or not all(char in "0123456789abcdef" for char in digest):
+            raise ApiError(400, "digest must be a SHA-256 hex digest")
+        resume_text = resume_cache.get_text(digest)
+        if resume_text is None:
+            raise ApiError(404, "No uploaded resume has that digest")
+    api_key = os.environ.get("OPENAI_API_KEY") if data.get("llm") else None
+    if data.get("llm") and not api_key:
+        raise ApiError(400, "LLM screening needs OPENAI_API_KEY to be set on the server")
+    analysis = analyze_resume_details(resume_text, role, _optional(data, "name"), _optional(data, "email"), api_key)
+    return 200, {"role": role, **analysis}
+
+
+def _question(test_state, index):
+    question = test_state["questions"][index]
+    return {"index": index, "question": question.text, "options": list(question.options)}
+
+
+TOKEN_FIELDS = ("role", "seed", "size", "bank_version")
+
+
+def _signature(fields: Dict) -> str:
+    message = json.dumps([fields[key] for key in TOKEN_FIELDS]).encode("utf-8")
+    return hmac.new(_secret, message, hashlib.sha256).hexdigest()
+
+
+def _test_token(test_state):
+    token = {key: test_state[key] for key in TOKEN_FIELDS}
+    token["signature"] = _signature(token)
+    return token
+
+
+def _verified_token(data):
+    """Return the request's test token if the server signed it."""
+    token = _required(data, "test", dict)
+    try:
+        fields = {key: token[key] for key in TOKEN_FIELDS}
+        valid = hmac.compare_digest(_signature(fields), str(token.get("signature", "")))
+    except (KeyError, TypeError, ValueError):
+        valid = False
+    if not valid:
+        raise ApiError(400, "The test token is invalid")
+    return token
+
+
+def _restore(data):
+    token = _verified_token(data)
+    answers = _optional(data, "answers", [], list)
+    if not all(isinstance(answer, int) and not isinstance(answer, bool) for answer in answers):
+        raise ApiError(400, "answers must be a list of option indices")
+    try:
+        return mcq_tests.restore_test(token["role"], token["seed"], token["bank_version"], answers, token["size"])
+    except mcq_tests.BankChangedError as e:
+        raise ApiError(409, str(e))
+    except ValueError as e:
+        raise ApiError(400, str(e))
+
+
+def start_test(request):
+    data = request.json()
+    role = _known_role(_required(data, "role"))
+    size = _optional(data, "size", mcq_tests.QUESTIONS_PER_TEST, int)
+    if size < 1:
+        raise ApiError(400, "size must be positive")
+    test_state = mcq_tests.start_test(role, size=min(size, MAX_PAGE_SIZE))
+    if not test_state["questions"]:
+        raise ApiError(404, f"No MCQs available for {role}")
+    return 201, {
+        "test": _test_token(test_state),
+        "total": len(test_state["questions"]),
+        "question": _question(test_state, 0),
+    }
+
+
+def answer_test(request):
+    test_state = _restore(request.json())
+    if test_state["completed"]:
+        return 200, {"completed": True, "answered": len(test_state["answers"])}
+    return 200, {"completed": False, "answered": len(test_state["answers"]), "question": _question(test_state, test_state["progress"])}
+
+
+def _claim_scoring(test_state) -> str:
+    """Mark the test as scored, or raise 409 if it already was, in this process or any other."""
+    os.makedirs(SCORED_TESTS_DIR, exist_ok=True)
+    key = resume_cache.sha256(json.dumps([test_state[key] for key in TOKEN_FIELDS]))
+    path = os.path.join(SCORED_TESTS_DIR, key)
+    try:
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+    except FileExistsError:
+        raise ApiError(409, "This test has already been scored")
+    return path
+
+
+def score_test(request):
+    data = request.json()
+    email = _optional(data, "email")
+    test_state = _restore(data)
+    if not test_state["completed"]:
+        raise ApiError(400, f"Answer all {len(test_state['questions'])} questions before scoring")
+    # Scoring once per test keeps clients from probing for the answer key
+    claim = _claim_scoring(test_state)
+    try:
+        return 200, mcq_tests.finish_test(test_state, email)
+    except Exception:
+        os.remove(claim)
+        raise
+
+
+def list_slots(request):
+    limit = request.int_param("limit", 50, MAX_PAGE_SIZE)
+    if availability.has_interviewers():
+        return 200, {"source": "interviewers", "slots": availability.bookable_slots(limit=limit)}
+    return 200, {"source": "predefined", "slots": slots.slot_index().upcoming(limit=limit)}
+
+
+def book_slot(request):
+    data = request.json()
+    slot, holder = _required(data, "slot"), _required(data, "holder")
+    try:
+        slot = slots.format_slot(slots.parse_slot(slot))
+    except ValueError:
+        raise ApiError(400, f"Slots look like {slots.SLOT_FORMAT}")
+    # Same rules as the app: with interviewer calendars any free time is bookable, otherwise only predefined slots
+    if availability.has_interviewers():
+        interviewer = availability.reserve(slot, holder)
+        if interviewer is None:
+            raise ApiError(409, f"No interviewer is free at {slot}")
+        return 201, {"slot": slot, "interviewer": interviewer}
+    if not slots.reserve_slot(slot, holder):
+        raise ApiError(409, f"The slot {slot} is not available")
+    return 201, {"slot": slot, "interviewer": None}
+
+
+def release_slot(request):
+    data = request.json()
+    slot, interviewer = _required(data, "slot"), _optional(data, "interviewer", None)
+    released = availability.release(slot, interviewer) if interviewer else slots.release_slot(slot)
+    if not released:
+        raise ApiError(404, f"No booking for {slot}")
+    return 200, {"released": slot}
+
+
+def analytics(request):
+    return 200, get_storage().load_analytics()
+
+
+def interviews(request):
+    limit = request.int_param("limit", 50, MAX_PAGE_SIZE)
+    offset = request.int_param("offset", 0)
+    page, total = get_storage().query_interviews(
+        request.query.get("role"), request.query.get("start_date"), request.query.get("end_date"),
+        request.query.get("email"), offset, limit
+    )
+    return 200, {"total": total, "offset": offset, "interviews": page}
+
+
+def rankings(request, role):
+    _known_role(role)
+    return 200, {"role": role, "candidates": ranking.top_candidates(role, request.int_param("limit", 20, MAX_PAGE_SIZE))}
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/roles"): roles,
+    ("POST", "/resumes"): upload_resume,
+    ("POST", "/analyze"): analyze,
+    ("POST", "/tests"): start_test,
+    ("POST", "/tests/answer"): answer_test,
+    ("POST", "/tests/score"): score_test,
+    ("GET", "/slots"): list_slots,
+    ("POST", "/slots/book"): book_slot,
+    ("POST", "/slots/release"): release_slot,
+    ("GET", "/analytics"): analytics,
+    ("GET", "/analytics/interviews"): interviews,
+}
+# Routes ending in a path parameter
+PREFIX_ROUTES = {
+    ("GET", "/rankings/"): rankings,
+}
+
+
+def _dispatch(request):
+    handler = ROUTES.get((request.method, request.path))
+    if handler is not None:
+        return handler(request)
+    for (method, prefix), handler in PREFIX_ROUTES.items():
+        if request.method == method and request.path.startswith(prefix) and len(request.path) > len(prefix):
+            return handler(request, request.path[len(prefix):])
+    if any(path == request.path for _, path in ROUTES):
+        raise ApiError(405, f"{request.method} is not allowed on {request.path}")
+    raise ApiError(404, f"No such endpoint: {request.path}")
+
+
+def application(environ, start_response):
+    """The WSGI entry point."""
+    request = Request(environ)
+    started = time.perf_counter()
+    try:
+        status, payload = _dispatch(request)
+    except ApiError as e:
+        status, payload = e.status, {"error": str(e)}
+    except Exception as e:
+        logger.exception(f"Error handling {request.method} {request.path}")
+        status, payload = 500, {"error": f"Internal error: {e}"}
+    body = json.dumps(payload).encode("utf-8")
+    start_response(STATUS_LINES.get(status, f"{status} Error"), [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(body))),
+    ])
+    logger.debug(f"{request.method} {request.path} {status} in {time.perf_counter() - started:.4f}s")
+    return [body]
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """wsgiref's server, handling each connection on its own thread."""
+
+    daemon_threads = True
+    # The default backlog of 5 drops connections under concurrent load
+    request_queue_size = 128
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.info(f"API: {format % args}")
+
+
+def make_api_server(host="localhost", port=8000):
+    return make_server(host, port, application, server_class=ThreadingWSGIServer, handler_class=QuietRequestHandler)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Headless HTTP API for the recruitment pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="Serve the API with a threaded WSGI server")
+    serve.add_argument("--host", default="localhost")
+    serve.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = make_api_server(args.host, args.port)
+    logger.info(f"Recruitment API at http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
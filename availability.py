@@ -0,0 +1,581 @@
+"""
+Interviewer availability.
+
+Each interviewer has free intervals (their working hours: WORK_START to
+WORK_END on weekdays, unless their calendar says otherwise) and busy
+intervals (the meetings in their calendar). Both are stored merged and
+sorted in availability.json, so the time an interviewer can actually take an
+interview is one linear sweep subtracting busy time and booked interviews
+from free time, and the time a whole panel is free is a linear intersection
+of those. Candidates are offered the SLOT_MINUTES slots, on a
+SLOT_STEP_MINUTES grid, that fit into at least one interviewer's free time,
+and booking a slot assigns it to one of the interviewers who are free then,
+under a file lock, so nobody is ever booked twice.
+
+Local .ics files stand in for real calendars. Each file in calendars/ is one
+interviewer, named after the file:
+
+    python availability.py import calendars/alice.ics --email alice@example.com
+    python availability.py import-all
+    python availability.py slots --days 7
+    python availability.py common alice bob --days 7
+"""
+import argparse
+import bisect
+import fcntl
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+from slots import format_slot, parse_slot
+from storage import invalidate_json_cache, read_json_cached
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_FILE = "availability.json"
+CALENDARS_DIR = "calendars"
+# Calendar times are converted to this time zone, the one the app schedules interviews in
+TIMEZONE = os.environ.get("AVAILABILITY_TIMEZONE", "UTC")
+WORK_START = 9
+WORK_END = 17
+SLOT_MINUTES = 60
+SLOT_STEP_MINUTES = 30
+# How far ahead slots are offered and recurring calendar events are expanded
+HORIZON_DAYS = 28
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+Interval = Tuple[datetime, datetime]
+
+
+def merge_intervals(intervals) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(free: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """Remove the busy time from the free time; both must be merged."""
+    result = []
+    j = 0
+    for start, end in free:
+        # Busy intervals that end before this free interval can't affect it or any later one
+        while j < len(busy) and busy[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(busy) and busy[k][0] < end:
+            if busy[k][0] > start:
+                result.append((start, busy[k][0]))
+            start = max(start, busy[k][1])
+            k += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def intersect_intervals(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """Return the time covered by both interval lists; both must be merged."""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def clip_intervals(intervals: List[Interval], start: datetime, end: datetime) -> List[Interval]:
+    """Return the parts of merged intervals that fall in [start, end)."""
+    # Intervals are sorted by their ends too, so the first one that matters is a bisection away
+    first = bisect.bisect_right(intervals, start, key=lambda interval: interval[1])
+    result = []
+    for interval_start, interval_end in intervals[first:]:
+        if interval_start >= end:
+            break
+        result.append((max(interval_start, start), min(interval_end, end)))
+    return result
+
+
+def working_hours(start: datetime, end: datetime) -> List[Interval]:
+    """The default free time: WORK_START to WORK_END on weekdays, within [start, end)."""
+    intervals = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if day.weekday() < 5:
+            intervals.append((day.replace(hour=WORK_START), day.replace(hour=WORK_END)))
+        day += timedelta(days=1)
+    return clip_intervals(intervals, start, end)
+
+
+# ICS parsing
+
+
+def _unfold(text: str) -> List[str]:
+    """Split an iCalendar document into logical lines, joining folded continuation lines."""
+    lines = []
+    for line in text.splitlines():
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+
+def _parse_property(line: str):
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(param.upper().split("=", 1) for param in params if "=" in param), value
+
+
+def _parse_datetime(value: str, params: Dict, timezone) -> datetime:
+    """Parse a DATE or DATE-TIME value into a naive datetime in `timezone`."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return pytz.utc.localize(parsed).astimezone(timezone).replace(tzinfo=None)
+    if "TZID" in params:
+        try:
+            source = pytz.timezone(params["TZID"].strip('"'))
+        except pytz.UnknownTimeZoneError:
+            logger.warning(f"Unknown time zone {params['TZID']}, treating the time as local")
+            return parsed
+        return source.localize(parsed).astimezone(timezone).replace(tzinfo=None)
+    # Floating times are already local
+    return parsed
+
+
+_DURATION = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0)
+    )
+    return -duration if sign == "-" else duration
+
+
+def _expand(start: datetime, end: datetime, rule: str, exdates, until: datetime, timezone) -> List[Interval]:
+    """Expand a daily or weekly RRULE into its occurrences up to `until`."""
+    parts = dict(part.split("=", 1) for part in rule.upper().split(";") if "=" in part)
+    frequency = parts.get("FREQ")
+    if frequency not in ("DAILY", "WEEKLY"):
+        logger.warning(f"Unsupported recurrence {rule}, only the first occurrence is used")
+        return [(start, end)]
+
+    interval = int(parts.get("INTERVAL", 1))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    if "UNTIL" in parts:
+        until = min(until, _parse_datetime(parts["UNTIL"], {}, timezone))
+    if frequency == "WEEKLY":
+        weekdays = sorted(WEEKDAYS.index(day[-2:]) for day in parts.get("BYDAY", WEEKDAYS[start.weekday()]).split(","))
+        week_start = start - timedelta(days=start.weekday())
+        candidates = (
+            week_start + timedelta(weeks=week, days=weekday)
+            for week in range(0, 10_000, interval) for weekday in weekdays
+        )
+    else:
+        candidates = (start + timedelta(days=day) for day in range(0, 100_000, interval))
+
+    duration = end - start
+    occurrences = []
+    seen = 0
+    for occurrence in candidates:
+        if occurrence > until or (count is not None and seen >= count):
+            break
+        if occurrence < start:
+            continue
+        seen += 1
+        if occurrence not in exdates:
+            occurrences.append((occurrence, occurrence + duration))
+    return occurrences
+
+
+def parse_ics(text: str, timezone: str = TIMEZONE, until: Optional[datetime] = None) -> Dict[str, List[Interval]]:
+    """
+    Read the busy and free time out of an iCalendar document.
+
+    Opaque, non-cancelled events are busy; daily and weekly recurrences are
+    expanded up to `until` (HORIZON_DAYS from now by default). FREEBUSY
+    periods are busy unless their FBTYPE is FREE. Returns {"busy": [...], "free": [...]},
+    both merged, as naive datetimes in `timezone`.
+    """
+    zone = pytz.timezone(timezone)
+    if until is None:
+        until = datetime.now() + timedelta(days=HORIZON_DAYS)
+    busy, free = [], []
+    component = None
+    # Depth of sub-components (such as VALARM) inside the current one, whose properties are skipped
+    nested = 0
+    for line in _unfold(text):
+        name, params, value = _parse_property(line)
+        if component is not None and (nested or (name == "BEGIN" and value.upper() != component["type"])):
+            nested += 1 if name == "BEGIN" else -1 if name == "END" else 0
+        elif name == "BEGIN" and value.upper() in ("VEVENT", "VFREEBUSY"):
+            component = {"type": value.upper(), "exdates": set(), "periods": []}
+        elif name == "END" and component is not None and value.upper() == component["type"]:
+            try:
+                if component["type"] == "VFREEBUSY":
+                    for fbtype, period in component["periods"]:
+                        (free if fbtype == "FREE" else busy).append(period)
+                elif _is_busy_event(component):
+                    busy.extend(_event_intervals(component, until, zone))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping an unreadable calendar entry: {e}")
+            component = None
+        elif component is None:
+            continue
+        elif name in ("DTSTART", "DTEND"):
+            component[name] = _parse_datetime(value, params, zone)
+            component[f"{name}_IS_DATE"] = params.get("VALUE") == "DATE" or len(value.strip()) == 8
+        elif name == "EXDATE":
+            component["exdates"].update(_parse_datetime(item, params, zone) for item in value.split(","))
+        elif name == "FREEBUSY":
+            for period in value.split(","):
+                period_start, _, period_end = period.partition("/")
+                start = _parse_datetime(period_start, {}, zone)
+                end = start + _parse_duration(period_end) if period_end.upper().startswith(("P", "+P")) else _parse_datetime(period_end, {}, zone)
+                component["periods"].append((params.get("FBTYPE", "BUSY"), (start, end)))
+        else:
+            component[name] = value.strip()
+    return {"busy": merge_intervals(busy), "free": merge_intervals(free)}
+
+
+def _is_busy_event(event: Dict) -> bool:
+    return event.get("STATUS", "").upper() != "CANCELLED" and event.get("TRANSP", "OPAQUE").upper() != "TRANSPARENT"
+
+
+def _event_intervals(event: Dict, until: datetime, zone) -> List[Interval]:
+    start = event["DTSTART"]
+    if "DTEND" in event:
+        end = event["DTEND"]
+    elif "DURATION" in event:
+        end = start + _parse_duration(event["DURATION"])
+    else:
+        # An all-day event without an end lasts the day; a timed one takes no time
+        end = start + timedelta(days=1) if event.get("DTSTART_IS_DATE") else start
+    if "RRULE" in event:
+        return _expand(start, end, event["RRULE"], event["exdates"], until, zone)
+    return [(start, end)]
+
+
+# Stored availability
+
+
+def _serialize(intervals: List[Interval]) -> List[List[str]]:
+    return [[format_slot(start), format_slot(end)] for start, end in intervals]
+
+
+def _deserialize(intervals) -> List[Interval]:
+    return [(parse_slot(start), parse_slot(end)) for start, end in intervals]
+
+
+@contextmanager
+def _availability_lock():
+    """Serialize changes to the availability file across threads and processes."""
+    with open(f"{AVAILABILITY_FILE}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _empty_document():
+    return {"interviewers": {}, "bookings": {}}
+
+
+def _read_document():
+    """Read the availability file directly, for changes made under the lock."""
+    try:
+        with open(AVAILABILITY_FILE, "r") as file:
+            document = json.load(file)
+    except FileNotFoundError:
+        return _empty_document()
+    document.setdefault("interviewers", {})
+    document.setdefault("bookings", {})
+    return document
+
+
+def _write_document(document):
+    tmp_path = f"{AVAILABILITY_FILE}.tmp.{os.getpid()}"
+    with open(tmp_path, "w") as file:
+        json.dump(document, file, indent=4)
+    os.replace(tmp_path, AVAILABILITY_FILE)
+    invalidate_json_cache(AVAILABILITY_FILE)
+
+
+def _update(change):
+    """Apply `change` to the document under the lock, writing only if it returns True."""
+    with _availability_lock():
+        document = _read_document()
+        changed = change(document)
+        if changed:
+            _write_document(document)
+        return changed
+
+
+def _calendar(record, booked):
+    """Parse one interviewer's stored record and bookings into merged intervals."""
+    return {
+        "email": record.get("email", ""),
+        "free": _deserialize(record.get("free", [])),
+        "busy": _deserialize(record.get("busy", [])),
+        "booked": merge_intervals(
+            (parse_slot(slot), parse_slot(slot) + timedelta(minutes=booking.get("minutes", SLOT_MINUTES)))
+            for slot, booking in booked.items()
+        ),
+    }
+
+
+def _is_free(calendar, start: datetime, end: datetime) -> bool:
+    return any(free_start <= start and end <= free_end for free_start, free_end in _available(calendar, start, end))
+
+
+# Parsed calendars, keyed by the identity of the cached document they came from
+_parsed = (None, None)
+
+
+def _calendars():
+    """Return {name: {"email", "free", "busy", "booked"}} with the intervals parsed and merged."""
+    global _parsed
+    document = read_json_cached(AVAILABILITY_FILE, None)
+    if document is None:
+        return {}
+    if _parsed[0] is not document:
+        calendars = {}
+        for name, record in document.get("interviewers", {}).items():
+            calendars[name] = _calendar(record, document.get("bookings", {}).get(name, {}))
+        _parsed = (document, calendars)
+    return _parsed[1]
+
+
+def _available(calendar, start: datetime, end: datetime) -> List[Interval]:
+    """The interviewer's free time in [start, end), minus their meetings and booked interviews."""
+    free = clip_intervals(calendar["free"], start, end) if calendar["free"] else working_hours(start, end)
+    free = subtract_intervals(free, clip_intervals(calendar["busy"], start, end))
+    return subtract_intervals(free, clip_intervals(calendar["booked"], start, end))
+
+
+def has_interviewers() -> bool:
+    return bool(_calendars())
+
+
+def interviewers() -> Dict[str, str]:
+    """Return {name: email} for every interviewer."""
+    return {name: calendar["email"] for name, calendar in sorted(_calendars().items())}
+
+
+def interviewer_email(name: str) -> str:
+    calendar = _calendars().get(name)
+    return calendar["email"] if calendar else ""
+
+
+def set_interviewer(name: str, email: str = "", busy=(), free=()) -> None:
+    """Create or replace an interviewer's calendar. Without free intervals, working hours are assumed."""
+    record = {
+        "email": email,
+        "free": _serialize(merge_intervals(free)),
+        "busy": _serialize(merge_intervals(busy)),
+    }
+
+    def change(document):
+        if document["interviewers"].get(name) == record:
+            return False
+        document["interviewers"][name] = record
+        return True
+
+    _update(change)
+
+
+def remove_interviewer(name: str) -> bool:
+    def change(document):
+        document["bookings"].pop(name, None)
+        return document["interviewers"].pop(name, None) is not None
+
+    return _update(change)
+
+
+def import_ics(path: str, name: Optional[str] = None, email: Optional[str] = None, timezone: str = TIMEZONE) -> str:
+    """
+    Replace an interviewer's calendar with the busy and free time in an .ics file.
+
+    The interviewer is named after the file unless `name` is given, and keeps
+    their stored email unless `email` is given. Returns the interviewer's name.
+    """
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    with open(path, "r", encoding="utf-8") as file:
+        calendar = parse_ics(file.read(), timezone)
+    if email is None:
+        email = interviewer_email(name)
+    set_interviewer(name, email, calendar["busy"], calendar["free"])
+    logger.info(f"Imported {len(calendar['busy'])} busy and {len(calendar['free'])} free intervals for {name}")
+    return name
+
+
+def import_calendars(directory: str = CALENDARS_DIR, timezone: str = TIMEZONE) -> List[str]:
+    """Import every .ics file in `directory`, one interviewer per file."""
+    if not os.path.isdir(directory):
+        return []
+    return [
+        import_ics(os.path.join(directory, filename), timezone=timezone)
+        for filename in sorted(os.listdir(directory)) if filename.lower().endswith(".ics")
+    ]
+
+
+def free_interviewers(start: datetime, minutes: int = SLOT_MINUTES) -> List[str]:
+    """Return the interviewers who are free for the whole of [start, start + minutes)."""
+    end = start + timedelta(minutes=minutes)
+    return [name for name, calendar in sorted(_calendars().items()) if _is_free(calendar, start, end)]
+
+
+def common_availability(names: List[str], start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Interval]:
+    """Return the time in [start, end) when every one of the named interviewers is free."""
+    start = start or datetime.now()
+    end = end or start + timedelta(days=HORIZON_DAYS)
+    calendars = _calendars()
+    common = [(start, end)]
+    for name in names:
+        common = intersect_intervals(common, _available(calendars[name], start, end))
+    return common
+
+
+def _slot_starts(intervals: List[Interval], minutes: int, step: int):
+    """Yield the starts, on the step grid, of the slots that fit in the intervals."""
+    length = timedelta(minutes=minutes)
+    for start, end in intervals:
+        midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = -(-(start - midnight) // timedelta(minutes=step))
+        slot = midnight + offset * timedelta(minutes=step)
+        while slot + length <= end:
+            yield slot
+            slot += timedelta(minutes=step)
+
+
+def bookable_slots(start: Optional[datetime] = None, end: Optional[datetime] = None, minutes: int = SLOT_MINUTES,
+                   step: int = SLOT_STEP_MINUTES, limit: Optional[int] = None) -> List[str]:
+    """
+    Return the slots in [start, end) that at least one interviewer is free for, in order.
+
+    The window defaults to now until HORIZON_DAYS from now.
+    """
+    start = start or datetime.now()
+    end = end or start + timedelta(days=HORIZON_DAYS)
+    starts = set()
+    for calendar in _calendars().values():
+        starts.update(_slot_starts(_available(calendar, start, end), minutes, step))
+    result = [format_slot(slot) for slot in sorted(starts)]
+    return result[:limit] if limit else result
+
+
+def reserve(slot: str, holder: str, minutes: int = SLOT_MINUTES) -> Optional[str]:
+    """
+    Book an interviewer who is free for the slot, preferring the one with the fewest bookings.
+
+    Returns the interviewer's name, or None if nobody is free then (e.g.
+    because another candidate just took the last interviewer).
+    """
+    start = parse_slot(slot)
+    end = start + timedelta(minutes=minutes)
+    reserved = []
+
+    def change(document):
+        # Decide from the file as it is under the lock, not from a cached copy
+        candidates = []
+        for name, record in document["interviewers"].items():
+            booked = document["bookings"].get(name, {})
+            if _is_free(_calendar(record, booked), start, end):
+                candidates.append((len(booked), name))
+        if not candidates:
+            return False
+        name = min(candidates)[1]
+        document["bookings"].setdefault(name, {})[slot] = {
+            "holder": holder,
+            "minutes": minutes,
+            "reserved_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        reserved.append(name)
+        return True
+
+    _update(change)
+    return reserved[0] if reserved else None
+
+
+def release(slot: str, interviewer: str) -> bool:
+    """Cancel an interviewer's booking. Returns False if there was none."""
+    def change(document):
+        bookings = document["bookings"].get(interviewer, {})
+        if bookings.pop(slot, None) is None:
+            return False
+        if not bookings:
+            document["bookings"].pop(interviewer, None)
+        return True
+
+    return _update(change)
+
+
+def bookings() -> Dict[str, Dict]:
+    """Return {interviewer: {slot: {"holder", "minutes", "reserved_at"}}}."""
+    document = read_json_cached(AVAILABILITY_FILE, None) or {}
+    return {name: dict(booked) for name, booked in document.get("bookings", {}).items()}
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Interviewer availability tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import one interviewer's .ics calendar")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--name", help="Interviewer name (defaults to the file name)")
+    import_parser.add_argument("--email")
+    import_all = subparsers.add_parser("import-all", help="Import every .ics file in a directory")
+    import_all.add_argument("--directory", default=CALENDARS_DIR)
+    slots_parser = subparsers.add_parser("slots", help="List the bookable slots")
+    slots_parser.add_argument("--days", type=int, default=7)
+    common = subparsers.add_parser("common", help="Show when all of the given interviewers are free")
+    common.add_argument("names", nargs="+")
+    common.add_argument("--days", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        print(f"Imported {import_ics(args.path, args.name, args.email)}")
+    elif args.command == "import-all":
+        names = import_calendars(args.directory)
+        print(f"Imported {len(names)} calendars: {', '.join(names)}")
+    elif args.command == "slots":
+        now = datetime.now()
+        for slot in bookable_slots(now, now + timedelta(days=args.days)):
+            print(f"{slot}  {', '.join(free_interviewers(parse_slot(slot)))}")
+    else:
+        now = datetime.now()
+        for start, end in common_availability(args.names, now, now + timedelta(days=args.days)):
+            print(f"{format_slot(start)} - {format_slot(end)}")
+
+
+if __name__ == "__main__":
+    main()
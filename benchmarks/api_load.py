@@ -0,0 +1,176 @@
+"""
+Load test for the headless API (api.py).
+
+Starts the API on an ephemeral port in this process (or targets --url), then
+sends --requests requests from --concurrency client threads, spread round
+robin over the chosen endpoints. Each thread keeps one HTTP connection open.
+Prints the overall requests per second and, per endpoint, the request count,
+errors and p50/p95 latency, as JSON:
+
+    python benchmarks/api_load.py --requests 2000 --concurrency 16
+
+The default endpoints only read. "analyze" screens a sample resume with the
+local matcher, which also offers it to the role's ranking, so it has to be
+asked for with --endpoint. Scoring isn't loaded: each test can only be
+scored once.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READ_ENDPOINTS = ("health", "roles", "slots", "analytics", "interviews", "start_test", "answer_test")
+WRITE_ENDPOINTS = ("analyze",)
+
+SAMPLE_RESUME = (
+    "Backend engineer with 6 years of Python, Django and FastAPI experience. Designed PostgreSQL schemas, "
+    "ran services on AWS with Docker and Kubernetes, and built CI/CD pipelines."
+)
+
+
+def _request(connection, method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if data else {}
+    connection.request(method, path, body=data, headers=headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read() or b"{}")
+    return response.status, payload
+
+
+def _fixtures(connection):
+    """Pick a role, and a started test for it, for the endpoints that need them."""
+    _, roles = _request(connection, "GET", "/roles")
+    role = next(iter(roles.get("roles") or {}), None)
+    status, test = _request(connection, "POST", "/tests", {"role": role}) if role else (404, {})
+    return role, test if status == 201 else None
+
+
+def build_requests(endpoints, role, test):
+    """Return (name, method, path, body) for each endpoint that can run against this data."""
+    answers = [0] * (test["total"] - 1) if test else []
+    calls = {
+        "health": ("GET", "/health", None),
+        "roles": ("GET", "/roles", None),
+        "slots": ("GET", "/slots?limit=20", None),
+        "analytics": ("GET", "/analytics", None),
+        "interviews": ("GET", "/analytics/interviews?limit=20", None),
+        "start_test": ("POST", "/tests", {"role": role}),
+        "answer_test": ("POST", "/tests/answer", {"test": test and test["test"], "answers": answers}),
+        "analyze": ("POST", "/analyze", {"role": role, "resume_text": SAMPLE_RESUME, "name": "Load Test"}),
+    }
+    needs_role = {"start_test", "analyze"}
+    needs_test = {"answer_test"}
+    return [
+        (name, *calls[name]) for name in endpoints
+        if not (name in needs_role and role is None) and not (name in needs_test and test is None)
+    ]
+
+
+def _percentile_ms(values, percent):
+    if len(values) == 1:
+        return round(values[0] * 1000, 2)
+    return round(statistics.quantiles(values, n=100)[percent - 1] * 1000, 2)
+
+
+def run(base_url, endpoints, total, concurrency):
+    parts = urlsplit(base_url)
+    setup = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    role, test = _fixtures(setup)
+    setup.close()
+    calls = build_requests(endpoints, role, test)
+    if not calls:
+        raise SystemExit("None of the endpoints can run: add a role with MCQs first")
+
+    latencies = {name: [] for name, *_ in calls}
+    errors = {name: 0 for name, *_ in calls}
+    lock = threading.Lock()
+    per_worker = [total // concurrency + (1 if worker < total % concurrency else 0) for worker in range(concurrency)]
+
+    def worker(worker_index):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        timings = []
+        for i in range(per_worker[worker_index]):
+            name, method, path, body = calls[(worker_index + i) % len(calls)]
+            started = time.perf_counter()
+            try:
+                status, _ = _request(connection, method, path, body)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                status = None
+            timings.append((name, time.perf_counter() - started, status))
+        connection.close()
+        with lock:
+            for name, seconds, status in timings:
+                latencies[name].append(seconds)
+                if status is None or status >= 400:
+                    errors[name] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    return {
+        "url": base_url,
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(total / seconds, 1),
+        "endpoints": {
+            name: {
+                "requests": len(values),
+                "errors": errors[name],
+                "p50_ms": _percentile_ms(values, 50),
+                "p95_ms": _percentile_ms(values, 95),
+            }
+            for name, values in latencies.items() if values
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the headless API's throughput.")
+    parser.add_argument("--url", help="API to load, e.g. http://localhost:8000 (defaults to an in-process server)")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    parser.add_argument("--endpoint", action="append", choices=READ_ENDPOINTS + WRITE_ENDPOINTS,
+                        help="Endpoint to include (repeatable, defaults to the read-only ones)")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        sys.path.insert(0, REPO_DIR)
+        import api
+
+        # The access log would otherwise be most of the work
+        logging.getLogger("api").setLevel(logging.WARNING)
+        server = api.make_api_server("127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        results = run(base_url, args.endpoint or READ_ENDPOINTS, args.requests, max(1, args.concurrency))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
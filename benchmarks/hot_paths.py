@@ -0,0 +1,364 @@
+"""
+Micro-benchmarks for the app's hot paths over synthetic large-scale fixtures.
+
+Generates, in a scratch directory that becomes the working directory (so
+nothing touches the real data files):
+
+- a multi-page resume PDF (--pdf-pages pages)
+- roles.json with --roles roles
+- mcqs.json with --mcqs questions spread over --mcq-roles roles
+- analytics.json and analytics_interviews.jsonl with --interviews interviews
+- predefined_times.json with --slots half-hour interview slots on weekdays,
+  starting a week ago so the past ones have to be skipped
+
+then times each hot path --runs times:
+
+- extract_text_from_pdf: a new PDF (parsed) and the same PDF again (cached text)
+- analyze_resume: a new resume (scored) and the same resume again (cached analysis)
+- load_mcqs / save_mcqs: the first load (which shards mcqs.json), a cold and a
+  cached load of one role, loading every role, and saving one edited question
+- scheduling: the upcoming slots offered to a candidate, and booking one
+  slot and releasing it again
+- update_analytics: one test event (per call, over --batch calls)
+- load_analytics, one page of query_interviews, and display_analytics with and
+  without its rendered charts cached
+
+The median and minimum of each are printed as JSON. Given a --baseline from
+an earlier run, the exit status is 1 if any median is more than --tolerance
+slower than the baseline's (and by more than --min-delta seconds), so it can
+gate a deploy:
+
+    python benchmarks/hot_paths.py --output baseline.json
+    python benchmarks/hot_paths.py --baseline baseline.json --tolerance 0.5
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SKILLS = (
+    "Python", "Java", "Go", "Rust", "TypeScript", "React", "Vue.js", "Django", "FastAPI", "Spring",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "AWS", "GCP", "Azure", "Docker", "Kubernetes",
+    "Terraform", "CI/CD", "REST APIs", "GraphQL", "PyTorch", "TensorFlow", "Spark", "Airflow", "Linux", "SQL",
+)
+FILLER = (
+    "designed", "built", "migrated", "scaled", "maintained", "services", "pipelines", "platform",
+    "team", "latency", "customers", "reliability", "features", "data", "release", "production",
+)
+
+
+# Fixtures
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def make_pdf(pages, lines_per_page=40, seed=0, nonce=""):
+    """Return the bytes of a text PDF of `pages` pages of resume-like lines."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} {nonce}".strip()] + [
+            " ".join(rng.choice(SKILLS if i % 3 == 0 else FILLER) for i in range(12)) for _ in range(lines_per_page)
+        ]
+        content = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"{_pdf_string(line)} Tj T*" for line in lines) + " ET"
+        stream = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+            % (len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def make_resume(words=600, seed=0, nonce=""):
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(SKILLS if i % 4 == 0 else FILLER) for i in range(words))
+    return f"{nonce} Senior engineer with {rng.randint(2, 12)} years of experience. {text}"
+
+
+def make_roles(count, seed=0):
+    rng = random.Random(seed)
+    return {
+        f"role_{i}": "\n        Required Skills:\n" + "".join(f"        - {skill}\n" for skill in rng.sample(SKILLS, 8))
+        for i in range(count)
+    }
+
+
+def make_mcqs(count, roles, seed=0):
+    rng = random.Random(seed)
+    banks = {role: [] for role in roles}
+    for i in range(count):
+        options = rng.sample(SKILLS, 4)
+        banks[roles[i % len(roles)]].append({
+            "question": f"Question {i}: which tool fits task {rng.randint(0, 10 ** 6)}?",
+            "options": options,
+            "answer": rng.choice(options),
+        })
+    return banks
+
+
+def make_analytics(interviews, roles, seed=0):
+    """Return (snapshot, interview rows): analytics.json and its interview log, the way analytics_store keeps them."""
+    from analytics_store import add_interview_to_rollups, empty_interview_rollups
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9)
+    data = {
+        "roles": {
+            role: {"total_applicants": rng.randint(100, 1000), "selected_for_test": rng.randint(10, 100),
+                   "passed": rng.randint(0, 50), "failed": rng.randint(0, 50)}
+            for role in roles
+        },
+        "interview_rollups": empty_interview_rollups(),
+        "log_offset": 0,
+        "interviews_start": 0,
+    }
+    rows = []
+    for i in range(interviews):
+        role = rng.choice(roles)
+        time_slot = (start + timedelta(minutes=30 * rng.randint(0, 365 * 48))).strftime("%Y-%m-%d %H:%M:%S")
+        rows.append({
+            "email": f"candidate{i}@example.com", "role": role, "time": time_slot, "link": f"https://zoom.us/j/{i}",
+        })
+        add_interview_to_rollups(data["interview_rollups"], role, time_slot)
+    return data, rows
+
+
+def make_slots(count, now=None):
+    """Half-hour interview slots from 9:00 to 17:00 on weekdays, starting a week before `now`."""
+    day = (now or datetime.now()).replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=7)
+    slots = []
+    while len(slots) < count:
+        if day.weekday() < 5:
+            slots.extend(
+                (day + timedelta(minutes=30 * i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(16)
+            )
+        day += timedelta(days=1)
+    return slots[:count]
+
+
+def write_fixtures(directory, args):
+    """Write the fixture files into `directory` and return their sizes."""
+    roles = make_roles(args.roles)
+    mcq_roles = list(roles)[:args.mcq_roles]
+    analytics, interviews = make_analytics(args.interviews, mcq_roles)
+    files = {
+        "roles.json": roles,
+        "mcqs.json": make_mcqs(args.mcqs, mcq_roles),
+        "analytics.json": analytics,
+        "predefined_times.json": {"available_times": make_slots(args.slots)},
+    }
+    sizes = {}
+    for name, data in files.items():
+        path = os.path.join(directory, name)
+        with open(path, "w") as file:
+            json.dump(data, file, indent=4)
+        sizes[name] = os.path.getsize(path)
+    path = os.path.join(directory, "analytics_interviews.jsonl")
+    with open(path, "w") as file:
+        file.writelines(json.dumps(row) + "\n" for row in interviews)
+    sizes["analytics_interviews.jsonl"] = os.path.getsize(path)
+    return sizes
+
+
+# Timing
+
+
+def _time(function, runs, setup=None):
+    """Run `function` `runs` times and return the seconds each run took; `setup` runs untimed before each."""
+    timings = []
+    for run in range(runs):
+        argument = setup(run) if setup else None
+        started = time.perf_counter()
+        if setup:
+            function(argument)
+        else:
+            function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _summary(timings, per_call=1):
+    return {
+        "median_seconds": round(statistics.median(timings) / per_call, 6),
+        "min_seconds": round(min(timings) / per_call, 6),
+        "runs": len(timings),
+    }
+
+
+def measure(args):
+    """Time every hot path and return {name: summary}."""
+    import ai_recruitment_agent_team as app
+    import slots
+    import storage
+
+    results = {}
+    runs = args.runs
+    role = "role_0"
+
+    # Resume parsing: every new PDF is parsed, a repeated one comes from the text cache
+    pdf = make_pdf(args.pdf_pages)
+    results["extract_text_from_pdf"] = _summary(_time(
+        app.extract_text_from_pdf, runs, setup=lambda run: make_pdf(args.pdf_pages, nonce=f"run {run}")
+    ))
+    app.extract_text_from_pdf(pdf)
+    results["extract_text_from_pdf_cached"] = _summary(_time(lambda: app.extract_text_from_pdf(pdf), runs))
+
+    resume = make_resume()
+    results["analyze_resume"] = _summary(_time(
+        lambda text: app.analyze_resume(text, role), runs, setup=lambda run: make_resume(nonce=f"run {run}")
+    ))
+    app.analyze_resume(resume, role)
+    results["analyze_resume_cached"] = _summary(_time(lambda: app.analyze_resume(resume, role), runs))
+
+    def fresh_storage(run):
+        storage.invalidate_json_cache()
+        return storage.JsonStorage()
+
+    def unsharded_storage(run):
+        shutil.rmtree(storage.MCQS_DIR, ignore_errors=True)
+        return fresh_storage(run)
+
+    # MCQ banks: the first load creates the per-role shards from mcqs.json
+    results["mcqs_first_load"] = _summary(_time(lambda backend: backend.load_mcqs(role), runs, setup=unsharded_storage))
+    results["load_mcqs"] = _summary(_time(lambda backend: backend.load_mcqs(role), runs, setup=fresh_storage))
+    results["load_mcqs_cached"] = _summary(_time(lambda: app.load_mcqs(role), runs))
+    results["load_all_mcqs"] = _summary(_time(lambda: app.load_mcqs(), runs))
+
+    def edit_one(run):
+        mcqs = app.load_mcqs(role)
+        mcqs[run % len(mcqs)] = {**mcqs[run % len(mcqs)], "question": f"Edited question {run}"}
+        return mcqs
+
+    results["save_mcqs_one_edit"] = _summary(_time(lambda mcqs: app.save_mcqs(role, mcqs), runs, setup=edit_one))
+
+    # Scheduling: the slots a candidate is offered, and booking one of them
+    results["upcoming_slots"] = _summary(_time(lambda: slots.slot_index().upcoming(), runs))
+    upcoming = slots.slot_index().upcoming(limit=runs)
+
+    def book_and_release(slot):
+        slots.reserve_slot(slot, "candidate@example.com")
+        slots.release_slot(slot)
+
+    results["reserve_release_slot"] = _summary(_time(
+        book_and_release, runs, setup=lambda run: upcoming[run % len(upcoming)]
+    ))
+
+    # Analytics: reads first, while nothing is waiting in the event log
+    results["load_analytics"] = _summary(_time(lambda: storage.get_storage().load_analytics(), runs))
+    results["query_interviews_page"] = _summary(_time(
+        lambda: storage.get_storage().query_interviews(role=role, offset=25, limit=25), runs
+    ))
+    results["display_analytics"] = _summary(_time(
+        lambda _: app.display_analytics(), runs, setup=lambda run: app.render_analytics.clear()
+    ))
+    results["display_analytics_cached"] = _summary(_time(app.display_analytics, runs))
+
+    results["update_analytics"] = _summary(
+        _time(lambda: [app.update_analytics(role, i % 2 == 0) for i in range(args.batch)], runs), per_call=args.batch
+    )
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta=0.0):
+    """
+    Return a message for every benchmark whose median is more than `tolerance` slower than the baseline's.
+
+    Slowdowns under `min_delta` seconds are timer noise on sub-millisecond paths and are ignored.
+    """
+    failures = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        slowdown = result["median_seconds"] - previous["median_seconds"]
+        if slowdown > min_delta and result["median_seconds"] > previous["median_seconds"] * (1 + tolerance):
+            failures.append(
+                f"{name} took {result['median_seconds']}s (baseline {previous['median_seconds']}s, tolerance {tolerance:.0%})"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the app's hot paths over synthetic large-scale fixtures.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--pdf-pages", type=int, default=20, help="Pages in the resume PDF")
+    parser.add_argument("--roles", type=int, default=300, help="Roles in roles.json")
+    parser.add_argument("--mcqs", type=int, default=20000, help="Questions in mcqs.json")
+    parser.add_argument("--mcq-roles", type=int, default=10, help="Roles the questions are spread over")
+    parser.add_argument("--interviews", type=int, default=100000, help="Interviews in the analytics fixtures")
+    parser.add_argument("--slots", type=int, default=5000, help="Interview slots in predefined_times.json")
+    parser.add_argument("--batch", type=int, default=1000, help="update_analytics calls per timed run")
+    parser.add_argument("--workdir", help="Directory for the fixtures and data (defaults to a temporary one, removed afterwards)")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown over the baseline, as a fraction")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Slowdowns under this many seconds are ignored")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    args.mcq_roles = max(1, min(args.mcq_roles, args.roles))
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="recruitment-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    previous_dir = os.getcwd()
+    sys.path.insert(0, REPO_DIR)
+    # Streamlit warns about running without `streamlit run` on every call outside the app
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    try:
+        # The storage modules use paths relative to the working directory
+        os.chdir(workdir)
+        started = time.perf_counter()
+        sizes = write_fixtures(workdir, args)
+        fixture_seconds = time.perf_counter() - started
+        benchmarks = measure(args)
+    finally:
+        os.chdir(previous_dir)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "fixtures": {
+            "pdf_pages": args.pdf_pages, "roles": args.roles, "mcqs": args.mcqs, "mcq_roles": args.mcq_roles,
+            "interviews": args.interviews, "slots": args.slots, "bytes": sizes, "seconds": round(fixture_seconds, 3),
+        },
+        "benchmarks": benchmarks,
+        "failures": [],
+    }
+    if baseline_path:
+        with open(baseline_path) as file:
+            results["failures"] = compare(benchmarks, json.load(file)["benchmarks"], args.tolerance, args.min_delta)
+
+    print(json.dumps(results, indent=4))
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=4)
+    return 1 if results["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
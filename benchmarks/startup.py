@@ -0,0 +1,95 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Measures, each in a fresh interpreter so nothing is already imported:
+
+- import: the time to import ai_recruitment_agent_team, and which heavy
+  dependencies that import pulled in (none should be, they are loaded lazily)
+- first_render: the time for the first run of main() through Streamlit's AppTest
+
+The medians over --runs are printed as JSON, and the exit status is 1 if a
+budget is exceeded, so it can gate a deploy:
+
+    python benchmarks/startup.py --runs 5 --import-budget 1.0 --render-budget 3.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_MODULE = "ai_recruitment_agent_team"
+
+# Dependencies that must only be imported by the code paths that need them
+LAZY_MODULES = ("pandas", "matplotlib", "PyPDF2", "phi.tools.zoom", "streamlit_pdf_viewer", "requests")
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import {APP_MODULE}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules]}}))
+"""
+
+RENDER_SCRIPT = f"""
+import json, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+app = AppTest.from_file("{APP_MODULE}.py", default_timeout=120).run()
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "exceptions": [str(error.value) for error in app.exception]}}))
+"""
+
+
+def _run(script):
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    # The measurement is the last line; anything before it is the app's own output
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(runs=3):
+    """Return the median import and first-render times over `runs` fresh interpreters."""
+    imports = [_run(IMPORT_SCRIPT) for _ in range(runs)]
+    renders = [_run(RENDER_SCRIPT) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_seconds": round(statistics.median(run["seconds"] for run in imports), 4),
+        "first_render_seconds": round(statistics.median(run["seconds"] for run in renders), 4),
+        "eagerly_loaded": sorted({name for run in imports for name in run["loaded"]}),
+        "render_exceptions": sorted({error for run in renders for error in run["exceptions"]}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the app's cold-start time.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement")
+    parser.add_argument("--import-budget", type=float, help="Maximum median import time in seconds")
+    parser.add_argument("--render-budget", type=float, help="Maximum median first-render time in seconds")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    failures = []
+    if args.import_budget is not None and results["import_seconds"] > args.import_budget:
+        failures.append(f"import took {results['import_seconds']}s (budget {args.import_budget}s)")
+    if args.render_budget is not None and results["first_render_seconds"] > args.render_budget:
+        failures.append(f"first render took {results['first_render_seconds']}s (budget {args.render_budget}s)")
+    if results["eagerly_loaded"]:
+        failures.append(f"loaded at import time: {', '.join(results['eagerly_loaded'])}")
+    if results["render_exceptions"]:
+        failures.append(f"first render raised: {'; '.join(results['render_exceptions'])}")
+    results["failures"] = failures
+
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=4)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
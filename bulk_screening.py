@@ -0,0 +1,158 @@
+"""
+Headless bulk resume screening.
+
+Parses and scores every PDF in a directory against one role from roles.json
+on a process pool, streaming one JSON line per candidate as soon as it is
+screened. The role counters in analytics.json are updated once at the end.
+
+With --llm the resumes are screened by the model instead (using the
+OPENAI_API_KEY environment variable): the workers only extract text, and the
+texts are sent to the model in batches per role.
+
+Usage:
+    python bulk_screening.py --dir resumes/ --role ai_ml_engineer --output results.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai_recruitment_agent_team import analyze_resume_details, extract_text_from_pdf, load_roles, record_applicants
+from llm_screening import MAX_CONCURRENCY, get_screener
+
+logger = logging.getLogger(__name__)
+
+
+def find_resumes(directory):
+    """Return the sorted list of PDF paths in the given directory."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def screen_resume(pdf_path, role, analyze=True):
+    """
+    Parse and score a single resume. Runs inside a worker process.
+
+    With analyze=False only the text is extracted, and returned under "text" for the caller to score.
+    """
+    started = time.perf_counter()
+    result = {"file": os.path.basename(pdf_path), "role": role, "selected": False, "feedback": "", "error": None}
+    try:
+        with open(pdf_path, "rb") as pdf_file:
+            resume_text = extract_text_from_pdf(pdf_file, name=os.path.basename(pdf_path), role=role)
+        if not resume_text:
+            result["error"] = "Could not extract text from the PDF."
+        elif analyze:
+            result.update(analyze_resume_details(resume_text, role, name=os.path.basename(pdf_path)))
+            result["characters"] = len(resume_text)
+        else:
+            result["text"] = resume_text
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def analyze_with_llm(results, role, criteria, api_key):
+    """Score extracted resumes with the LLM in batches, then fill in each result."""
+    extracted = [result for result in results if not result["error"]]
+    started = time.perf_counter()
+    try:
+        # One call screens the whole window in concurrent batches and caches every answer
+        get_screener(api_key).analyze_many([result["text"] for result in extracted], criteria, role)
+    except Exception as e:
+        for result in extracted:
+            result["error"] = str(e)
+    seconds = (time.perf_counter() - started) / max(len(extracted), 1)
+
+    for result in results:
+        resume_text = result.pop("text", None)
+        if not result["error"]:
+            # Served from the cache filled above; this also records the candidate's ranking
+            result.update(analyze_resume_details(resume_text, role, name=result["file"], api_key=api_key))
+            result["characters"] = len(resume_text)
+            result["seconds"] = round(result["seconds"] + seconds, 3)
+    return results
+
+
+def run_bulk_screening(directory, role, output=sys.stdout, workers=None, api_key=None):
+    """
+    Screen every PDF in `directory` for `role`, writing one JSON line per candidate to `output`.
+
+    With an `api_key` the resumes are screened by the LLM. Returns a summary
+    dict with the number of screened, selected and failed resumes.
+    """
+    roles = load_roles()
+    if role not in roles:
+        raise ValueError(f"Role '{role}' not found in roles.json. Available roles: {', '.join(roles)}")
+
+    pdf_paths = find_resumes(directory)
+    summary = {"role": role, "screened": 0, "selected": 0, "errors": 0}
+    if not pdf_paths:
+        logger.warning(f"No PDF files found in {directory}")
+        return summary
+
+    def write(results):
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+            if result["error"]:
+                summary["errors"] += 1
+            else:
+                summary["screened"] += 1
+                summary["selected"] += int(result["selected"])
+        output.flush()
+
+    # Enough extracted resumes to keep every concurrent LLM request busy
+    window_size = get_screener(api_key).batch_size * MAX_CONCURRENCY if api_key else 1
+    window = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(screen_resume, path, role, not api_key) for path in pdf_paths]
+        for future in as_completed(futures):
+            window.append(future.result())
+            if len(window) >= window_size:
+                write(analyze_with_llm(window, role, roles[role], api_key) if api_key else window)
+                window = []
+        if window:
+            write(analyze_with_llm(window, role, roles[role], api_key))
+
+    # One analytics write for the whole batch instead of one per file
+    if summary["screened"]:
+        record_applicants(role, summary["screened"])
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory of PDF resumes for a role.")
+    parser.add_argument("--dir", required=True, help="Directory containing the PDF resumes")
+    parser.add_argument("--role", required=True, help="Role key from roles.json")
+    parser.add_argument("--output", help="JSONL file to write results to (defaults to stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (defaults to CPU count)")
+    parser.add_argument("--llm", action="store_true", help="Screen with the LLM, using the OPENAI_API_KEY environment variable")
+    args = parser.parse_args(argv)
+
+    api_key = None
+    if args.llm:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            parser.error("--llm needs the OPENAI_API_KEY environment variable")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            summary = run_bulk_screening(args.dir, args.role, output, args.workers, api_key)
+    else:
+        summary = run_bulk_screening(args.dir, args.role, workers=args.workers, api_key=api_key)
+
+    logger.info(
+        f"Screened {summary['screened']} resumes for {summary['role']}: "
+        f"{summary['selected']} selected, {summary['errors']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+In-process background job queue with persisted job state.
+
+Long-running pipelines (such as interview scheduling) are submitted as jobs
+so the Streamlit script can return right away and poll for progress. Jobs run
+on a shared worker pool; their status, per-step progress, result and error
+are written to jobs/<job_id>.json after every change so any session (or a
+restarted server) can look them up.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = "jobs"
+MAX_WORKERS = 4
+
+QUEUED, RUNNING, DONE, FAILED, INTERRUPTED = "queued", "running", "done", "failed", "interrupted"
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="job")
+# Separate pool for the steps a job fans out, so a full job pool can never deadlock on its own steps
+_step_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS * 2, thread_name_prefix="job-step")
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class Job:
+    """Handle passed to a job function for reporting step progress."""
+
+    def __init__(self, kind):
+        self.state = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": QUEUED,
+            "steps": {},
+            "result": None,
+            "error": None,
+            "pid": os.getpid(),
+            "created_at": time.time(),
+            "updated_at": time.time(),
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def id(self):
+        return self.state["id"]
+
+    def update(self, **fields):
+        with self._lock:
+            self.state.update(fields)
+            self.state["updated_at"] = time.time()
+            self._save()
+
+    def step(self, name, status):
+        """Record the status of one named step (e.g. "running", "done" or "failed")."""
+        with self._lock:
+            self.state["steps"][name] = status
+            self.state["updated_at"] = time.time()
+            self._save()
+
+    def run_steps(self, **steps):
+        """Run independent steps concurrently and return {name: result}; re-raises the first failure."""
+        futures = {name: _step_pool.submit(self._run_step, name, func) for name, func in steps.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def _run_step(self, name, func):
+        self.step(name, RUNNING)
+        try:
+            result = func()
+        except Exception:
+            self.step(name, FAILED)
+            raise
+        self.step(name, DONE)
+        return result
+
+    def _save(self):
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        path = os.path.join(JOBS_DIR, f"{self.id}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.state, file, indent=4)
+        os.replace(tmp_path, path)
+
+
+def _run(job, func, args, kwargs):
+    job.update(status=RUNNING)
+    try:
+        result = func(job, *args, **kwargs)
+        job.update(status=DONE, result=result)
+    except Exception as e:
+        logger.error(f"Job {job.id} ({job.state['kind']}) failed: {e}")
+        job.update(status=FAILED, error=str(e))
+    finally:
+        # Finished jobs are served from their persisted state
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+
+
+def submit_job(kind, func, *args, **kwargs):
+    """
+    Run `func(job, *args, **kwargs)` on the worker pool and return the job id right away.
+
+    Only the job's state is persisted, never its arguments, so credentials can be passed safely.
+    """
+    job = Job(kind)
+    job.update()
+    with _jobs_lock:
+        _jobs[job.id] = job
+    _pool.submit(_run, job, func, args, kwargs)
+    return job.id
+
+
+def get_job(job_id):
+    """Return a copy of the job's state, or None if the job is unknown."""
+    if not job_id:
+        return None
+    job = _jobs.get(job_id)
+    if job is not None:
+        with job._lock:
+            return json.loads(json.dumps(job.state))
+
+    try:
+        with open(os.path.join(JOBS_DIR, f"{job_id}.json"), "r") as file:
+            state = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # A job that never finished in another (now gone) process will never finish
+    if state["status"] in (QUEUED, RUNNING) and not _process_alive(state.get("pid")):
+        state["status"] = INTERRUPTED
+    return state
+
+
+def _process_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (TypeError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,255 @@
+"""
+LLM resume screening through an OpenAI-compatible chat completions endpoint.
+
+Resumes for the same role are sent in batches of BATCH_SIZE per request, at
+most MAX_CONCURRENCY requests are in flight per process, and every result is
+cached by (resume hash, criteria hash, model) so a resume is never sent twice.
+The model is asked for structured JSON, which is parsed into the same
+selected/feedback/skills shape that the local skill matcher returns.
+
+The endpoint and model are configured with environment variables:
+
+    LLM_BASE_URL   (default https://api.openai.com/v1)
+    LLM_MODEL      (default gpt-4o)
+
+For offline testing, run the stand-in server, which answers chat completion
+requests with the local skill matcher, and point LLM_BASE_URL at it:
+
+    python llm_screening.py serve --port 8001
+    LLM_BASE_URL=http://localhost:8001/v1 streamlit run ai_recruitment_agent_team.py
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import resume_cache
+from skill_matcher import score_resume
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o"
+BATCH_SIZE = 5
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 2
+BACKOFF_SECONDS = 2
+# (connect, read) timeouts for every request
+REQUEST_TIMEOUT = (5, 120)
+# Resume text beyond this many characters is not sent to the model
+MAX_RESUME_CHARS = 12_000
+
+EXPERIENCE_LEVELS = ("junior", "mid", "senior")
+
+SYSTEM_PROMPT = """You are a technical recruiter screening resumes for one role.
+The user message is a JSON object with the role, its required skills ("criteria") and a list of resumes, each with an "index" and "text".
+Select a candidate only if the resume covers at least 70% of the required skills.
+Reply with a JSON object of the form:
+{"results": [{"index": <int>, "selected": <bool>, "feedback": <string>, "matching_skills": [<string>], "missing_skills": [<string>], "experience_level": "junior" | "mid" | "senior"}]}
+with exactly one result per resume. Use the skill names as written in the criteria."""
+
+
+class LlmScreeningError(Exception):
+    """Raised when the model's response can't be obtained or parsed."""
+
+
+def llm_settings():
+    """Return the (base_url, model) to use, from the environment."""
+    return (
+        os.environ.get("LLM_BASE_URL", DEFAULT_BASE_URL).rstrip("/"),
+        os.environ.get("LLM_MODEL", DEFAULT_MODEL),
+    )
+
+
+def normalize_result(result: Dict) -> Dict:
+    """Coerce one parsed model result into the analysis shape used by the app."""
+    matching_skills = [str(skill) for skill in result.get("matching_skills") or []]
+    missing_skills = [str(skill) for skill in result.get("missing_skills") or []]
+    total = len(matching_skills) + len(missing_skills)
+    experience_level = str(result.get("experience_level", "")).lower()
+    return {
+        "selected": bool(result.get("selected", False)),
+        "feedback": str(result.get("feedback", "")),
+        "score": round(len(matching_skills) / total, 4) if total else 0.0,
+        "matching_skills": matching_skills,
+        "missing_skills": missing_skills,
+        "experience_level": experience_level if experience_level in EXPERIENCE_LEVELS else "junior",
+    }
+
+
+class LlmScreener:
+    """Batched, cached and concurrency-limited resume screening with one model."""
+
+    def __init__(self, api_key: str, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL,
+                 batch_size: int = BATCH_SIZE, max_concurrency: int = MAX_CONCURRENCY):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.batch_size = batch_size
+        # Every request from every session goes through this pool, which bounds concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self.session = requests.Session()
+        self.session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+
+    def cache_key(self, resume_text: str, criteria: str) -> str:
+        return resume_cache.analysis_key(resume_text, criteria, "llm", self.model)
+
+    def analyze(self, resume_text: str, criteria: str, role: str = "") -> Dict:
+        return self.analyze_many([resume_text], criteria, role)[0]
+
+    def analyze_many(self, resume_texts: List[str], criteria: str, role: str = "") -> List[Dict]:
+        """
+        Screen resumes for one role, returning one analysis dict per resume in order.
+
+        Cached results are reused; the rest are sent in batches, concurrently.
+        """
+        results = [resume_cache.get_analysis(self.cache_key(text, criteria)) for text in resume_texts]
+        # Identical resumes in one call are only sent once
+        pending = {}
+        for index, text in enumerate(resume_texts):
+            if results[index] is None:
+                pending.setdefault(text, []).append(index)
+
+        texts = list(pending)
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        futures = [self._pool.submit(self._screen_batch, batch, criteria, role) for batch in batches]
+        for batch, future in zip(batches, futures):
+            for text, analysis in zip(batch, future.result()):
+                resume_cache.put_analysis(self.cache_key(text, criteria), analysis)
+                for index in pending[text]:
+                    results[index] = analysis
+        return results
+
+    def _screen_batch(self, resume_texts: List[str], criteria: str, role: str) -> List[Dict]:
+        payload = {
+            "role": role,
+            "criteria": criteria,
+            "resumes": [{"index": index, "text": text[:MAX_RESUME_CHARS]} for index, text in enumerate(resume_texts)],
+        }
+        body = {
+            "model": self.model,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(payload)},
+            ],
+        }
+        started = time.perf_counter()
+        content = self._complete(body)
+        try:
+            parsed = {int(result["index"]): result for result in json.loads(content)["results"]}
+        except (ValueError, KeyError, TypeError) as e:
+            raise LlmScreeningError(f"Could not parse the model's response: {e}")
+        missing = [index for index in range(len(resume_texts)) if index not in parsed]
+        if missing:
+            raise LlmScreeningError(f"The model returned no result for resumes {missing}")
+        logger.info(f"Screened {len(resume_texts)} resumes for {role} with {self.model} in {time.perf_counter() - started:.2f}s")
+        return [normalize_result(parsed[index]) for index in range(len(resume_texts))]
+
+    def _complete(self, body: Dict) -> str:
+        """POST a chat completion request and return the message content, retrying rate limits and server errors."""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/chat/completions",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    json=body,
+                    timeout=REQUEST_TIMEOUT,
+                )
+            except requests.RequestException as e:
+                error = f"Request failed: {e}"
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json()["choices"][0]["message"]["content"]
+                    except (ValueError, KeyError, IndexError) as e:
+                        raise LlmScreeningError(f"Unexpected response format: {e}")
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code != 429 and response.status_code < 500:
+                    raise LlmScreeningError(error)
+            if attempt < MAX_RETRIES:
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+        raise LlmScreeningError(error)
+
+
+_screeners = {}
+_screeners_lock = threading.Lock()
+
+
+def get_screener(api_key: str) -> LlmScreener:
+    """Return the shared screener for this API key and the configured endpoint and model."""
+    base_url, model = llm_settings()
+    key = (api_key, base_url, model)
+    with _screeners_lock:
+        if key not in _screeners:
+            _screeners[key] = LlmScreener(api_key, base_url, model)
+        return _screeners[key]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions like the real endpoint, scoring with the local skill matcher."""
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            payload = json.loads(body["messages"][-1]["content"])
+        except (ValueError, KeyError, IndexError):
+            self.send_error(400, "Expected a chat completion request with a JSON user message")
+            return
+
+        results = []
+        for resume in payload["resumes"]:
+            analysis = score_resume(resume["text"], payload["criteria"], payload.get("role", ""))
+            analysis.pop("score")
+            results.append({"index": resume["index"], **analysis})
+        response = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", DEFAULT_MODEL),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps({"results": results})},
+                "finish_reason": "stop",
+            }],
+        }
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.info(f"Stand-in: {format % args}")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="LLM resume screening tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="Run a local stand-in for the chat completions endpoint")
+    serve.add_argument("--host", default="localhost")
+    serve.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    logger.info(f"Stand-in chat completions endpoint at http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
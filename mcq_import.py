@@ -0,0 +1,208 @@
+"""
+Bulk MCQ import and export.
+
+Imports read CSV or JSON lines one row at a time and validate every row.
+Rows are deduplicated on a normalized hash of the question text and its set
+of options, both against the role's existing bank and within the file. Every
+accepted question is then written in one storage transaction, so a failed
+import leaves the banks untouched. Exports stream the banks back out in the
+same formats, so banks can be synced between environments:
+
+    python mcq_import.py export --output bank.jsonl
+    python mcq_import.py import bank.jsonl
+    python mcq_import.py import questions.csv --role backend_engineer --dry-run
+
+A JSON line is {"role": ..., "question": ..., "options": [...], "answer": ...}.
+A CSV file has a header with question and answer columns, one column per
+option (option_1, option_2, ...) and optionally a role column. The answer is
+the text of the correct option, or its 1-based number. Rows without a role
+go to the role given on the command line.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from storage import get_storage
+
+MIN_OPTIONS = 2
+# Only this many row errors are kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+
+def normalize(text: str) -> str:
+    return " ".join(str(text).split()).casefold()
+
+
+def mcq_hash(question: str, options: Iterable[str]) -> str:
+    """Hash of the normalized question and set of options, so reordered or re-spaced copies match."""
+    key = "\x1f".join([normalize(question), *sorted(normalize(option) for option in options)])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def detect_format(filename: str) -> str:
+    return "csv" if filename.lower().endswith(".csv") else "jsonl"
+
+
+def read_jsonl(file: TextIO) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, row) for every non-empty line."""
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"_error": f"invalid JSON: {e.msg}"}
+            yield line_number, row if isinstance(row, dict) else {"_error": "not a JSON object"}
+
+
+def read_csv(file: TextIO) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, row) for every CSV row, with the option columns gathered into "options"."""
+    reader = csv.DictReader(file)
+    fields = [field.strip().lower() for field in reader.fieldnames or []]
+    reader.fieldnames = fields
+    option_fields = [field for field in fields if field.startswith("option")]
+    for row in reader:
+        yield reader.line_num, {
+            "role": (row.get("role") or "").strip(),
+            "question": row.get("question") or "",
+            # Questions with fewer options leave the extra columns empty
+            "options": [row[field] for field in option_fields if (row.get(field) or "").strip()],
+            "answer": row.get("answer") or "",
+        }
+
+
+def validate_row(row: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """Return (mcq, None) for a valid row, or (None, reason)."""
+    if "_error" in row:
+        return None, row["_error"]
+    question = str(row.get("question") or "").strip()
+    options = row.get("options")
+    if not question:
+        return None, "missing question"
+    if not isinstance(options, list) or len(options) < MIN_OPTIONS:
+        return None, f"needs at least {MIN_OPTIONS} options"
+    options = [str(option).strip() for option in options]
+    if any(not option for option in options):
+        return None, "empty option"
+    if len({normalize(option) for option in options}) != len(options):
+        return None, "duplicate options"
+
+    answer = str(row.get("answer") or "").strip()
+    if answer not in options:
+        # A 1-based option number is accepted too
+        if answer.isdigit() and 1 <= int(answer) <= len(options):
+            answer = options[int(answer) - 1]
+        else:
+            return None, f"answer {answer!r} is not one of the options"
+    return {"question": question, "options": options, "answer": answer}, None
+
+
+def import_mcqs(rows: Iterable[Tuple[int, Dict]], default_role: str = "", dry_run: bool = False) -> Dict:
+    """
+    Validate, deduplicate and store MCQ rows, all in one write.
+
+    Returns a report: {"rows", "imported": {role: count}, "duplicates", "invalid", "errors": [[line, reason]], "dry_run"}.
+    """
+    storage = get_storage()
+    known_hashes = {}
+    new_mcqs = {}
+    report = {"rows": 0, "imported": {}, "duplicates": 0, "invalid": 0, "errors": [], "dry_run": dry_run}
+
+    for line_number, row in rows:
+        report["rows"] += 1
+        role = str(row.get("role") or default_role).strip()
+        mcq, error = validate_row(row)
+        if mcq and not role:
+            mcq, error = None, "no role"
+        if error:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append([line_number, error])
+            continue
+
+        # Each role's existing bank is hashed once, the first time the file mentions it
+        if role not in known_hashes:
+            known_hashes[role] = {mcq_hash(existing["question"], existing["options"]) for existing in storage.load_mcqs(role)}
+        digest = mcq_hash(mcq["question"], mcq["options"])
+        if digest in known_hashes[role]:
+            report["duplicates"] += 1
+            continue
+        known_hashes[role].add(digest)
+        new_mcqs.setdefault(role, []).append(mcq)
+
+    report["imported"] = {role: len(mcqs) for role, mcqs in new_mcqs.items()}
+    if new_mcqs and not dry_run:
+        storage.add_mcqs(new_mcqs)
+    return report
+
+
+def import_file(file: TextIO, file_format: str, default_role: str = "", dry_run: bool = False) -> Dict:
+    rows = read_csv(file) if file_format == "csv" else read_jsonl(file)
+    return import_mcqs(rows, default_role, dry_run)
+
+
+def export_mcqs(output: TextIO, file_format: str = "jsonl", roles: Optional[List[str]] = None) -> int:
+    """Write the banks of `roles` (all roles by default) to `output`, one role in memory at a time."""
+    storage = get_storage()
+    roles = roles or storage.mcq_roles()
+    written = 0
+    if file_format == "csv":
+        # The header needs the widest question, so the banks are read twice
+        option_count = max((len(mcq["options"]) for role in roles for mcq in storage.load_mcqs(role)), default=MIN_OPTIONS)
+        writer = csv.writer(output)
+        writer.writerow(["role", "question", "answer", *(f"option_{i}" for i in range(1, option_count + 1))])
+        for role in roles:
+            for mcq in storage.load_mcqs(role):
+                writer.writerow([role, mcq["question"], mcq.get("answer", ""), *mcq["options"]])
+                written += 1
+    else:
+        for role in roles:
+            for mcq in storage.load_mcqs(role):
+                output.write(json.dumps(
+                    {"role": role, "question": mcq["question"], "options": mcq["options"], "answer": mcq.get("answer")}
+                ) + "\n")
+                written += 1
+    return written
+
+
+def export_text(file_format: str = "jsonl", roles: Optional[List[str]] = None) -> str:
+    output = io.StringIO()
+    export_mcqs(output, file_format, roles)
+    return output.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import and export of MCQ banks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import questions from a CSV or JSONL file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--role", default="", help="Role for rows that don't name one")
+    import_parser.add_argument("--format", choices=("csv", "jsonl"), help="Defaults to the file extension")
+    import_parser.add_argument("--dry-run", action="store_true", help="Validate and count without writing")
+    export = subparsers.add_parser("export", help="Export banks as CSV or JSONL")
+    export.add_argument("--role", action="append", help="Role to export (repeatable, defaults to all)")
+    export.add_argument("--output", help="File to write to (defaults to stdout)")
+    export.add_argument("--format", choices=("csv", "jsonl"), help="Defaults to the output extension, or jsonl")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        with open(args.path, "r", encoding="utf-8-sig", newline="") as file:
+            report = import_file(file, args.format or detect_format(args.path), args.role, args.dry_run)
+        print(json.dumps(report, indent=4))
+        return 1 if report["invalid"] else 0
+
+    file_format = args.format or (detect_format(args.output) if args.output else "jsonl")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            count = export_mcqs(output, file_format, args.role)
+        print(f"Exported {count} questions to {args.output}")
+    else:
+        export_mcqs(sys.stdout, file_format, args.role)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Compiled MCQ test sessions.
+
+A role's question bank is compiled once per process and storage version of
+its questions into an immutable CompiledBank: a tuple of Question tuples whose answers are option
+indices, shared by every session taking that role's test. Each candidate is
+asked a random subset of QUESTIONS_PER_TEST questions, drawn with a seed kept
+in their session so reruns show the same questions in the same order. Answers
+are kept as option indices, so scoring is one integer comparison per question
+asked, and every finished attempt is stored for later analysis.
+"""
+import hashlib
+import json
+import random
+import secrets
+import threading
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from storage import get_storage
+
+QUESTIONS_PER_TEST = 10
+PASSING_SCORE = 0.7
+
+
+class Question(NamedTuple):
+    text: str
+    options: Tuple[str, ...]
+    # Index of the correct option, or -1 if the bank's answer isn't one of the options
+    answer: int
+
+
+class CompiledBank(NamedTuple):
+    role: str
+    version: str
+    questions: Tuple[Question, ...]
+
+
+def bank_version(mcqs: List[Dict]) -> str:
+    """Content hash of a question bank, so attempts can be traced to the exact bank they were drawn from."""
+    return hashlib.sha256(json.dumps(mcqs, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def compile_bank(role: str, mcqs: List[Dict]) -> CompiledBank:
+    questions = []
+    for mcq in mcqs:
+        options = tuple(mcq["options"])
+        answer = options.index(mcq["answer"]) if mcq.get("answer") in options else -1
+        questions.append(Question(mcq["question"], options, answer))
+    return CompiledBank(role, bank_version(mcqs), tuple(questions))
+
+
+# {role: (storage version of its questions, CompiledBank)}
+_banks = {}
+_banks_lock = threading.Lock()
+
+
+def load_bank(role: str) -> CompiledBank:
+    """Return the role's compiled bank, loading and compiling it again only if the storage reports a change."""
+    storage = get_storage()
+    # Read before loading, so an edit made in between only costs one more compile
+    version = storage.mcqs_version(role)
+    cached = _banks.get(role)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    bank = compile_bank(role, storage.load_mcqs(role))
+    with _banks_lock:
+        _banks[role] = (version, bank)
+    return bank
+
+
+def draw(bank: CompiledBank, seed: int, size: int = QUESTIONS_PER_TEST) -> List[int]:
+    """Pick `size` distinct question indices (or the whole bank, if smaller), in random order."""
+    return random.Random(seed).sample(range(len(bank.questions)), min(size, len(bank.questions)))
+
+
+class BankChangedError(Exception):
+    """Raised when a test is resumed after its role's bank has changed."""
+
+
+def start_test(role: str, seed: Optional[int] = None, size: int = QUESTIONS_PER_TEST) -> Dict:
+    """
+    Start a test for one candidate and return its state, to be kept in the session.
+
+    The state holds the drawn questions themselves, so the test is unaffected by edits to the bank while it runs.
+    """
+    bank = load_bank(role)
+    if seed is None:
+        seed = secrets.randbits(32)
+    indices = draw(bank, seed, size)
+    return {
+        "role": role,
+        "seed": seed,
+        "size": size,
+        "bank_version": bank.version,
+        "indices": indices,
+        "questions": tuple(bank.questions[index] for index in indices),
+        "progress": 0,
+        "answers": [],
+        "completed": False,
+        "result": None,
+        "started_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def restore_test(role: str, seed: int, bank_version: str, answers: List[int], size: int = QUESTIONS_PER_TEST) -> Dict:
+    """
+    Rebuild a test's state from its seed and the answers given so far, for clients that keep no session.
+
+    Raises BankChangedError if the role's bank is no longer the version the test was drawn from,
+    and ValueError if there are more answers than questions or an answer isn't one of its question's options.
+    """
+    test_state = start_test(role, seed, size)
+    if test_state["bank_version"] != bank_version:
+        raise BankChangedError(f"The {role} question bank has changed since this test was started")
+    if len(answers) > len(test_state["questions"]):
+        raise ValueError(f"The test has {len(test_state['questions'])} questions but {len(answers)} answers were given")
+    for number, (question, answer) in enumerate(zip(test_state["questions"], answers), start=1):
+        if answer not in range(len(question.options)):
+            raise ValueError(f"Question {number} has {len(question.options)} options, so {answer} is not an answer")
+    test_state["answers"] = list(answers)
+    test_state["progress"] = min(len(answers), max(len(test_state["questions"]) - 1, 0))
+    test_state["completed"] = len(answers) == len(test_state["questions"])
+    return test_state
+
+
+def score(questions: Tuple[Question, ...], answers: List[int]) -> int:
+    """Number of correct answers."""
+    return sum(question.answer == answer for question, answer in zip(questions, answers))
+
+
+def answer_question(test_state: Dict, option_index: int, email: str = "") -> None:
+    """Record the answer to the current question, finishing the test after the last one."""
+    test_state["answers"].append(option_index)
+    if test_state["progress"] + 1 < len(test_state["questions"]):
+        test_state["progress"] += 1
+    else:
+        finish_test(test_state, email)
+
+
+def finish_test(test_state: Dict, email: str = "") -> Dict:
+    """Score a completed test, store the attempt and return the result."""
+    correct = score(test_state["questions"], test_state["answers"])
+    total = len(test_state["questions"])
+    result = {
+        "correct": correct,
+        "total": total,
+        "score": correct / total if total else 0.0,
+        "passed": total == 0 or correct / total >= PASSING_SCORE,
+    }
+    test_state["completed"] = True
+    test_state["result"] = result
+    get_storage().record_test_attempt({
+        "role": test_state["role"],
+        "email": email,
+        "seed": test_state["seed"],
+        "bank_version": test_state["bank_version"],
+        "questions": test_state["indices"],
+        "answers": test_state["answers"],
+        **result,
+        "started_at": test_state["started_at"],
+        "completed_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    return result
@@ -0,0 +1,248 @@
+"""
+Durable SMTP outbox with a background sender.
+
+Emails are written to a spool directory (outbox/pending) as soon as they are
+queued, so the Streamlit script never waits on the SMTP handshake. A single
+background thread per process sends them over a reused, authenticated SMTP
+connection, retrying failures with exponential backoff before giving up and
+moving the message to outbox/failed.
+
+The SMTP server is configured with environment variables so the outbox can
+be exercised offline against a local debugging server:
+
+    SMTP_HOST      (default smtp.gmail.com)
+    SMTP_PORT      (default 587)
+    SMTP_STARTTLS  (default 1; set to 0 for a local debugging server)
+
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=0 streamlit run ai_recruitment_agent_team.py
+
+App passwords are only kept in memory. Messages left in the spool after a
+restart are sent once the sender's credentials are registered again, which
+happens the next time that sender queues an email.
+"""
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DIR = "outbox"
+PENDING, INFLIGHT, SENT, FAILED = "pending", "inflight", "sent", "failed"
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 5  # Doubled after every failed attempt
+POLL_SECONDS = 2
+IDLE_CONNECTION_SECONDS = 60
+
+_credentials = {}
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def smtp_settings():
+    return (
+        os.environ.get("SMTP_HOST", "smtp.gmail.com"),
+        int(os.environ.get("SMTP_PORT", "587")),
+        os.environ.get("SMTP_STARTTLS", "1") != "0",
+    )
+
+
+def _path(state, message_id):
+    return os.path.join(OUTBOX_DIR, state, f"{message_id}.json")
+
+
+def _write_atomic(path, record):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(record, file)
+    os.replace(tmp_path, path)
+
+
+def enqueue_email(message, sender_email, sender_password, recipients):
+    """
+    Durably queue an email for the background sender and return its message id.
+
+    Args:
+        message: The email.message.Message to send.
+        sender_email (str): Address used for the SMTP login and envelope sender.
+        sender_password (str): App password of the sender, kept only in memory.
+        recipients (list): Envelope recipients.
+    """
+    for state in (PENDING, INFLIGHT, SENT, FAILED):
+        os.makedirs(os.path.join(OUTBOX_DIR, state), exist_ok=True)
+
+    message_id = uuid.uuid4().hex
+    record = {
+        "id": message_id,
+        "sender": sender_email,
+        "recipients": list(recipients),
+        "subject": message["Subject"],
+        "raw": message.as_string(),
+        "attempts": 0,
+        "next_attempt_at": 0,
+        "created_at": time.time(),
+        "last_error": None,
+    }
+    _credentials[sender_email] = sender_password
+    _write_atomic(_path(PENDING, message_id), record)
+
+    ensure_worker()
+    _wakeup.set()
+    return message_id
+
+
+def message_status(message_id):
+    """Return "queued", "sent", "failed" or "unknown" for a queued message."""
+    if os.path.exists(_path(SENT, message_id)):
+        return "sent"
+    if os.path.exists(_path(FAILED, message_id)):
+        return "failed"
+    if os.path.exists(_path(PENDING, message_id)):
+        return "queued"
+    inflight_dir = os.path.join(OUTBOX_DIR, INFLIGHT)
+    if os.path.isdir(inflight_dir) and any(name.startswith(message_id) for name in os.listdir(inflight_dir)):
+        return "queued"
+    return "unknown"
+
+
+class SmtpConnection:
+    """An authenticated SMTP connection that is reused across messages from one sender."""
+
+    def __init__(self, sender_email):
+        self.sender_email = sender_email
+        self.server = None
+        self.last_used = 0
+
+    def _open(self, password):
+        host, port, use_starttls = smtp_settings()
+        server = smtplib.SMTP(host, port, timeout=30)
+        if use_starttls:
+            server.starttls()  # Start TLS encryption
+        server.ehlo_or_helo_if_needed()
+        if server.has_extn("auth"):
+            server.login(self.sender_email, password)
+        self.server = server
+
+    def send(self, password, recipients, raw):
+        if self.server is not None:
+            try:
+                self.server.noop()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self.server is None:
+            self._open(password)
+        self.server.sendmail(self.sender_email, recipients, raw)
+        self.last_used = time.time()
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+
+def _requeue_orphans():
+    """Move messages claimed by processes that no longer exist back to pending."""
+    inflight_dir = os.path.join(OUTBOX_DIR, INFLIGHT)
+    if not os.path.isdir(inflight_dir):
+        return
+    for name in os.listdir(inflight_dir):
+        if not name.endswith(".json"):
+            continue
+        message_id, _, pid = name[:-len(".json")].partition(".")
+        try:
+            os.kill(int(pid), 0)
+            continue  # The owning process is still running
+        except (ValueError, ProcessLookupError):
+            pass
+        except PermissionError:
+            continue
+        os.replace(os.path.join(inflight_dir, name), _path(PENDING, message_id))
+
+
+def _claim(message_id):
+    """Atomically move a pending message to inflight so only one worker sends it."""
+    claimed = os.path.join(OUTBOX_DIR, INFLIGHT, f"{message_id}.{os.getpid()}.json")
+    try:
+        os.replace(_path(PENDING, message_id), claimed)
+    except FileNotFoundError:
+        return None
+    return claimed
+
+
+def process_outbox(connections):
+    """Send every due pending message once. Returns the number of messages handled."""
+    pending_dir = os.path.join(OUTBOX_DIR, PENDING)
+    if not os.path.isdir(pending_dir):
+        return 0
+
+    handled = 0
+    now = time.time()
+    for name in sorted(os.listdir(pending_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(pending_dir, name), "r") as file:
+                record = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        password = _credentials.get(record["sender"])
+        if record["next_attempt_at"] > now or password is None:
+            continue
+
+        claimed = _claim(record["id"])
+        if claimed is None:
+            continue
+
+        connection = connections.setdefault(record["sender"], SmtpConnection(record["sender"]))
+        try:
+            connection.send(password, record["recipients"], record["raw"])
+            record["sent_at"] = time.time()
+            _write_atomic(claimed, record)
+            os.replace(claimed, _path(SENT, record["id"]))
+            logger.info(f"Sent email {record['id']} to {', '.join(record['recipients'])}")
+        except (smtplib.SMTPException, OSError) as e:
+            connection.close()
+            record["attempts"] += 1
+            record["last_error"] = str(e)
+            record["next_attempt_at"] = time.time() + BACKOFF_SECONDS * 2 ** (record["attempts"] - 1)
+            _write_atomic(claimed, record)
+            state = FAILED if record["attempts"] >= MAX_ATTEMPTS else PENDING
+            os.replace(claimed, _path(state, record["id"]))
+            logger.error(f"Error sending email {record['id']} (attempt {record['attempts']}): {e}")
+        handled += 1
+    return handled
+
+
+def _run_worker():
+    connections = {}
+    _requeue_orphans()
+    while True:
+        _wakeup.wait(POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            process_outbox(connections)
+        except Exception as e:
+            logger.error(f"Outbox worker error: {e}")
+
+        # Close connections that have been idle for a while
+        for connection in connections.values():
+            if connection.server is not None and time.time() - connection.last_used > IDLE_CONNECTION_SECONDS:
+                connection.close()
+
+
+def ensure_worker():
+    """Start the background sender thread for this process if it is not running yet."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="smtp-outbox", daemon=True)
+            _worker.start()
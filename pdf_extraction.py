@@ -0,0 +1,163 @@
+"""
+Streaming, bounded PDF text extraction.
+
+Pages are extracted one at a time by a generator, so callers can stop early,
+and every extraction is capped by a page count, a text byte budget and a
+time budget. Long documents can be split into page ranges and extracted on a
+process pool. The page texts are joined once at the end, and a per-page
+timing report is returned alongside the text.
+"""
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+import PyPDF2
+
+MAX_PAGES = 50
+MAX_TEXT_BYTES = 500_000
+MAX_SECONDS = 20.0
+# Documents with at least this many pages are extracted in parallel when allowed
+PARALLEL_PAGE_THRESHOLD = 20
+PAGES_PER_CHUNK = 5
+
+_pool = None
+
+
+class PageText(NamedTuple):
+    number: int  # 1-based page number
+    text: str
+    seconds: float
+
+
+def _extract_page(reader: PyPDF2.PdfReader, index: int) -> PageText:
+    started = time.perf_counter()
+    text = reader.pages[index].extract_text() or ""
+    return PageText(index + 1, text, time.perf_counter() - started)
+
+
+def _limit_bytes(pages: Iterator[PageText], max_bytes: int) -> Iterator[PageText]:
+    """Pass pages through until `max_bytes` of text have been yielded, truncating the last one."""
+    remaining = max_bytes
+    for page in pages:
+        if remaining <= 0:
+            return
+        encoded = page.text.encode("utf-8")
+        if len(encoded) > remaining:
+            page = page._replace(text=encoded[:remaining].decode("utf-8", errors="ignore"))
+        remaining -= len(encoded)
+        yield page
+
+
+def _iter_pages(reader: PyPDF2.PdfReader, max_pages: int, max_seconds: float) -> Iterator[PageText]:
+    deadline = time.perf_counter() + max_seconds
+    for index in range(min(len(reader.pages), max_pages)):
+        if time.perf_counter() > deadline:
+            return
+        yield _extract_page(reader, index)
+
+
+def iter_pdf_pages(pdf_file, max_pages: int = MAX_PAGES, max_bytes: int = MAX_TEXT_BYTES,
+                   max_seconds: float = MAX_SECONDS) -> Iterator[PageText]:
+    """
+    Yield the text of each page in order until a page, byte or time budget is exhausted.
+
+    `pdf_file` may also be an already opened PyPDF2.PdfReader. The page that
+    crosses the byte budget is truncated to fit it.
+    """
+    reader = pdf_file if isinstance(pdf_file, PyPDF2.PdfReader) else PyPDF2.PdfReader(pdf_file)
+    # Pages are extracted lazily, so nothing past the budget is ever parsed
+    yield from _limit_bytes(_iter_pages(reader, max_pages, max_seconds), max_bytes)
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[PageText]:
+    """Extract pages [start, stop) of a PDF. Runs inside a worker process."""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return [_extract_page(reader, index) for index in range(start, stop)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned workers are safe to start from a multi-threaded server such as Streamlit
+        _pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1), mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _iter_chunks(futures, deadline: float) -> Iterator[PageText]:
+    """Yield the pages of each chunk in order, stopping at the deadline and cancelling the chunks not yet started."""
+    try:
+        for future in futures:
+            try:
+                pages = future.result(timeout=max(deadline - time.perf_counter(), 0))
+            except FuturesTimeoutError:
+                return
+            yield from pages
+    finally:
+        # Also reached when the byte budget stops the caller early
+        for future in futures:
+            future.cancel()
+
+
+def _iter_pages_parallel(pdf_bytes: bytes, page_count: int, max_bytes: int, max_seconds: float) -> Iterator[PageText]:
+    deadline = time.perf_counter() + max_seconds
+    chunks = [(start, min(start + PAGES_PER_CHUNK, page_count)) for start in range(0, page_count, PAGES_PER_CHUNK)]
+    futures = [_get_pool().submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in chunks]
+    yield from _limit_bytes(_iter_chunks(futures, deadline), max_bytes)
+
+
+def extract_pdf_text(pdf_file, max_pages: int = MAX_PAGES, max_bytes: int = MAX_TEXT_BYTES,
+                     max_seconds: float = MAX_SECONDS, parallel: bool = False) -> Tuple[str, Dict]:
+    """
+    Extract the text of a PDF within the given budgets.
+
+    Args:
+        pdf_file: A path, binary file object or bytes-like object.
+        max_pages (int): Maximum number of pages to read.
+        max_bytes (int): Maximum number of UTF-8 bytes of text to keep.
+        max_seconds (float): Stop reading new pages after this long. In parallel mode, chunks
+            not finished by then are dropped and the ones not yet started are cancelled.
+        parallel (bool): Extract long documents on a process pool.
+
+    Returns:
+        The extracted text and a report with the page counts, per-page timings and total time.
+    """
+    started = time.perf_counter()
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        pdf_file = io.BytesIO(pdf_file)
+
+    pdf_bytes = None
+    if parallel:
+        if isinstance(pdf_file, (str, os.PathLike)):
+            with open(pdf_file, "rb") as file:
+                pdf_bytes = file.read()
+        else:
+            pdf_bytes = pdf_file.read()
+            pdf_file.seek(0)
+        pdf_file = io.BytesIO(pdf_bytes)
+
+    reader = PyPDF2.PdfReader(pdf_file)
+    total_pages = len(reader.pages)
+    parallel = parallel and min(total_pages, max_pages) >= PARALLEL_PAGE_THRESHOLD
+
+    if parallel:
+        pages = list(_iter_pages_parallel(pdf_bytes, min(total_pages, max_pages), max_bytes, max_seconds))
+    else:
+        pages = list(iter_pdf_pages(reader, max_pages, max_bytes, max_seconds))
+
+    # Join once at the end instead of growing a string page by page
+    text = "\n".join(page.text for page in pages)
+    report = {
+        "pages": len(pages),
+        "total_pages": total_pages,
+        "truncated": len(pages) < total_pages or sum(len(page.text.encode("utf-8")) for page in pages) >= max_bytes,
+        "parallel": parallel,
+        "page_seconds": [round(page.seconds, 4) for page in pages],
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    return text, report
@@ -0,0 +1,273 @@
+"""
+Streaming top-K candidate ranking per role.
+
+Every scored resume is offered to its role's ranking, a bounded min-heap of
+the best TOP_K candidates kept in rankings/<role>.json. A candidate that
+doesn't beat the current minimum of a full ranking costs one small read.
+
+A role can also be re-ranked against its current criteria by streaming every
+indexed resume through the skill matcher, and a full ranked export is
+produced with an external merge sort: sorted runs of at most
+EXPORT_CHUNK_SIZE candidates are spilled to temporary files and merged, so
+memory stays bounded however large the corpus is.
+
+    python ranking.py top --role backend_engineer
+    python ranking.py rerank --role backend_engineer
+    python ranking.py export --role backend_engineer --output ranking.jsonl
+"""
+import argparse
+import fcntl
+import heapq
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import resume_cache
+import resume_index
+from skill_matcher import score_resume
+from storage import get_storage
+
+RANKINGS_DIR = "rankings"
+TOP_K = 100
+EXPORT_CHUNK_SIZE = 10_000
+
+
+def _role_filename(role):
+    """
+    File name stem for a role's ranking.
+
+    Role names can contain any characters, so other characters are replaced and
+    a hash of the name is appended to keep the stems of different roles apart.
+    """
+    safe = "".join(char if char.isalnum() or char in "-_" else "_" for char in role)
+    if safe == role and role:
+        return role
+    return f"{safe or 'role'}-{resume_cache.sha256(role)[:12]}"
+
+
+def _ranking_path(role):
+    return os.path.join(RANKINGS_DIR, f"{_role_filename(role)}.json")
+
+
+def export_path(role):
+    """Where the app writes the role's full ranking export."""
+    return os.path.join(RANKINGS_DIR, f"{_role_filename(role)}_export.jsonl")
+
+
+@contextmanager
+def _role_lock(role):
+    """Serialize updates to one role's ranking across threads and processes."""
+    os.makedirs(RANKINGS_DIR, exist_ok=True)
+    with open(os.path.join(RANKINGS_DIR, f".{_role_filename(role)}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load(role):
+    try:
+        with open(_ranking_path(role), "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save(role, ranking):
+    path = _ranking_path(role)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w") as file:
+        json.dump(ranking, file, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _heap_key(entry):
+    return (entry["score"], entry["scored_at"])
+
+
+def _entry(candidate, analysis, name="", email=""):
+    return {
+        "score": analysis["score"],
+        "scored_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        "candidate": candidate,
+        "name": name,
+        "email": email,
+        "experience_level": analysis.get("experience_level"),
+        "matching_skills": analysis.get("matching_skills", []),
+    }
+
+
+class TopK:
+    """Bounded min-heap of the K best entries, holding each candidate at most once."""
+
+    def __init__(self, k, entries=()):
+        self.k = k
+        self.heap = [(_heap_key(entry), entry["candidate"], entry) for entry in entries]
+        heapq.heapify(self.heap)
+        self.members = {item[1] for item in self.heap}
+
+    def push(self, entry):
+        """Offer an entry; returns True if it was kept."""
+        item = (_heap_key(entry), entry["candidate"], entry)
+        if item[1] in self.members:
+            return False
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[:2] > self.heap[0][:2]:
+            self.members.discard(heapq.heapreplace(self.heap, item)[1])
+        else:
+            return False
+        self.members.add(item[1])
+        return True
+
+    def entries(self):
+        """Entries in heap order, so entries()[0] is always the current minimum."""
+        return [item[2] for item in self.heap]
+
+
+def record_score(role, criteria, resume_text, analysis, name="", email="", k=TOP_K):
+    """
+    Offer a freshly scored resume to the role's top-K ranking.
+
+    `analysis` is the dict returned by skill_matcher.score_resume. Rankings
+    built against different criteria text are discarded and started over.
+    Returns True if the candidate is now in the ranking.
+    """
+    criteria_hash = resume_cache.sha256(criteria)
+    candidate = resume_cache.sha256(resume_text)
+    entry = _entry(candidate, analysis, name, email)
+
+    # Cheap check without the lock: the minimum of a full ranking only ever rises
+    ranking = _load(role)
+    if (
+        ranking is not None
+        and ranking["criteria"] == criteria_hash
+        and len(ranking["entries"]) >= k
+        and all(existing["candidate"] != candidate for existing in ranking["entries"])
+        and _heap_key(entry) <= _heap_key(ranking["entries"][0])
+    ):
+        return False
+
+    with _role_lock(role):
+        ranking = _load(role)
+        if ranking is None or ranking["criteria"] != criteria_hash:
+            ranking = {"criteria": criteria_hash, "entries": []}
+        # A re-scored candidate replaces their previous entry
+        top = TopK(k, (existing for existing in ranking["entries"] if existing["candidate"] != candidate))
+        kept = top.push(entry)
+        ranking["entries"] = top.entries()
+        _save(role, ranking)
+    return kept
+
+
+def top_candidates(role, limit=None):
+    """Return the role's ranked candidates, best first."""
+    ranking = _load(role)
+    if ranking is None:
+        return []
+    entries = sorted(ranking["entries"], key=_heap_key, reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def _score_corpus(role, criteria):
+    """Yield a ranking entry for every indexed resume scored against the role's criteria."""
+    for digest, name, email, text in resume_index.iter_documents():
+        analysis = score_resume(text, criteria, role)
+        yield _entry(resume_cache.sha256(text), analysis, name or "", email or "")
+
+
+def rerank(role, criteria=None, k=TOP_K):
+    """
+    Re-rank every indexed resume against the role's criteria and replace its top-K.
+
+    Only the K best candidates are ever held in memory. Returns the number of resumes scored.
+    """
+    if criteria is None:
+        criteria = get_storage().load_roles()[role]
+    top = TopK(k)
+    scored = 0
+    for entry in _score_corpus(role, criteria):
+        top.push(entry)
+        scored += 1
+
+    with _role_lock(role):
+        _save(role, {"criteria": resume_cache.sha256(criteria), "entries": top.entries()})
+    return scored
+
+
+def _spill(chunk, directory):
+    chunk.sort(key=_heap_key, reverse=True)
+    file = tempfile.NamedTemporaryFile("w", dir=directory, suffix=".jsonl", delete=False)
+    with file:
+        for entry in chunk:
+            file.write(json.dumps(entry) + "\n")
+    return file.name
+
+
+def _read_run(path):
+    with open(path, "r") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def export_ranking(role, output, criteria=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write every indexed resume, scored against the role and best first, to `output` as JSON lines.
+
+    Returns the number of candidates written.
+    """
+    if criteria is None:
+        criteria = get_storage().load_roles()[role]
+    with tempfile.TemporaryDirectory(prefix="ranking-") as directory:
+        runs = []
+        chunk = []
+        for entry in _score_corpus(role, criteria):
+            chunk.append(entry)
+            if len(chunk) >= chunk_size:
+                runs.append(_spill(chunk, directory))
+                chunk = []
+        if chunk:
+            runs.append(_spill(chunk, directory))
+
+        written = 0
+        for rank, entry in enumerate(
+            heapq.merge(*(_read_run(path) for path in runs), key=_heap_key, reverse=True), start=1
+        ):
+            output.write(json.dumps({"rank": rank, **entry}) + "\n")
+            written += 1
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank candidates for a role.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    top = subparsers.add_parser("top", help="Show the role's current top candidates")
+    top.add_argument("--role", required=True)
+    top.add_argument("--limit", type=int, default=20)
+    rerank_parser = subparsers.add_parser("rerank", help="Re-rank all indexed resumes against the role")
+    rerank_parser.add_argument("--role", required=True)
+    rerank_parser.add_argument("--k", type=int, default=TOP_K, help="Number of candidates to keep")
+    export = subparsers.add_parser("export", help="Write the full ranking as JSON lines")
+    export.add_argument("--role", required=True)
+    export.add_argument("--output", help="File to write to (defaults to stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command == "top":
+        for rank, entry in enumerate(top_candidates(args.role, args.limit), start=1):
+            print(f"{rank:>3}. {entry['score']:.2f}  {entry['name'] or entry['candidate'][:12]}  {entry['email'] or ''}")
+    elif args.command == "rerank":
+        print(f"Scored {rerank(args.role, k=args.k)} resumes for {args.role}")
+    elif args.output:
+        with open(args.output, "w") as output:
+            count = export_ranking(args.role, output)
+        print(f"Wrote {count} ranked candidates to {args.output}")
+    else:
+        export_ranking(args.role, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Content-addressed disk cache for parsed resumes and analysis results.
+
+Level one maps the SHA-256 of the uploaded PDF bytes to its extracted text.
+Level two maps (SHA-256 of the text, SHA-256 of the role criteria) to the
+analysis result. Entries are plain files under CACHE_DIR; a hit refreshes the
+file's mtime, and once the cache grows past MAX_CACHE_BYTES the least
+recently used entries are evicted.
+"""
+import hashlib
+import json
+import os
+import threading
+
+CACHE_DIR = os.path.join(".cache", "resumes")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Evict down to this fraction of the cap so eviction doesn't run on every write
+EVICT_TO_FRACTION = 0.9
+
+_size_lock = threading.Lock()
+_cache_size = None
+
+
+def sha256(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _entry_path(level, key):
+    return os.path.join(CACHE_DIR, level, key[:2], key)
+
+
+def _read(level, key):
+    path = _entry_path(level, key)
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # Mark as recently used
+    except FileNotFoundError:
+        pass
+    return data
+
+
+def _write(level, key, data: bytes):
+    global _cache_size
+    path = _entry_path(level, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+    with _size_lock:
+        if _cache_size is None:
+            _cache_size = sum(size for _, size, _ in _iter_entries())
+        else:
+            _cache_size += len(data)
+        if _cache_size > MAX_CACHE_BYTES:
+            _cache_size = _evict(int(MAX_CACHE_BYTES * EVICT_TO_FRACTION))
+
+
+def _iter_entries():
+    """Yield (path, size, mtime) for every cache entry."""
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+
+def _evict(target_bytes):
+    """Delete least recently used entries until the cache fits in target_bytes. Returns the new size."""
+    entries = sorted(_iter_entries(), key=lambda entry: entry[2])
+    total = sum(size for _, size, _ in entries)
+    for path, size, _ in entries:
+        if total <= target_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+def get_text(pdf_digest):
+    """Return the cached text for the PDF with this SHA-256, or None."""
+    data = _read("text", pdf_digest)
+    return data.decode("utf-8") if data is not None else None
+
+
+def put_text(pdf_digest, text):
+    _write("text", pdf_digest, text.encode("utf-8"))
+
+
+def analysis_key(resume_text, criteria, *extra):
+    """Cache key for an analysis: the text hash, the criteria hash and any extra qualifiers (e.g. a model)."""
+    return "-".join([sha256(resume_text), sha256(criteria), *(sha256(part)[:16] for part in extra)])
+
+
+def get_analysis(key):
+    """Return the cached analysis dict for this key, or None."""
+    data = _read("analysis", key)
+    return json.loads(data) if data is not None else None
+
+
+def put_analysis(key, analysis):
+    _write("analysis", key, json.dumps(analysis).encode("utf-8"))
@@ -0,0 +1,291 @@
+"""
+On-disk full-text index over every processed resume.
+
+Each resume is tokenized once, when its text is first extracted, and its term
+frequencies are appended to an inverted index kept in SQLite (resume_index.db,
+or the path in RESUME_INDEX_DB). Postings are clustered by term, so a query
+reads only the postings of its own terms and ranks them with BM25; the
+resume texts themselves are only read to build snippets for the top results.
+
+    python resume_index.py search "kubernetes go" --days 30
+"""
+import argparse
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+DEFAULT_DB_PATH = "resume_index.db"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+SNIPPET_CHARS = 160
+
+# Keeps "c++", "c#", "node.js" and "ci/cd"-style halves as single tokens
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "were", "with",
+}
+MAX_TOKEN_LENGTH = 40
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    name TEXT,
+    role TEXT,
+    email TEXT,
+    length INTEGER NOT NULL,
+    added_at TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_added_at ON docs (added_at);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    doc_length INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+def tokenize(text):
+    """Lowercase `text` and split it into index terms."""
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS and len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+
+def _db_path():
+    return os.environ.get("RESUME_INDEX_DB", DEFAULT_DB_PATH)
+
+
+def _connect():
+    db_path = _db_path()
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        # Bulk screening indexes from several processes at once, so wait on locks instead of failing
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _schema_lock:
+            if db_path not in _schema_ready:
+                with conn:
+                    conn.executescript(SCHEMA)
+                _schema_ready.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+def _bump_meta(conn, key, amount):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+        (key, amount),
+    )
+
+
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else 0
+
+
+def index_resume(digest, text, name="", role="", email=""):
+    """
+    Add a resume to the index. `digest` is the SHA-256 of the PDF bytes.
+
+    Returns False if a resume with the same digest is already indexed.
+    """
+    counts = Counter(tokenize(text))
+    length = sum(counts.values())
+    conn = _connect()
+    with conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO docs (digest, name, role, email, length, added_at, text) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (digest, name, role, email, length, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), text),
+        )
+        if not cursor.rowcount:
+            return False
+        doc_id = cursor.lastrowid
+
+        terms = [(term,) for term in counts]
+        conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", terms)
+        conn.executemany("UPDATE terms SET df = df + 1 WHERE term = ?", terms)
+        term_ids = dict(_select_term_ids(conn, list(counts)))
+        conn.executemany(
+            "INSERT INTO postings (term_id, doc_id, tf, doc_length) VALUES (?, ?, ?, ?)",
+            [(term_ids[term], doc_id, tf, length) for term, tf in counts.items()],
+        )
+        _bump_meta(conn, "doc_count", 1)
+        _bump_meta(conn, "total_length", length)
+    return True
+
+
+def _select_term_ids(conn, terms, chunk_size=500):
+    for start in range(0, len(terms), chunk_size):
+        chunk = terms[start:start + chunk_size]
+        placeholders = ", ".join("?" * len(chunk))
+        yield from conn.execute(f"SELECT term, id FROM terms WHERE term IN ({placeholders})", chunk)
+
+
+def update_resume(digest, **fields):
+    """Set the name, role and/or email recorded for an indexed resume."""
+    fields = {key: value for key, value in fields.items() if key in ("name", "role", "email") and value}
+    if not fields:
+        return
+    assignments = ", ".join(f"{key} = ?" for key in fields)
+    conn = _connect()
+    with conn:
+        conn.execute(f"UPDATE docs SET {assignments} WHERE digest = ?", (*fields.values(), digest))
+
+
+def _snippet(text, terms):
+    lowered = text.lower()
+    positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+    start = max(min(positions, default=0) - SNIPPET_CHARS // 4, 0)
+    snippet = " ".join(text[start:start + SNIPPET_CHARS].split())
+    return ("..." if start else "") + snippet + ("..." if start + SNIPPET_CHARS < len(text) else "")
+
+
+def search(query, limit=20, role=None, days=None, match_all=False):
+    """
+    Return the `limit` best resumes for a free-text query, ranked by BM25.
+
+    Args:
+        query (str): Search terms, e.g. "kubernetes go".
+        limit (int): Maximum number of results.
+        role (str): Only return resumes submitted for this role.
+        days (int): Only return resumes indexed within this many days.
+        match_all (bool): Only return resumes containing every query term.
+
+    Returns:
+        A list of dicts with the resume's name, role, email, added_at, score and snippet.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+
+    conn = _connect()
+    doc_count = _get_meta(conn, "doc_count")
+    if not doc_count:
+        return []
+    average_length = _get_meta(conn, "total_length") / doc_count
+
+    filters, params = [], []
+    if role:
+        filters.append("d.role = ?")
+        params.append(role)
+    if days:
+        filters.append("d.added_at >= ?")
+        params.append((datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S"))
+    if filters:
+        postings_sql = (
+            "SELECT p.doc_id, p.tf, p.doc_length FROM postings p JOIN docs d ON d.id = p.doc_id "
+            f"WHERE p.term_id = ? AND {' AND '.join(filters)}"
+        )
+    else:
+        postings_sql = "SELECT doc_id, tf, doc_length FROM postings WHERE term_id = ?"
+
+    scores = {}
+    matched_terms = Counter()
+    for term in terms:
+        row = conn.execute("SELECT id, df FROM terms WHERE term = ?", (term,)).fetchone()
+        if row is None or not row[1]:
+            if match_all:
+                return []
+            continue
+        term_id, df = row
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        for doc_id, tf, doc_length in conn.execute(postings_sql, (term_id, *params)):
+            norm = K1 * (1 - B + B * doc_length / average_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            matched_terms[doc_id] += 1
+
+    if match_all:
+        scores = {doc_id: score for doc_id, score in scores.items() if matched_terms[doc_id] == len(terms)}
+    top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    results = []
+    for doc_id, score in top:
+        name, doc_role, email, added_at, text = conn.execute(
+            "SELECT name, role, email, added_at, text FROM docs WHERE id = ?", (doc_id,)
+        ).fetchone()
+        results.append({
+            "name": name,
+            "role": doc_role,
+            "email": email,
+            "added_at": added_at,
+            "score": round(score, 3),
+            "snippet": _snippet(text, terms),
+        })
+    return results
+
+
+def iter_documents(role=None, batch_size=500):
+    """Yield (digest, name, email, text) for every indexed resume, reading `batch_size` rows at a time."""
+    # A dedicated connection, so the caller can keep writing through the thread's own connection meanwhile
+    conn = sqlite3.connect(_db_path(), timeout=30)
+    try:
+        if role:
+            cursor = conn.execute("SELECT digest, name, email, text FROM docs WHERE role = ? ORDER BY id", (role,))
+        else:
+            cursor = conn.execute("SELECT digest, name, email, text FROM docs ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def indexed_count():
+    """Return the number of indexed resumes."""
+    return _get_meta(_connect(), "doc_count")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the resume index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search_parser = subparsers.add_parser("search", help="Run a ranked search over the indexed resumes")
+    search_parser.add_argument("query", help="Search terms")
+    search_parser.add_argument("--role", help="Only return resumes for this role")
+    search_parser.add_argument("--days", type=int, help="Only return resumes indexed within this many days")
+    search_parser.add_argument("--all", action="store_true", help="Require every term to match")
+    search_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = search(args.query, args.limit, args.role, args.days, args.all)
+    for result in results:
+        print(f"{result['score']:>8}  {result['added_at']}  {result['role'] or '-'}  {result['name'] or '-'}  {result['snippet']}")
+    print(f"{len(results)} results from {indexed_count()} resumes in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Deterministic local resume scorer.
+
+A role's criteria text from roles.json is parsed into a list of required
+skills, each with its accepted spellings and synonyms. All of them are
+compiled once per criteria text into an Aho-Corasick automaton, so a resume
+is matched against every skill in a single linear pass over its text.
+"""
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+# Share of required skills a resume must cover to be selected for the test
+SELECTION_THRESHOLD = 0.7
+
+# Extra spellings and closely related terms for common skills (all lowercase)
+SYNONYMS = {
+    "machine learning": ["ml", "scikit-learn", "sklearn"],
+    "deep learning": ["dl", "neural networks"],
+    "neural networks": ["neural network", "cnn", "rnn", "transformers"],
+    "pytorch": ["torch"],
+    "tensorflow": ["keras"],
+    "llm": ["llms", "large language models", "large language model"],
+    "rag": ["retrieval augmented generation", "retrieval-augmented generation"],
+    "finetuning": ["fine-tuning", "fine tuning"],
+    "prompt engineering": ["prompting"],
+    "mlops": ["ml ops", "model deployment"],
+    "data preprocessing": ["data cleaning", "feature engineering", "pandas"],
+    "react": ["react.js", "reactjs"],
+    "vue.js": ["vue", "vuejs"],
+    "angular": ["angularjs"],
+    "html5": ["html"],
+    "css3": ["css"],
+    "javascript": ["js", "es6"],
+    "typescript": ["ts"],
+    "responsive design": ["responsive", "media queries"],
+    "state management": ["redux", "vuex", "mobx", "zustand"],
+    "frontend testing": ["jest", "cypress", "testing library", "playwright"],
+    "node.js": ["nodejs", "express.js"],
+    "rest apis": ["rest api", "restful", "restful apis"],
+    "database": ["sql", "postgresql", "mysql", "mongodb"],
+    "system architecture": ["system design", "microservices", "software architecture"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud"],
+    "azure": ["microsoft azure"],
+    "kubernetes": ["k8s"],
+    "ci/cd": ["cicd", "continuous integration", "github actions", "jenkins"],
+}
+
+# Words that only qualify a skill and are dropped to get its core term
+GENERIC_WORDS = {
+    "and", "or", "of", "the", "with", "in", "algorithms", "frameworks", "framework",
+    "design", "management", "analysis", "services", "service", "skills", "knowledge",
+}
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+_YEARS = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)")
+
+
+class Skill(NamedTuple):
+    name: str  # As written in the criteria, e.g. "PyTorch/TensorFlow"
+    patterns: Tuple[str, ...]  # Lowercase phrases that count as a match
+
+
+def _split_alternatives(item: str) -> List[str]:
+    """Split "React/Vue.js/Angular" into alternatives while keeping short tokens like "CI/CD" whole."""
+    parts = [part.strip() for part in item.split("/")]
+    if len(parts) > 1 and all(len(part) > 2 for part in parts):
+        return parts
+    return [item.strip()]
+
+
+def _patterns_for(phrase: str) -> List[str]:
+    phrase = " ".join(phrase.lower().split())
+    patterns = [phrase]
+    # "Finetuning and Prompt Engineering" is satisfied by either half
+    parts = phrase.split(" and ") if " and " in phrase else [phrase]
+    for part in parts:
+        words = part.split()
+        if all(word in GENERIC_WORDS for word in words):
+            continue
+        patterns.append(part)
+        # "Database design" -> "database", unless the phrase has its own synonyms
+        core = " ".join(word for word in words if word not in GENERIC_WORDS)
+        if core != part and part not in SYNONYMS:
+            patterns.append(core)
+    for term in list(patterns):
+        patterns.extend(SYNONYMS.get(term, []))
+    return patterns
+
+
+def parse_criteria(criteria: str) -> List[Skill]:
+    """Parse a role's criteria text into its list of required skills."""
+    lines = [line for line in criteria.splitlines() if line.strip()]
+    bullets = [_BULLET.sub("", line) for line in lines if _BULLET.match(line)]
+    if not bullets:
+        # Free-form criteria: every line that isn't a heading is a requirement
+        bullets = [line for line in lines if not line.strip().endswith(":")]
+
+    skills = []
+    for bullet in bullets:
+        # "Cloud services (AWS/GCP/Azure)" -> item "Cloud services" accepting AWS, GCP or Azure too
+        extras = []
+        for group in re.findall(r"\(([^)]*)\)", bullet):
+            extras.extend(_split_alternatives(group))
+        bullet = re.sub(r"\([^)]*\)", "", bullet)
+
+        for item in bullet.split(","):
+            item = item.strip().strip("\"'").strip()
+            if not item:
+                continue
+            patterns = []
+            for alternative in _split_alternatives(item) + extras:
+                patterns.extend(_patterns_for(alternative))
+            name = item if not extras else f"{item} ({'/'.join(extras)})"
+            skills.append(Skill(name, tuple(dict.fromkeys(pattern for pattern in patterns if pattern))))
+    return skills
+
+
+class AhoCorasick:
+    """Multi-pattern matcher that finds all patterns in one pass over the text."""
+
+    def __init__(self, patterns: Dict[str, int]):
+        """`patterns` maps each pattern to the id reported when it matches."""
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]  # (pattern id, pattern length)
+
+        for pattern, pattern_id in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((pattern_id, len(pattern)))
+
+        # Breadth-first construction of the failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_ids(self, text: str) -> set:
+        """Return the ids of all patterns that occur in `text` as whole words."""
+        found = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id, length in output[state]:
+                if pattern_id in found:
+                    continue
+                start = end - length + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if not before.isalnum() and not after.isalnum():
+                    found.add(pattern_id)
+        return found
+
+
+class CompiledRole(NamedTuple):
+    skills: Tuple[Skill, ...]
+    matcher: AhoCorasick
+    pattern_skills: Tuple[Tuple[int, ...], ...]  # Pattern id -> indexes of the skills it satisfies
+
+
+@lru_cache(maxsize=256)
+def compile_role(criteria: str) -> CompiledRole:
+    """Parse and compile a role's criteria once; later calls with the same text are free."""
+    skills = tuple(parse_criteria(criteria))
+    pattern_ids: Dict[str, int] = {}
+    pattern_skills: List[List[int]] = []
+    for skill_index, skill in enumerate(skills):
+        for pattern in skill.patterns:
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(pattern_skills)
+                pattern_skills.append([])
+            pattern_skills[pattern_ids[pattern]].append(skill_index)
+    return CompiledRole(skills, AhoCorasick(pattern_ids), tuple(tuple(indexes) for indexes in pattern_skills))
+
+
+def experience_level(text: str) -> str:
+    years = [int(match) for match in _YEARS.findall(text)]
+    most = max(years, default=0)
+    if most >= 5:
+        return "senior"
+    if most >= 2:
+        return "mid"
+    return "junior"
+
+
+def score_resume(resume_text: str, criteria: str, role: str = "") -> Dict:
+    """
+    Score a resume against a role's criteria text.
+
+    Returns a dict with selected, feedback, score, matching_skills, missing_skills and experience_level.
+    """
+    compiled = compile_role(criteria)
+    text = " ".join(resume_text.lower().split())
+
+    matched = set()
+    for pattern_id in compiled.matcher.find_ids(text):
+        matched.update(compiled.pattern_skills[pattern_id])
+
+    matching_skills = [skill.name for index, skill in enumerate(compiled.skills) if index in matched]
+    missing_skills = [skill.name for index, skill in enumerate(compiled.skills) if index not in matched]
+    score = len(matching_skills) / len(compiled.skills) if compiled.skills else 0.0
+    selected = bool(compiled.skills) and score >= SELECTION_THRESHOLD
+
+    role_label = f" for the {role} role" if role else ""
+    if not compiled.skills:
+        feedback = f"No required skills are defined{role_label}."
+    elif selected:
+        feedback = f"The candidate meets {score:.0%} of the required skills{role_label}."
+    else:
+        feedback = (
+            f"The candidate meets {score:.0%} of the required skills{role_label}; "
+            f"at least {SELECTION_THRESHOLD:.0%} is needed. Missing: {', '.join(missing_skills)}."
+        )
+
+    return {
+        "selected": selected,
+        "feedback": feedback,
+        "score": round(score, 4),
+        "matching_skills": matching_skills,
+        "missing_skills": missing_skills,
+        "experience_level": experience_level(text),
+    }
@@ -0,0 +1,78 @@
+"""
+Interview slot engine.
+
+Available slots are "%Y-%m-%d %H:%M:%S" strings, which sort chronologically,
+so they are kept in a sorted list and range queries (such as "the next ten
+future slots") are two bisections instead of a scan. Every change goes
+through the storage backend, which applies it atomically (under a file lock
+for the JSON files, in a transaction for SQLite) and writes only when
+something actually changed, so two candidates can never book the same slot.
+"""
+import bisect
+from datetime import datetime
+from typing import List, Optional
+
+from storage import get_storage
+
+SLOT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_slot(value: datetime) -> str:
+    return value.strftime(SLOT_FORMAT)
+
+
+def parse_slot(slot: str) -> datetime:
+    return datetime.strptime(slot, SLOT_FORMAT)
+
+
+class SlotIndex:
+    """Sorted, read-only view of the available slots."""
+
+    def __init__(self, slots):
+        self.slots: List[str] = sorted(slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, slot):
+        position = bisect.bisect_left(self.slots, slot)
+        return position < len(self.slots) and self.slots[position] == slot
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Slots in [start, end), either bound optional."""
+        low = bisect.bisect_left(self.slots, start) if start else 0
+        high = bisect.bisect_left(self.slots, end) if end else len(self.slots)
+        return self.slots[low:high]
+
+    def upcoming(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[str]:
+        """The next `limit` slots strictly after `now` (defaults to the current time)."""
+        now_slot = format_slot(now or datetime.now())
+        low = bisect.bisect_right(self.slots, now_slot)
+        return self.slots[low:low + limit] if limit else self.slots[low:]
+
+
+def slot_index() -> SlotIndex:
+    """Return an index over the currently available slots."""
+    return SlotIndex(get_storage().load_slots())
+
+
+def add_slot(slot: str) -> bool:
+    """Make a slot available. Returns False if it already is, or is booked."""
+    return get_storage().add_slot(format_slot(parse_slot(slot)))
+
+
+def remove_slot(slot: str) -> bool:
+    return get_storage().remove_slot(slot)
+
+
+def reserve_slot(slot: str, holder: str) -> bool:
+    """Book a slot for `holder`. Returns False if someone else got it first."""
+    return get_storage().reserve_slot(slot, holder)
+
+
+def release_slot(slot: str) -> bool:
+    return get_storage().release_slot(slot)
+
+
+def reservations():
+    return get_storage().load_reservations()
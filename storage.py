@@ -0,0 +1,1056 @@
+"""
+Pluggable storage for roles, MCQs, interview slots, test attempts and analytics.
+
+JsonStorage keeps the original whole-file JSON documents (roles.json,
+predefined_times.json, the analytics event log and the test_attempts.jsonl log)
+and shards the MCQs: mcqs/index.json lists the roles and the order of their
+question ids, and every question is its own mcqs/<role>/<id>.json record, so
+a role is only read when it is used and changing one question rewrites one
+small file. The shards are created from mcqs.json the first time they are needed. SqliteStorage keeps the
+same data as indexed rows in a single SQLite database in WAL mode, so reads
+and writes touch only the rows involved instead of re-parsing and rewriting
+whole files.
+
+The backend is picked with the RECRUITMENT_STORAGE environment variable
+("json", the default, or "sqlite"); RECRUITMENT_DB sets the database path.
+The first time an SQLite database is opened it is filled from the existing
+JSON files, which can also be done explicitly with:
+
+    python storage.py migrate --db recruitment.db
+"""
+import argparse
+import bisect
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import analytics_store
+
+ROLES_FILE = "roles.json"
+MCQS_FILE = "mcqs.json"
+MCQS_DIR = "mcqs"
+SLOTS_FILE = "predefined_times.json"
+TEST_ATTEMPTS_FILE = "test_attempts.jsonl"
+DEFAULT_DB_PATH = "recruitment.db"
+
+# Parsed JSON documents shared by every session in the process, keyed by path
+# and validated against the file's (mtime, size, inode) on every read
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+ROLE_STAT_FIELDS = ("total_applicants", "selected_for_test", "passed", "failed")
+
+
+class Storage:
+    """Interface shared by the storage backends."""
+
+    def load_roles(self):
+        """Return all roles as a {role: criteria} dict."""
+        raise NotImplementedError
+
+    def save_roles(self, roles):
+        """Replace all roles with the given {role: criteria} dict."""
+        raise NotImplementedError
+
+    def load_mcqs(self, role):
+        """Return the list of MCQs for a role, in order, each with the "id" of its record."""
+        raise NotImplementedError
+
+    def load_all_mcqs(self):
+        """Return all MCQs as a {role: [questions]} dict."""
+        raise NotImplementedError
+
+    def mcqs_version(self, role):
+        """
+        Return a token that changes whenever the role's MCQs change, in this process or any other.
+
+        It is cheap to read, so callers can cache what they build from a bank until it changes.
+        """
+        raise NotImplementedError
+
+    def mcq_roles(self):
+        """Return the names of all roles that have MCQs."""
+        raise NotImplementedError
+
+    def save_mcqs(self, role, mcqs):
+        """
+        Replace the MCQs of a single role.
+
+        Questions are matched to the stored records by "id": only records
+        that changed are written, questions without a known id are added and
+        stored questions missing from the list are deleted.
+        """
+        raise NotImplementedError
+
+    def add_mcq(self, role, mcq):
+        """Append a question to a role and return its id."""
+        raise NotImplementedError
+
+    def add_mcqs(self, mcqs_by_role):
+        """
+        Append many questions to one or more roles as a single all-or-nothing write.
+
+        `mcqs_by_role` is a {role: [questions]} dict.
+        """
+        raise NotImplementedError
+
+    def update_mcq(self, role, mcq_id, mcq):
+        """Replace one question. Returns False if the role has no question with that id."""
+        raise NotImplementedError
+
+    def delete_mcq(self, role, mcq_id):
+        """Delete one question. Returns False if the role has no question with that id."""
+        raise NotImplementedError
+
+    def load_slots(self):
+        """Return the available interview slots as a list of "%Y-%m-%d %H:%M:%S" strings."""
+        raise NotImplementedError
+
+    def save_slots(self, slots):
+        """Replace the available interview slots."""
+        raise NotImplementedError
+
+    def add_slot(self, slot):
+        """Make a slot available. Returns False, without writing, if it is already available or booked."""
+        raise NotImplementedError
+
+    def remove_slot(self, slot):
+        """Withdraw an available slot. Returns False, without writing, if it isn't available."""
+        raise NotImplementedError
+
+    def reserve_slot(self, slot, holder):
+        """
+        Atomically book an available slot for `holder`, removing it from the available slots.
+
+        Returns False if the slot is not available, e.g. because another candidate just booked it.
+        """
+        raise NotImplementedError
+
+    def release_slot(self, slot):
+        """Cancel a booking and make its slot available again. Returns False if it wasn't booked."""
+        raise NotImplementedError
+
+    def load_reservations(self):
+        """Return the booked slots as {slot: {"holder": ..., "reserved_at": ...}}."""
+        raise NotImplementedError
+
+    def record_test_attempt(self, attempt):
+        """Store one finished MCQ test attempt (a dict with at least "role" and "completed_at")."""
+        raise NotImplementedError
+
+    def load_test_attempts(self, role=None):
+        """Return the stored test attempts, oldest first, optionally for one role."""
+        raise NotImplementedError
+
+    def record_event(self, event_type, role, **fields):
+        """Record an applicant, test or interview analytics event."""
+        raise NotImplementedError
+
+    def load_analytics(self):
+        """
+        Return the aggregated analytics as {"roles": {...}, "interview_rollups": {"by_role": {...}, "by_day": {...}}}.
+
+        The interview history itself is read a page at a time with query_interviews.
+        """
+        raise NotImplementedError
+
+    def query_interviews(self, role=None, start_date=None, end_date=None, email=None, offset=0, limit=50):
+        """
+        Return (page, total): one page of the matching interviews, newest first, and the number of matches.
+
+        Dates are inclusive "YYYY-MM-DD" strings; email is a case-insensitive substring.
+        """
+        raise NotImplementedError
+
+    def reset_analytics(self, roles):
+        """Reset the analytics to zeroed counters for the given roles."""
+        raise NotImplementedError
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive advisory lock on a lock file, across threads and processes."""
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_json_atomic(path, data):
+    """Write a JSON file through a temporary file, so readers never see it half written."""
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_json_cached(path, default):
+    """
+    Return the parsed contents of a JSON file, re-parsing it only when it changed on disk.
+
+    The returned object is shared with other callers and must not be mutated;
+    the loaders below hand out shallow copies of the top-level containers.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return default
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _json_cache_lock:
+        cached = _json_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return default
+        _json_cache[path] = (signature, data)
+        return data
+
+
+def invalidate_json_cache(path=None):
+    """Drop the cached contents of one JSON file, or of all files when no path is given."""
+    with _json_cache_lock:
+        if path is None:
+            _json_cache.clear()
+        else:
+            _json_cache.pop(path, None)
+
+
+class JsonStorage(Storage):
+    """Storage backed by the JSON files in the working directory."""
+
+    def __init__(self, roles_path=ROLES_FILE, mcqs_path=MCQS_FILE, slots_path=SLOTS_FILE,
+                 attempts_path=TEST_ATTEMPTS_FILE, mcqs_dir=MCQS_DIR):
+        self.roles_path = roles_path
+        # mcqs.json is only read once, to create the shards in mcqs_dir
+        self.mcqs_path = mcqs_path
+        self.mcqs_dir = mcqs_dir
+        self._mcqs_index_path = os.path.join(mcqs_dir, "index.json")
+        # {role directory: ((role version, index document), [questions])}
+        self._role_mcqs_cache = {}
+        self.slots_path = slots_path
+        self.attempts_path = attempts_path
+
+    def _read(self, path, default):
+        return read_json_cached(path, default)
+
+    def _write(self, path, data):
+        try:
+            with open(path, "w") as file:
+                json.dump(data, file, indent=4)
+        finally:
+            invalidate_json_cache(path)
+
+    def load_roles(self):
+        return dict(self._read(self.roles_path, {}) or {})
+
+    def save_roles(self, roles):
+        self._write(self.roles_path, roles)
+
+    def _mcqs_lock(self):
+        return _file_lock(os.path.join(self.mcqs_dir, ".lock"))
+
+    def _mcqs_index(self):
+        """Return the shard index {"roles": {role: {"dir", "order", "next_id"}}}, creating the shards if needed."""
+        index = self._read(self._mcqs_index_path, None)
+        if index is None:
+            self._shard_mcqs_file()
+            index = self._read(self._mcqs_index_path, {"roles": {}})
+        return index
+
+    def _shard_mcqs_file(self):
+        """Split mcqs.json into one record per question, once."""
+        os.makedirs(self.mcqs_dir, exist_ok=True)
+        with self._mcqs_lock():
+            if os.path.exists(self._mcqs_index_path):
+                return
+            try:
+                with open(self.mcqs_path, "r") as file:
+                    mcqs_data = json.load(file)
+            except FileNotFoundError:
+                mcqs_data = {}
+            index = {"roles": {}}
+            for role, mcqs in (mcqs_data if isinstance(mcqs_data, dict) else {}).items():
+                entry = self._new_role_entry(index, role)
+                for mcq in mcqs:
+                    self._write_mcq_record(entry, self._next_mcq_id(entry), mcq)
+            self._write_mcqs_index(index)
+
+    def _read_mcqs_index(self):
+        """Read the index directly, for changes made under the lock."""
+        try:
+            with open(self._mcqs_index_path, "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"roles": {}}
+
+    def _write_mcqs_index(self, index):
+        _write_json_atomic(self._mcqs_index_path, index)
+        invalidate_json_cache(self._mcqs_index_path)
+
+    def _new_role_entry(self, index, role):
+        # Role names can contain any characters, so each role gets a safe, unique directory name
+        base = "".join(char if char.isalnum() or char in "-_" else "_" for char in role) or "role"
+        taken = {entry["dir"] for entry in index["roles"].values()}
+        directory, suffix = base, 1
+        while directory in taken:
+            suffix += 1
+            directory = f"{base}_{suffix}"
+        os.makedirs(os.path.join(self.mcqs_dir, directory), exist_ok=True)
+        entry = index["roles"][role] = {"dir": directory, "order": [], "next_id": 1}
+        return entry
+
+    def _next_mcq_id(self, entry):
+        mcq_id = entry["next_id"]
+        entry["next_id"] += 1
+        entry["order"].append(mcq_id)
+        return mcq_id
+
+    def _mcq_record_path(self, entry, mcq_id):
+        return os.path.join(self.mcqs_dir, entry["dir"], f"{mcq_id}.json")
+
+    def _write_mcq_record(self, entry, mcq_id, mcq):
+        record = {"question": mcq["question"], "options": list(mcq["options"])}
+        if mcq.get("answer") is not None:
+            record["answer"] = mcq["answer"]
+        _write_json_atomic(self._mcq_record_path(entry, mcq_id), record)
+
+    def _mcqs_version_path(self, entry):
+        return os.path.join(self.mcqs_dir, entry["dir"], ".version")
+
+    def _mcqs_version(self, entry):
+        try:
+            with open(self._mcqs_version_path(entry), "r") as file:
+                return int(file.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_mcqs_version(self, entry):
+        """Count a change to the role's records. Only called under the lock, after the records are written."""
+        path = self._mcqs_version_path(entry)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w") as file:
+            file.write(str(self._mcqs_version(entry) + 1))
+        os.replace(tmp_path, path)
+
+    def load_mcqs(self, role):
+        index = self._mcqs_index()
+        entry = index["roles"].get(role)
+        if entry is None:
+            return []
+        # Every change to a role's records bumps its version, in this process or any other
+        signature = (self._mcqs_version(entry), index)
+        cached = self._role_mcqs_cache.get(entry["dir"])
+        if cached is not None and cached[0][0] == signature[0] and cached[0][1] is index:
+            return list(cached[1])
+
+        mcqs = []
+        for mcq_id in entry["order"]:
+            try:
+                with open(self._mcq_record_path(entry, mcq_id), "r") as file:
+                    mcqs.append({"id": mcq_id, **json.load(file)})
+            except FileNotFoundError:
+                continue
+        self._role_mcqs_cache[entry["dir"]] = (signature, mcqs)
+        return list(mcqs)
+
+    def load_all_mcqs(self):
+        return {role: self.load_mcqs(role) for role in self.mcq_roles()}
+
+    def mcqs_version(self, role):
+        entry = self._mcqs_index()["roles"].get(role)
+        if entry is None:
+            return None
+        # The counter covers record changes; the index file's identity covers the shards being created again
+        stat = os.stat(self._mcqs_index_path)
+        return (entry["dir"], self._mcqs_version(entry), stat.st_mtime_ns, stat.st_ino)
+
+    def mcq_roles(self):
+        return [role for role, entry in self._mcqs_index()["roles"].items() if entry["order"]]
+
+    def _change_mcqs(self, role, change):
+        """Apply `change(index, entry)` to a role under the lock, saving the index only if it returns True."""
+        self._mcqs_index()
+        with self._mcqs_lock():
+            index = self._read_mcqs_index()
+            entry = index["roles"].get(role) or self._new_role_entry(index, role)
+            try:
+                result, index_changed = change(index, entry)
+                if index_changed:
+                    self._write_mcqs_index(index)
+            finally:
+                self._bump_mcqs_version(entry)
+                self._role_mcqs_cache.pop(entry["dir"], None)
+            return result
+
+    def save_mcqs(self, role, mcqs):
+        def change(index, entry):
+            existing = {mcq["id"]: mcq for mcq in self.load_mcqs(role)}
+            order = []
+            # Ids already kept, so a copied question with a duplicate id gets a new record
+            seen = set()
+            for mcq in mcqs:
+                mcq_id = mcq.get("id")
+                if mcq_id in existing and mcq_id not in seen:
+                    stored = existing[mcq_id]
+                    if any(mcq.get(key) != stored.get(key) for key in ("question", "options", "answer")):
+                        self._write_mcq_record(entry, mcq_id, mcq)
+                    order.append(mcq_id)
+                    seen.add(mcq_id)
+                else:
+                    mcq_id = entry["next_id"]
+                    entry["next_id"] += 1
+                    self._write_mcq_record(entry, mcq_id, mcq)
+                    order.append(mcq_id)
+            for mcq_id in set(entry["order"]) - seen:
+                _remove_file(self._mcq_record_path(entry, mcq_id))
+            index_changed = order != entry["order"]
+            entry["order"] = order
+            return None, index_changed
+
+        self._change_mcqs(role, change)
+
+    def add_mcq(self, role, mcq):
+        def change(index, entry):
+            mcq_id = self._next_mcq_id(entry)
+            self._write_mcq_record(entry, mcq_id, mcq)
+            return mcq_id, True
+
+        return self._change_mcqs(role, change)
+
+    def add_mcqs(self, mcqs_by_role):
+        self._mcqs_index()
+        with self._mcqs_lock():
+            index = self._read_mcqs_index()
+            entries = []
+            for role, mcqs in mcqs_by_role.items():
+                entry = index["roles"].get(role) or self._new_role_entry(index, role)
+                entries.append(entry)
+                for mcq in mcqs:
+                    self._write_mcq_record(entry, self._next_mcq_id(entry), mcq)
+            # Records that aren't in the index are invisible, so replacing the index is the commit
+            try:
+                self._write_mcqs_index(index)
+            finally:
+                for entry in entries:
+                    self._bump_mcqs_version(entry)
+                    self._role_mcqs_cache.pop(entry["dir"], None)
+
+    def update_mcq(self, role, mcq_id, mcq):
+        def change(index, entry):
+            if mcq_id not in entry["order"]:
+                return False, False
+            self._write_mcq_record(entry, mcq_id, mcq)
+            return True, False
+
+        return self._change_mcqs(role, change)
+
+    def delete_mcq(self, role, mcq_id):
+        def change(index, entry):
+            if mcq_id not in entry["order"]:
+                return False, False
+            entry["order"].remove(mcq_id)
+            _remove_file(self._mcq_record_path(entry, mcq_id))
+            return True, True
+
+        return self._change_mcqs(role, change)
+
+    def load_slots(self):
+        return list(self._read(self.slots_path, {}).get("available_times", []))
+
+    def save_slots(self, slots):
+        with self._slots_lock():
+            document = self._read_slots_document()
+            document["available_times"] = list(slots)
+            self._write_slots_document(document)
+
+    def _slots_lock(self):
+        return _file_lock(f"{self.slots_path}.lock")
+
+    def _read_slots_document(self):
+        # Read the file itself rather than the shared cache: this runs under the lock and must see the latest write
+        try:
+            with open(self.slots_path, "r") as file:
+                document = json.load(file)
+        except FileNotFoundError:
+            document = {}
+        document.setdefault("available_times", [])
+        document.setdefault("reservations", {})
+        return document
+
+    def _write_slots_document(self, document):
+        tmp_path = f"{self.slots_path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(document, file, indent=4)
+            os.replace(tmp_path, self.slots_path)
+        finally:
+            invalidate_json_cache(self.slots_path)
+
+    def _update_slots(self, change):
+        """Apply `change(document)` under the file lock and write only if it returns True."""
+        with self._slots_lock():
+            document = self._read_slots_document()
+            changed = change(document)
+            if changed:
+                self._write_slots_document(document)
+            return changed
+
+    def add_slot(self, slot):
+        def change(document):
+            if slot in document["available_times"] or slot in document["reservations"]:
+                return False
+            bisect.insort(document["available_times"], slot)
+            return True
+        return self._update_slots(change)
+
+    def remove_slot(self, slot):
+        def change(document):
+            if slot not in document["available_times"]:
+                return False
+            document["available_times"].remove(slot)
+            return True
+        return self._update_slots(change)
+
+    def reserve_slot(self, slot, holder):
+        def change(document):
+            if slot not in document["available_times"]:
+                return False
+            document["available_times"].remove(slot)
+            document["reservations"][slot] = {
+                "holder": holder, "reserved_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            return True
+        return self._update_slots(change)
+
+    def release_slot(self, slot):
+        def change(document):
+            if document["reservations"].pop(slot, None) is None:
+                return False
+            if slot not in document["available_times"]:
+                bisect.insort(document["available_times"], slot)
+            return True
+        return self._update_slots(change)
+
+    def load_reservations(self):
+        return dict(self._read(self.slots_path, {}).get("reservations", {}))
+
+    def record_test_attempt(self, attempt):
+        line = (json.dumps(attempt) + "\n").encode("utf-8")
+        # One O_APPEND write per attempt, like the analytics event log
+        fd = os.open(self.attempts_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def load_test_attempts(self, role=None):
+        try:
+            with open(self.attempts_path, "r") as file:
+                attempts = [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [attempt for attempt in attempts if role is None or attempt.get("role") == role]
+
+    def record_event(self, event_type, role, **fields):
+        analytics_store.record_event(event_type, role, **fields)
+
+    def load_analytics(self):
+        # The snapshot's log positions are internal; interview rows are only read through query_interviews
+        data = analytics_store.load_analytics()
+        return {"roles": data["roles"], "interview_rollups": data["interview_rollups"]}
+
+    def query_interviews(self, role=None, start_date=None, end_date=None, email=None, offset=0, limit=50):
+        return analytics_store.query_interviews(role, start_date, end_date, email, offset, limit)
+
+    def reset_analytics(self, roles):
+        analytics_store.reset_analytics(roles)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS roles (
+    name TEXT PRIMARY KEY,
+    criteria TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mcqs (
+    id INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    answer TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_mcqs_role ON mcqs (role, position);
+CREATE TABLE IF NOT EXISTS mcq_versions (
+    role TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS mcqs_inserted AFTER INSERT ON mcqs BEGIN
+    INSERT INTO mcq_versions (role, version) VALUES (NEW.role, 1)
+        ON CONFLICT (role) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS mcqs_updated AFTER UPDATE ON mcqs BEGIN
+    INSERT INTO mcq_versions (role, version) VALUES (NEW.role, 1)
+        ON CONFLICT (role) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS mcqs_deleted AFTER DELETE ON mcqs BEGIN
+    INSERT INTO mcq_versions (role, version) VALUES (OLD.role, 1)
+        ON CONFLICT (role) DO UPDATE SET version = version + 1;
+END;
+CREATE TABLE IF NOT EXISTS slots (
+    time TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    time TEXT PRIMARY KEY,
+    holder TEXT,
+    reserved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS test_attempts (
+    id INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    email TEXT,
+    completed_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_test_attempts_role ON test_attempts (role);
+CREATE TABLE IF NOT EXISTS analytics_events (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    role TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_role ON analytics_events (role);
+CREATE TABLE IF NOT EXISTS role_stats (
+    role TEXT PRIMARY KEY,
+    total_applicants INTEGER NOT NULL DEFAULT 0,
+    selected_for_test INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS interviews (
+    id INTEGER PRIMARY KEY,
+    email TEXT,
+    role TEXT NOT NULL,
+    time TEXT,
+    link TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interviews_role ON interviews (role);
+CREATE INDEX IF NOT EXISTS idx_interviews_email ON interviews (email);
+CREATE INDEX IF NOT EXISTS idx_interviews_time ON interviews (time);
+CREATE TABLE IF NOT EXISTS interview_rollups (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+class SqliteStorage(Storage):
+    """Storage backed by a single SQLite database in WAL mode."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, migrate_from=None):
+        self.db_path = db_path
+        # Streamlit runs every session in its own thread, so each thread gets its own connection
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before the rollups existed get them computed once
+            if not conn.execute("SELECT 1 FROM interview_rollups LIMIT 1").fetchone():
+                self._rebuild_interview_rollups(conn)
+        if migrate_from is not None and not self._get_meta("migrated_at"):
+            self.migrate_from(migrate_from)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get_meta(self, key):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def load_roles(self):
+        rows = self._connect().execute("SELECT name, criteria FROM roles ORDER BY position")
+        return {name: criteria for name, criteria in rows}
+
+    def save_roles(self, roles):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM roles")
+            conn.executemany(
+                "INSERT INTO roles (name, criteria, position) VALUES (?, ?, ?)",
+                [(name, criteria, position) for position, (name, criteria) in enumerate(roles.items())]
+            )
+
+    def _mcq_from_row(self, mcq_id, question, options, answer):
+        mcq = {"id": mcq_id, "question": question, "options": json.loads(options)}
+        if answer is not None:
+            mcq["answer"] = answer
+        return mcq
+
+    def load_mcqs(self, role):
+        rows = self._connect().execute(
+            "SELECT id, question, options, answer FROM mcqs WHERE role = ? ORDER BY position", (role,)
+        )
+        return [self._mcq_from_row(*row) for row in rows]
+
+    def load_all_mcqs(self):
+        mcqs_data = {}
+        rows = self._connect().execute("SELECT role, id, question, options, answer FROM mcqs ORDER BY role, position")
+        for role, *row in rows:
+            mcqs_data.setdefault(role, []).append(self._mcq_from_row(*row))
+        return mcqs_data
+
+    def mcqs_version(self, role):
+        # Kept up to date by the triggers on mcqs, whichever connection makes the change
+        row = self._connect().execute("SELECT version FROM mcq_versions WHERE role = ?", (role,)).fetchone()
+        return row[0] if row else 0
+
+    def mcq_roles(self):
+        # Answered from the (role, position) index without reading any question
+        return [row[0] for row in self._connect().execute("SELECT DISTINCT role FROM mcqs ORDER BY role")]
+
+    def save_mcqs(self, role, mcqs):
+        with self._connect() as conn:
+            existing = {
+                mcq_id: (position, question, options, answer)
+                for mcq_id, position, question, options, answer in conn.execute(
+                    "SELECT id, position, question, options, answer FROM mcqs WHERE role = ?", (role,)
+                )
+            }
+            kept, updates, inserts = set(), [], []
+            for position, mcq in enumerate(mcqs):
+                row = (position, mcq["question"], json.dumps(mcq["options"]), mcq.get("answer"))
+                mcq_id = mcq.get("id")
+                if mcq_id in existing and mcq_id not in kept:
+                    kept.add(mcq_id)
+                    if existing[mcq_id] != row:
+                        updates.append((*row, mcq_id))
+                else:
+                    inserts.append((role, *row))
+            conn.executemany("DELETE FROM mcqs WHERE id = ?", [(mcq_id,) for mcq_id in existing.keys() - kept])
+            conn.executemany("UPDATE mcqs SET position = ?, question = ?, options = ?, answer = ? WHERE id = ?", updates)
+            conn.executemany(
+                "INSERT INTO mcqs (role, position, question, options, answer) VALUES (?, ?, ?, ?, ?)", inserts
+            )
+
+    def add_mcq(self, role, mcq):
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO mcqs (role, position, question, options, answer) "
+                "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM mcqs WHERE role = ?), ?, ?, ?)",
+                (role, role, mcq["question"], json.dumps(mcq["options"]), mcq.get("answer"))
+            ).lastrowid
+
+    def add_mcqs(self, mcqs_by_role):
+        with self._connect() as conn:
+            for role, mcqs in mcqs_by_role.items():
+                (start,) = conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) + 1 FROM mcqs WHERE role = ?", (role,)
+                ).fetchone()
+                conn.executemany(
+                    "INSERT INTO mcqs (role, position, question, options, answer) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (role, start + offset, mcq["question"], json.dumps(mcq["options"]), mcq.get("answer"))
+                        for offset, mcq in enumerate(mcqs)
+                    ]
+                )
+
+    def update_mcq(self, role, mcq_id, mcq):
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE mcqs SET question = ?, options = ?, answer = ? WHERE id = ? AND role = ?",
+                (mcq["question"], json.dumps(mcq["options"]), mcq.get("answer"), mcq_id, role)
+            ).rowcount > 0
+
+    def delete_mcq(self, role, mcq_id):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM mcqs WHERE id = ? AND role = ?", (mcq_id, role)).rowcount > 0
+
+    def _replace_mcqs(self, conn, role, mcqs):
+        conn.execute("DELETE FROM mcqs WHERE role = ?", (role,))
+        conn.executemany(
+            "INSERT INTO mcqs (role, position, question, options, answer) VALUES (?, ?, ?, ?, ?)",
+            [
+                (role, position, mcq["question"], json.dumps(mcq["options"]), mcq.get("answer"))
+                for position, mcq in enumerate(mcqs)
+            ]
+        )
+
+    def load_slots(self):
+        return [row[0] for row in self._connect().execute("SELECT time FROM slots ORDER BY time")]
+
+    def save_slots(self, slots):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM slots")
+            conn.executemany(
+                "INSERT OR IGNORE INTO slots (time, position) VALUES (?, ?)",
+                [(slot, position) for position, slot in enumerate(slots)]
+            )
+
+    def add_slot(self, slot):
+        with self._connect() as conn:
+            # One statement, so a booking can't slip in between the check and the insert
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO slots (time, position) "
+                "SELECT ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM slots) "
+                "WHERE NOT EXISTS (SELECT 1 FROM reservations WHERE time = ?)",
+                (slot, slot)
+            )
+            return cursor.rowcount > 0
+
+    def remove_slot(self, slot):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM slots WHERE time = ?", (slot,)).rowcount > 0
+
+    def reserve_slot(self, slot, holder):
+        with self._connect() as conn:
+            # Only one transaction can delete the row, so only one candidate gets the slot
+            if conn.execute("DELETE FROM slots WHERE time = ?", (slot,)).rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO reservations (time, holder, reserved_at) VALUES (?, ?, ?)",
+                (slot, holder, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            return True
+
+    def release_slot(self, slot):
+        with self._connect() as conn:
+            if conn.execute("DELETE FROM reservations WHERE time = ?", (slot,)).rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT OR IGNORE INTO slots (time, position) VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM slots))",
+                (slot,)
+            )
+            return True
+
+    def load_reservations(self):
+        rows = self._connect().execute("SELECT time, holder, reserved_at FROM reservations ORDER BY time")
+        return {slot: {"holder": holder, "reserved_at": reserved_at} for slot, holder, reserved_at in rows}
+
+    def record_test_attempt(self, attempt):
+        with self._connect() as conn:
+            self._insert_test_attempts(conn, [attempt])
+
+    def _insert_test_attempts(self, conn, attempts):
+        conn.executemany(
+            "INSERT INTO test_attempts (role, email, completed_at, data) VALUES (?, ?, ?, ?)",
+            [(attempt["role"], attempt.get("email"), attempt["completed_at"], json.dumps(attempt)) for attempt in attempts]
+        )
+
+    def load_test_attempts(self, role=None):
+        if role is None:
+            rows = self._connect().execute("SELECT data FROM test_attempts ORDER BY id")
+        else:
+            rows = self._connect().execute("SELECT data FROM test_attempts WHERE role = ? ORDER BY id", (role,))
+        return [json.loads(row[0]) for row in rows]
+
+    def record_event(self, event_type, role, **fields):
+        ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO analytics_events (type, role, ts, data) VALUES (?, ?, ?, ?)",
+                (event_type, role, ts, json.dumps(fields))
+            )
+            self._apply_event(conn, event_type, role, fields)
+
+    def _apply_event(self, conn, event_type, role, fields):
+        """Maintain the per-role aggregates in the same transaction as the event insert."""
+        if event_type == "interview":
+            conn.execute(
+                "INSERT INTO interviews (email, role, time, link) VALUES (?, ?, ?, ?)",
+                (fields.get("email"), role, fields.get("time"), fields.get("link"))
+            )
+            rollup_keys = [("role", role)]
+            if fields.get("time"):
+                rollup_keys.append(("day", fields["time"][:10]))
+            conn.executemany(
+                "INSERT INTO interview_rollups (kind, key, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(kind, key) DO UPDATE SET count = count + 1",
+                rollup_keys
+            )
+            return
+
+        conn.execute("INSERT OR IGNORE INTO role_stats (role) VALUES (?)", (role,))
+        if event_type == "applicant":
+            conn.execute(
+                "UPDATE role_stats SET total_applicants = total_applicants + ? WHERE role = ?",
+                (fields.get("count", 1), role)
+            )
+        elif event_type == "test":
+            outcome = "passed" if fields.get("passed") else "failed"
+            conn.execute(
+                f"UPDATE role_stats SET selected_for_test = selected_for_test + 1, {outcome} = {outcome} + 1 WHERE role = ?",
+                (role,)
+            )
+
+    def load_analytics(self):
+        conn = self._connect()
+        roles = {
+            row[0]: dict(zip(ROLE_STAT_FIELDS, row[1:]))
+            for row in conn.execute(f"SELECT role, {', '.join(ROLE_STAT_FIELDS)} FROM role_stats ORDER BY rowid")
+        }
+        rollups = {"by_role": {}, "by_day": {}}
+        for kind, key, count in conn.execute("SELECT kind, key, count FROM interview_rollups ORDER BY kind, key"):
+            rollups["by_role" if kind == "role" else "by_day"][key] = count
+        return {"roles": roles, "interview_rollups": rollups}
+
+    def query_interviews(self, role=None, start_date=None, end_date=None, email=None, offset=0, limit=50):
+        filters, params = [], []
+        if role:
+            filters.append("role = ?")
+            params.append(role)
+        if start_date:
+            filters.append("time >= ?")
+            params.append(start_date)
+        if end_date:
+            filters.append("time <= ?")
+            params.append(f"{end_date} 23:59:59")
+        if email:
+            filters.append("email LIKE ?")
+            params.append(f"%{email}%")
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM interviews {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT email, role, time, link FROM interviews {where} ORDER BY time DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        page = [{"email": email, "role": role, "time": time, "link": link} for email, role, time, link in rows]
+        return page, total
+
+    def _rebuild_interview_rollups(self, conn):
+        conn.execute("DELETE FROM interview_rollups")
+        conn.execute(
+            "INSERT INTO interview_rollups (kind, key, count) "
+            "SELECT 'role', role, COUNT(*) FROM interviews GROUP BY role"
+        )
+        conn.execute(
+            "INSERT INTO interview_rollups (kind, key, count) "
+            "SELECT 'day', substr(time, 1, 10), COUNT(*) FROM interviews WHERE time IS NOT NULL GROUP BY 2"
+        )
+
+    def reset_analytics(self, roles):
+        # The raw events are kept as history; only the aggregates are reset
+        with self._connect() as conn:
+            conn.execute("DELETE FROM role_stats")
+            conn.execute("DELETE FROM interviews")
+            conn.execute("DELETE FROM interview_rollups")
+            conn.executemany("INSERT INTO role_stats (role) VALUES (?)", [(role,) for role in roles])
+
+    def migrate_from(self, source):
+        """One-shot import of all roles, MCQs, slots, test attempts and analytics from another backend."""
+        analytics = source.load_analytics()
+        _, interview_count = source.query_interviews(limit=0)
+        interviews, _ = source.query_interviews(limit=interview_count)
+        with self._connect() as conn:
+            for table in ("roles", "mcqs", "slots", "reservations", "test_attempts", "role_stats", "interviews"):
+                conn.execute(f"DELETE FROM {table}")
+
+            conn.executemany(
+                "INSERT INTO roles (name, criteria, position) VALUES (?, ?, ?)",
+                [(name, criteria, position) for position, (name, criteria) in enumerate(source.load_roles().items())]
+            )
+            for role, mcqs in source.load_all_mcqs().items():
+                self._replace_mcqs(conn, role, mcqs)
+            conn.executemany(
+                "INSERT OR IGNORE INTO slots (time, position) VALUES (?, ?)",
+                [(slot, position) for position, slot in enumerate(source.load_slots())]
+            )
+            conn.executemany(
+                "INSERT INTO reservations (time, holder, reserved_at) VALUES (?, ?, ?)",
+                [
+                    (slot, reservation.get("holder"), reservation.get("reserved_at", ""))
+                    for slot, reservation in source.load_reservations().items()
+                ]
+            )
+            self._insert_test_attempts(conn, source.load_test_attempts())
+            conn.executemany(
+                f"INSERT INTO role_stats (role, {', '.join(ROLE_STAT_FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (role, *(stats.get(field, 0) for field in ROLE_STAT_FIELDS))
+                    for role, stats in analytics.get("roles", {}).items()
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO interviews (email, role, time, link) VALUES (?, ?, ?, ?)",
+                [
+                    (interview.get("email"), interview.get("role"), interview.get("time"), interview.get("link"))
+                    # Oldest first, so ids keep the order the interviews were recorded in
+                    for interview in sorted(interviews, key=lambda interview: interview.get("time") or "")
+                ]
+            )
+            self._rebuild_interview_rollups(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)",
+                (datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),)
+            )
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the process-wide storage backend selected by RECRUITMENT_STORAGE."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                backend = os.environ.get("RECRUITMENT_STORAGE", "json").lower()
+                if backend == "sqlite":
+                    db_path = os.environ.get("RECRUITMENT_DB", DEFAULT_DB_PATH)
+                    _storage = SqliteStorage(db_path, migrate_from=JsonStorage())
+                elif backend == "json":
+                    _storage = JsonStorage()
+                else:
+                    raise ValueError(f"Unknown storage backend '{backend}'. Use 'json' or 'sqlite'.")
+    return _storage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the recruitment storage backend.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="Copy the JSON files into an SQLite database")
+    migrate.add_argument("--db", default=DEFAULT_DB_PATH, help="Path of the SQLite database")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        SqliteStorage(args.db).migrate_from(JsonStorage())
+        print(f"Migrated JSON data into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Zoom API client shared by every session in the process.
+
+Kept out of the app module so phi's Zoom tool and requests are only imported
+once an interview is actually scheduled.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from phi.tools.zoom import ZoomTool
+
+logger = logging.getLogger(__name__)
+
+
+class CustomZoomTool(ZoomTool):
+    # Refresh the token this many seconds before Zoom expires it
+    token_refresh_margin = 300
+    # (connect, read) timeouts for every Zoom request
+    request_timeout = (5, 30)
+
+    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, name: str = "zoom_tool"):
+        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
+        self.token_url = "https://zoom.us/oauth/token"
+        self.api_url = "https://api.zoom.us/v2"
+        self.access_token = None
+        self.token_expires_at = 0
+        self._token_lock = threading.Lock()
+
+        # Keep-alive session so token and API calls reuse pooled TLS connections
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=10)
+        self.session.mount("https://", adapter)
+
+    def get_access_token(self) -> str:
+        if self.access_token and time.time() < self.token_expires_at:
+            return str(self.access_token)
+
+        # Only one session refreshes the token; the others wait and reuse it
+        with self._token_lock:
+            if self.access_token and time.time() < self.token_expires_at:
+                return str(self.access_token)
+
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            data = {"grant_type": "account_credentials", "account_id": self.account_id}
+
+            try:
+                response = self.session.post(
+                    self.token_url, headers=headers, data=data,
+                    auth=(self.client_id, self.client_secret), timeout=self.request_timeout
+                )
+                response.raise_for_status()
+
+                token_info = response.json()
+                self.access_token = token_info["access_token"]
+                expires_in = token_info["expires_in"]
+                self.token_expires_at = time.time() + expires_in - self.token_refresh_margin
+
+                self._set_parent_token(str(self.access_token))
+                return str(self.access_token)
+
+            except requests.RequestException as e:
+                logger.error(f"Error fetching access token: {e}")
+                return ""
+
+    def _set_parent_token(self, token: str) -> None:
+        """Helper method to set the token in the parent ZoomTool class"""
+        if token:
+            self._ZoomTool__access_token = token
+
+    def create_meeting(self, topic: str, start_time: str, duration: int = 60, timezone: str = "UTC", settings: Optional[Dict] = None) -> Dict:
+        """Create a scheduled meeting for the account owner and return Zoom's response."""
+        meeting_details = {
+            "topic": topic,
+            "type": 2,  # Scheduled meeting
+            "start_time": start_time,
+            "duration": duration,
+            "timezone": timezone,
+            "settings": settings or {}
+        }
+
+        for attempt in range(2):
+            token = self.get_access_token()
+            if not token:
+                raise ValueError("Failed to fetch Zoom access token.")
+
+            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+            response = self.session.post(
+                f"{self.api_url}/users/me/meetings", json=meeting_details, headers=headers, timeout=self.request_timeout
+            )
+            if response.status_code == 401 and attempt == 0:
+                # The token was revoked or expired early; fetch a new one and retry once
+                self.access_token = None
+                continue
+            response.raise_for_status()
+            return response.json()
+
+
+_zoom_clients: Dict[Tuple[str, str, str], CustomZoomTool] = {}
+_zoom_clients_lock = threading.Lock()
+
+
+def get_zoom_client(account_id: str, client_id: str, client_secret: str) -> CustomZoomTool:
+    """Return the process-wide Zoom client for an account, creating it on first use."""
+    key = (account_id, client_id, client_secret)
+    with _zoom_clients_lock:
+        if key not in _zoom_clients:
+            _zoom_clients[key] = CustomZoomTool(account_id=account_id, client_id=client_id, client_secret=client_secret)
+        return _zoom_clients[key]